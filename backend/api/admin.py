@@ -19,6 +19,7 @@ from .models import *
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.utils import timezone
+from .moderation import assign_moderator
 
 # Customize the Django admin interface for CustomUser model
 class CustomUserAdmin(UserAdmin):
@@ -63,12 +64,12 @@ class ModeratorAdmin(admin.ModelAdmin):
                     pending_verification.VerificationDate = timezone.now().date()
                     pending_verification.save()
                 else:
-                    # Find a moderator for verification (can even use the new moderator)
-                    moderator = Moderator.objects.exclude(ModeratorID=student.UCID).first() or instance
+                    # Least busy other moderator (can even use the new moderator)
+                    moderator_id = assign_moderator(VerifyApplicant, exclude=student.UCID) or instance.pk
                     
                     # Create a new approved verification
                     VerifyApplicant.objects.create(
-                        ModeratorID=moderator,
+                        ModeratorID_id=moderator_id,
                         ApplicantUCID=student,
                         VerificationStatus='Approved',
                         VerificationDate=timezone.now().date()
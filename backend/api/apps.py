@@ -4,3 +4,21 @@ from django.apps import AppConfig
 class ApiDataConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.models.signals import post_migrate
+        from .search import install_search_trigger
+        from .stats import connect_summary_signals
+        from .events import connect_event_signals
+        from . import cache  # noqa: F401 -- connects the job cache invalidation signals
+        from . import authentication  # noqa: F401 -- connects the token revocation signals
+        from . import resumes  # noqa: F401 -- connects the resume extraction queue signals
+        from . import forum  # noqa: F401 -- connects the post vote counter signals
+        from . import db_router  # noqa: F401 -- connects the connection counter signal
+
+        post_migrate.connect(install_search_trigger, sender=self)
+        if settings.EMPLOYER_STATS_SUMMARY:
+            connect_summary_signals()
+        if settings.EVENT_STREAM:
+            connect_event_signals()
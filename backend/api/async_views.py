@@ -0,0 +1,247 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse
+from django.urls import URLPattern
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.response import Response
+
+from .cache import CachedJobOpeningMixin, acount, alist_key, detail_key, get_cache, get_timeout, validators_key
+from .cache import HITS_KEY, MISSES_KEY
+from .conditional import (
+    ConditionalGetMixin, add_validators, detail_etag, get_last_modified, list_etag, list_validators,
+    not_modified_response,
+)
+from .facets import FacetedListMixin, aget_facets, wants_facets, with_facets
+from .fieldsets import get_fieldset
+
+# Native async GET handlers for read-heavy viewsets.
+#
+# DRF views are synchronous, so under ASGI every request holds a worker
+# thread for its whole duration. For the public, read-only list/retrieve
+# actions the handlers below run on the event loop instead: filtering,
+# pagination and serialization reuse the viewset's own configuration, and
+# the database is reached through the async ORM. The sync parts that may
+# query or pick a database (authentication with its revocation check, the
+# filter backends) run in a worker thread. Writes and anything the fast path
+# can't serve (a rejected token, a failed permission check) are handed to
+# the regular DRF viewset in a worker thread.
+#
+# Enabled by ASYNC_READ_VIEWS, which nextstep/asgi.py turns on.
+
+
+class ReadOnlyFallback(Exception):
+    """Raised when a request has to go through the synchronous DRF view."""
+
+
+class AsyncReadHandler:
+
+    def __init__(self, viewset_class, action, request, args, kwargs):
+        self.viewset = viewset_class(action=action, args=args, kwargs=kwargs, format_kwarg=None)
+        self.viewset.action_map = {'get': action, 'head': action}
+        self.viewset.headers = {}
+        self.request = self.viewset.initialize_request(request, *args, **kwargs)
+        self.viewset.request = self.request
+        self.action = action
+        self.args = args
+        self.kwargs = kwargs
+
+    def authenticate(self):
+        # The DRF view's authenticators (ClaimsJWTAuthentication: token
+        # revocation and the account's active state included)
+        return self.request.user
+
+    async def authorize(self):
+        if self.request.META.get('HTTP_AUTHORIZATION'):
+            try:
+                await sync_to_async(self.authenticate)()
+            except APIException:
+                # The DRF view answers with the 401
+                raise ReadOnlyFallback
+        else:
+            self.request.user = AnonymousUser()
+        for permission in self.viewset.get_permissions():
+            if not permission.has_permission(self.request, self.viewset):
+                raise ReadOnlyFallback
+
+    def finalize(self, response):
+        response = self.viewset.finalize_response(self.request, response, *self.args, **self.kwargs)
+        if not isinstance(response, Response):
+            return response
+
+        # Render here, on the loop; a plain HttpResponse stops Django from
+        # scheduling the template-style render() in a worker thread
+        response.render()
+        plain = HttpResponse(response.content, status=response.status_code)
+        for header, value in response.items():
+            plain[header] = value
+        return plain
+
+    async def dispatch(self):
+        await self.authorize()
+        try:
+            self.viewset.format_kwarg = self.viewset.get_format_suffix(**self.kwargs)
+            neg = self.viewset.perform_content_negotiation(self.request)
+            self.request.accepted_renderer, self.request.accepted_media_type = neg
+
+            if self.action == 'list':
+                response = await self.list()
+            else:
+                response = await self.retrieve()
+        except APIException as exc:
+            response = self.viewset.handle_exception(exc)
+        return self.finalize(response)
+
+    async def cached(self, key, render):
+        # Async twin of CachedJobOpeningMixin.cached_response
+        if not isinstance(self.viewset, CachedJobOpeningMixin) or not get_timeout():
+            return await render()
+
+        cache = get_cache()
+        data = await cache.aget(key)
+        if data is not None:
+            await acount(cache, HITS_KEY)
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        await acount(cache, MISSES_KEY)
+        response = await render()
+        if response.status_code == 200:
+            await cache.aset(key, response.data, get_timeout())
+        response['X-Cache'] = 'MISS'
+        return response
+
+    async def list_validators(self, queryset):
+        # Async twin of ConditionalGetMixin.get_list_validators, cached like
+        # CachedJobOpeningMixin.cached_list_validators
+        viewset = self.viewset
+        validators = list_validators(viewset.updated_field, viewset.get_validator_relations())
+        if not isinstance(viewset, CachedJobOpeningMixin) or not get_timeout():
+            return await queryset.order_by().aaggregate(**validators)
+
+        cache = get_cache()
+        key = validators_key(await alist_key(cache, self.request))
+        cached = await cache.aget(key)
+        if cached is None:
+            cached = await queryset.order_by().aaggregate(**validators)
+            await cache.aset(key, cached, get_timeout())
+        return cached
+
+    async def filter_queryset(self):
+        return await sync_to_async(self.viewset.filter_queryset)(self.viewset.get_queryset())
+
+    async def list(self):
+        viewset = self.viewset
+        queryset = await self.filter_queryset()
+
+        etag = validators = None
+        if isinstance(viewset, ConditionalGetMixin):
+            validators = await self.list_validators(queryset)
+            etag = list_etag(self.request, validators)
+            response = not_modified_response(self.request, etag, validators['last_modified'], use_last_modified=False)
+            if response is not None:
+                return add_validators(response, etag, validators['last_modified'])
+
+        async def render():
+            page = None
+            if viewset.paginator is not None:
+                page = await viewset.paginator.apaginate_queryset(queryset, self.request, view=viewset)
+            if page is not None:
+                response = viewset.get_paginated_response(viewset.get_serializer(page, many=True).data)
+            else:
+                rows = [obj async for obj in queryset]
+                response = Response(viewset.get_serializer(rows, many=True).data)
+            if isinstance(viewset, FacetedListMixin) and wants_facets(self.request):
+                response.data = with_facets(response.data, await aget_facets(queryset))
+            return response
+
+        key = None
+        if isinstance(viewset, CachedJobOpeningMixin):
+            key = await alist_key(get_cache(), self.request)
+        response = await self.cached(key, render)
+
+        if etag is not None and response.status_code == 200:
+            add_validators(response, etag, validators['last_modified'])
+        return response
+
+    async def retrieve(self):
+        viewset = self.viewset
+        lookup_url_kwarg = viewset.lookup_url_kwarg or viewset.lookup_field
+        lookup = self.kwargs[lookup_url_kwarg]
+        try:
+            # Filtered like the DRF view's get_object(), e.g. for ?expand=
+            queryset = await self.filter_queryset()
+            instance = await queryset.filter(**{viewset.lookup_field: lookup}).afirst()
+        except (TypeError, ValueError, ValidationError):
+            instance = None
+        if instance is None:
+            raise NotFound()
+        for permission in viewset.get_permissions():
+            if not permission.has_object_permission(self.request, viewset, instance):
+                raise ReadOnlyFallback
+
+        last_modified = etag = None
+        if isinstance(viewset, ConditionalGetMixin):
+            related = viewset.get_validator_relations()
+            if related:
+                validators = await queryset.filter(**{viewset.lookup_field: lookup}).aaggregate(
+                    **list_validators(viewset.updated_field, related)
+                )
+            else:
+                # What the aggregate gives for a single row
+                validators = {'last_modified': getattr(instance, viewset.updated_field), 'count': 1}
+            last_modified = get_last_modified(validators)
+            etag = detail_etag(self.request, validators)
+            response = not_modified_response(self.request, etag, last_modified)
+            if response is not None:
+                return add_validators(response, etag, last_modified)
+
+        async def render():
+            return Response(viewset.get_serializer(instance).data)
+
+        key = detail_key(int(lookup)) if str(lookup).isdigit() and get_fieldset(self.request) is None else None
+        response = await self.cached(key, render) if key is not None else await render()
+
+        if etag is not None:
+            add_validators(response, etag, last_modified)
+        return response
+
+
+def async_read_view(viewset_class, actions):
+    """
+    View for one router route of `viewset_class`: GET/HEAD for list/retrieve
+    run natively async, other methods go to the DRF view in a worker thread.
+    """
+    sync_view = sync_to_async(viewset_class.as_view(actions))
+    read_action = actions.get('get')
+
+    async def view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD') and read_action in ('list', 'retrieve'):
+            try:
+                return await AsyncReadHandler(viewset_class, read_action, request, args, kwargs).dispatch()
+            except ReadOnlyFallback:
+                pass
+        return await sync_view(request, *args, **kwargs)
+
+    # Same attributes DRF puts on its view functions (used by the CSRF and
+    # query metrics middleware)
+    view.cls = viewset_class
+    view.actions = actions
+    view.initkwargs = {}
+    view.csrf_exempt = True
+    return view
+
+
+def with_async_reads(patterns, viewset_classes):
+    """
+    Copy of router URL patterns with the list/detail routes of the given
+    viewsets served by async_read_view. Extra @action routes are unchanged.
+    """
+    result = []
+    for pattern in patterns:
+        callback = pattern.callback
+        cls = getattr(callback, 'cls', None)
+        actions = getattr(callback, 'actions', None) or {}
+        if cls in viewset_classes and actions.get('get') in ('list', 'retrieve'):
+            pattern = URLPattern(pattern.pattern, async_read_view(cls, actions), pattern.default_args, pattern.name)
+        result.append(pattern)
+    return result
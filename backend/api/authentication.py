@@ -0,0 +1,144 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import CustomUser, Employer, Moderator, Student
+
+# Profile claims in the JWT.
+#
+# Access tokens carry the user's type, their Student UCID or EmployerID and
+# whether they are a moderator, so ClaimsJWTAuthentication can authenticate
+# a request and IsModerator can answer without touching the database.
+#
+# What the database would have said is still checked, but through the cache:
+# whether the account is active and its tokens_valid_after are re-read at
+# most every AUTH_CLAIMS_CACHE_TIMEOUT seconds per user. revoke_user_tokens()
+# invalidates every token issued to its users before now (used when their
+# moderator status changes) by setting tokens_valid_after, so every process
+# sees it: at once with a shared cache (REDIS_URL), within the timeout with
+# the per-process default. Tokens issued before the claims existed are
+# authenticated the old way.
+
+PROFILE_CLAIMS = ('user_type', 'email', 'ucid', 'employer_id', 'is_moderator', 'is_staff')
+
+
+def user_state_key(user_id):
+    return f'auth:user:{user_id}:state'
+
+
+def get_profile(user):
+    """
+    The Student (annotated with is_moderator) or Employer behind a user,
+    looked up by email once and remembered on the user object.
+    """
+    if not hasattr(user, '_profile'):
+        if user.user_type == 'student':
+            user._profile = (
+                Student.objects.filter(Email=user.email)
+                .annotate(is_moderator=Exists(Moderator.objects.filter(ModeratorID=OuterRef('pk'))))
+                .first()
+            )
+        elif user.user_type == 'employer':
+            user._profile = Employer.objects.filter(Email=user.email).first()
+        else:
+            user._profile = None
+    return user._profile
+
+
+def get_employer_id(user):
+    # The signed-in employer's EmployerID (None for everyone else), from the
+    # token claims when the user came from them
+    if not user or not user.is_authenticated or user.user_type != 'employer':
+        return None
+    if isinstance(user, ClaimsUser):
+        return user.employer_id
+    return getattr(get_profile(user), 'pk', None)
+
+
+def set_profile_claims(token, user):
+    profile = get_profile(user)
+    is_student = isinstance(profile, Student)
+    token['user_type'] = user.user_type
+    token['email'] = user.email
+    token['ucid'] = profile.UCID if is_student else None
+    token['employer_id'] = profile.EmployerID if isinstance(profile, Employer) else None
+    token['is_moderator'] = bool(is_student and profile.is_moderator)
+    token['is_staff'] = user.is_staff
+    return token
+
+
+def revoke_user_tokens(user_ids):
+    user_ids = list(user_ids)
+    CustomUser.objects.filter(pk__in=user_ids).update(tokens_valid_after=timezone.now())
+    cache.delete_many([user_state_key(user_id) for user_id in user_ids])
+
+
+def get_user_state(user_id):
+    # (is_active, tokens_valid_after as a timestamp) from the cache or the database
+    key = user_state_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        row = CustomUser.objects.filter(pk=user_id).values_list('is_active', 'tokens_valid_after').first()
+        active, valid_after = row or (False, None)
+        state = (active, valid_after and int(valid_after.timestamp()))
+        cache.set(key, state, getattr(settings, 'AUTH_CLAIMS_CACHE_TIMEOUT', 60))
+    return state
+
+
+def check_token_is_current(user_id, issued_at):
+    active, valid_after = get_user_state(user_id)
+    if not active:
+        raise AuthenticationFailed('User is inactive', code='user_inactive')
+    # iat has one-second resolution: tokens from the second of the revocation stay valid
+    if valid_after is not None and (issued_at or 0) < valid_after:
+        raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+
+
+class ClaimsUser(TokenUser):
+    """
+    request.user for requests authenticated from token claims. Has the
+    profile attributes of the claims but no database row behind it.
+    """
+
+    @property
+    def username(self):
+        return self.token.get('email', '')
+
+    def __getattr__(self, name):
+        if name in PROFILE_CLAIMS:
+            return self.token.get(name)
+        raise AttributeError(name)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that builds request.user from the token's profile
+    claims instead of loading the user from the database.
+    """
+
+    def get_user(self, validated_token):
+        if 'is_moderator' not in validated_token:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise AuthenticationFailed('Token contained no recognizable user identification', code='token_not_valid')
+        check_token_is_current(user_id, validated_token.get('iat'))
+        return ClaimsUser(validated_token)
+
+
+@receiver(post_save, sender=Moderator)
+@receiver(post_delete, sender=Moderator)
+def revoke_moderator_tokens(sender, instance, **kwargs):
+    # Tokens claiming the old moderator status must not outlive the change
+    if kwargs.get('created') is False:
+        return
+    emails = Student.objects.filter(UCID=instance.ModeratorID_id).values('Email')
+    revoke_user_tokens(CustomUser.objects.filter(email__in=emails).values_list('pk', flat=True))
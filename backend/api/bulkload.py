@@ -0,0 +1,111 @@
+import io
+from itertools import islice
+
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Bulk loading rows into the database for scale testing and data imports.
+#
+# On PostgreSQL rows are streamed in with COPY ... FROM STDIN, which skips
+# per-statement parsing and planning and loads hundreds of thousands of rows
+# a second; elsewhere (SQLite in development) they go in with batched
+# INSERTs: the statement bulk_create would run, without building a model
+# instance per row. Either way no model signals are sent and auto_now fields
+# are not filled in, so callers pass every column themselves, invalidate the
+# job cache and refresh the application summary afterwards. Database triggers
+# (the search documents of api/search.py) still fire for COPY.
+#
+# Rows are tuples of Python values in the order of the given fields, and are
+# consumed lazily batch by batch, so a generator of millions of rows never
+# has to fit in memory.
+
+DEFAULT_BATCH_SIZE = 10000
+
+
+def uses_copy(using=DEFAULT_DB_ALIAS):
+    return connections[using].vendor == 'postgresql'
+
+
+def batched(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def copy_value(value):
+    # COPY text format: \N is NULL, and backslash, tab and newlines are escaped
+    if value is None:
+        return '\\N'
+    return (
+        str(value).replace('\\', '\\\\').replace('\t', '\\t')
+        .replace('\n', '\\n').replace('\r', '\\r')
+    )
+
+
+def prepare(fields, row, connection):
+    return [field.get_db_prep_save(value, connection) for field, value in zip(fields, row)]
+
+
+def copy_rows(model, fields, rows, using, batch_size):
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in fields)
+    sql = f'COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN'
+
+    loaded = 0
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        for batch in batched(rows, batch_size):
+            data = ''.join(
+                '\t'.join(map(copy_value, prepare(fields, row, connection))) + '\n'
+                for row in batch
+            )
+            if hasattr(raw, 'copy_expert'):  # psycopg2
+                raw.copy_expert(sql, io.StringIO(data))
+            else:  # psycopg 3
+                with raw.copy(sql) as copy:
+                    copy.write(data)
+            loaded += len(batch)
+    return loaded
+
+
+def insert_rows(model, fields, rows, using, batch_size):
+    # What bulk_create runs, minus building a model instance and compiling
+    # an INSERT per batch
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    sql = f'INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({placeholders})'
+
+    loaded = 0
+    with connection.cursor() as cursor:
+        for batch in batched(rows, batch_size):
+            cursor.executemany(sql, [prepare(fields, row, connection) for row in batch])
+            loaded += len(batch)
+    return loaded
+
+
+def load_rows(model, field_names, rows, using=DEFAULT_DB_ALIAS, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Insert `rows` (tuples of values for `field_names`) into the table of
+    `model`, with COPY where available; returns the number of rows.
+    """
+    fields = [model._meta.get_field(name) for name in field_names]
+    load = copy_rows if uses_copy(using) else insert_rows
+    return load(model, fields, rows, using, batch_size)
+
+
+def reset_sequences(models, using=DEFAULT_DB_ALIAS):
+    # After loading explicit primary keys, so the next save() doesn't collide
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def next_pk(model, using=DEFAULT_DB_ALIAS, start=1):
+    last = model.objects.using(using).order_by('-pk').values_list('pk', flat=True).first()
+    return start if last is None else last + 1
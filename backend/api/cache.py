@@ -0,0 +1,189 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.response import Response
+
+from .fieldsets import get_fieldset
+from .models import Employer, JobOpening
+
+# Read-through cache for the serialized JobOpening list pages and detail
+# payloads.
+#
+# List keys embed a version number that is bumped whenever a JobOpening is
+# saved or deleted, so every cached page is invalidated at once without
+# having to enumerate keys (which a Redis/memcached backend can't do cheaply).
+# Detail keys are deleted directly. The list's conditional GET validators
+# (api/conditional.py) are kept next to its pages. Employer writes bump the
+# version too, for the pages and validators of ?expand=Employer lists.
+# JOB_CACHE_TIMEOUT bounds staleness for
+# writes that bypass model signals (queryset.update(), raw SQL); setting it
+# to 0 turns the cache off.
+
+VERSION_KEY = 'job-opening:version'
+HITS_KEY = 'job-opening:hits'
+MISSES_KEY = 'job-opening:misses'
+
+
+def get_cache():
+    return caches[getattr(settings, 'JOB_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'JOB_CACHE_TIMEOUT', 300)
+
+
+def get_version(cache):
+    # Seed with a timestamp rather than 1 so that a version key lost to
+    # eviction can never line up with pages cached under an older version
+    return cache.get_or_set(VERSION_KEY, time.time_ns, None)
+
+
+async def aget_version(cache):
+    return await cache.aget_or_set(VERSION_KEY, time.time_ns, None)
+
+
+def bump_version(cache):
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def list_digest(request):
+    # Normalize the query string: order and blank params must not split the cache
+    params = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+        if value != ''
+    )
+    raw = repr((request.get_host(), request.path, params))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def list_key(cache, request):
+    return f'job-opening:v{get_version(cache)}:list:{list_digest(request)}'
+
+
+async def alist_key(cache, request):
+    return f'job-opening:v{await aget_version(cache)}:list:{list_digest(request)}'
+
+
+def validators_key(list_key):
+    return f'{list_key}:validators'
+
+
+def detail_key(pk):
+    return f'job-opening:detail:{pk}'
+
+
+def count(cache, key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+async def acount(cache, key):
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 0, None)
+        await cache.aincr(key)
+
+
+def get_stats():
+    cache = get_cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+        'version': cache.get(VERSION_KEY),
+        'timeout': get_timeout(),
+    }
+
+
+class CachedJobOpeningMixin:
+    """
+    Serves JobOpeningViewSet list/retrieve from the job cache, rendering and
+    storing the payload on a miss. Responses carry X-Cache: HIT/MISS.
+    """
+
+    def cached_response(self, key, render):
+        cache = get_cache()
+        timeout = get_timeout()
+        if not timeout:
+            return render()
+
+        data = cache.get(key)
+        if data is not None:
+            count(cache, HITS_KEY)
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        count(cache, MISSES_KEY)
+        response = render()
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def cached_list_validators(self, compute):
+        # The conditional GET validators of the list, cached with its pages
+        cache = get_cache()
+        timeout = get_timeout()
+        if not timeout:
+            return compute()
+
+        key = validators_key(list_key(cache, self.request))
+        validators = cache.get(key)
+        if validators is None:
+            validators = compute()
+            cache.set(key, validators, timeout)
+        return validators
+
+    def list(self, request, *args, **kwargs):
+        render = super().list
+        return self.cached_response(
+            list_key(get_cache(), request),
+            lambda: render(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = str(kwargs[self.lookup_url_kwarg or self.lookup_field])
+        # Detail keys hold the full representation only
+        if not lookup.isdigit() or get_fieldset(request) is not None:
+            return super().retrieve(request, *args, **kwargs)
+
+        render = super().retrieve
+        return self.cached_response(
+            detail_key(int(lookup)),
+            lambda: render(request, *args, **kwargs),
+        )
+
+
+def invalidate_job_openings(pks):
+    # For writes that don't send model signals (bulk_create, bulk_update)
+    cache = get_cache()
+    cache.delete_many([detail_key(pk) for pk in pks])
+    bump_version(cache)
+
+
+@receiver(post_save, sender=JobOpening)
+@receiver(post_delete, sender=JobOpening)
+def invalidate_job_opening_cache(sender, instance, **kwargs):
+    invalidate_job_openings([instance.pk])
+
+
+@receiver(post_save, sender=Employer)
+@receiver(post_delete, sender=Employer)
+def invalidate_expanded_employer(sender, instance, **kwargs):
+    # Job lists may embed the employer (?expand=Employer)
+    bump_version(get_cache())
@@ -0,0 +1,147 @@
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # optional dependency, see requirements.txt
+    brotli = None
+
+# Response compression.
+#
+# Like Django's GZipMiddleware, but the encoding is negotiated from the
+# request's Accept-Encoding q-values: brotli (smaller, and with a low quality
+# setting as cheap to produce as gzip) when the client takes it and the
+# brotli package is installed, else gzip. Only text-like responses of at
+# least COMPRESSION_MIN_SIZE bytes are compressed: a few hundred bytes of
+# JSON don't gain enough to pay for the CPU, and PDFs are compressed
+# already. Streamed responses (the CSV/NDJSON exports) are compressed chunk
+# by chunk as they go out.
+#
+# As in GZipMiddleware, gzip output is padded with random bytes to
+# mitigate BREACH.
+
+GZIP_RANDOM_BYTES = 100
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'application/javascript', 'text/')
+
+
+def get_min_size():
+    return getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+
+
+def get_brotli_quality():
+    return getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4)
+
+
+def available_encodings():
+    # In order of preference
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    The content coding to use for an Accept-Encoding header, or None.
+    """
+    weights = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        weight = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in available_encodings():
+        weight = weights.get(coding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def brotli_compress(content):
+    return brotli.compress(content, quality=get_brotli_quality())
+
+
+def brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=get_brotli_quality())
+    for chunk in sequence:
+        # Flushed per chunk so a slow stream still reaches the client as it goes
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def abrotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=get_brotli_quality())
+    async for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def agzip_sequence(sequence):
+    # Each chunk as a gzip member of its own, as GZipMiddleware does
+    async for chunk in sequence:
+        yield compress_string(chunk, max_random_bytes=GZIP_RANDOM_BYTES)
+
+
+def is_compressible(response):
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    if content_type == 'text/event-stream':
+        return False  # a few bytes per event, each to be sent at once
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    gzip or brotli compression of API responses, whichever the client
+    prefers (see above). COMPRESSION_MIN_SIZE = 0 turns it off.
+    """
+
+    def process_response(self, request, response):
+        min_size = get_min_size()
+        if not min_size or response.status_code in (204, 206, 304) or response.has_header('Content-Encoding'):
+            return response
+        if not is_compressible(response) or (not response.streaming and len(response.content) < min_size):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            content = response.streaming_content
+            if encoding == 'br':
+                response.streaming_content = abrotli_sequence(content) if response.is_async else brotli_sequence(content)
+            elif response.is_async:
+                response.streaming_content = agzip_sequence(content)
+            else:
+                response.streaming_content = compress_sequence(content, max_random_bytes=GZIP_RANDOM_BYTES)
+            # Unknown until it has all been sent
+            del response.headers['Content-Length']
+        else:
+            if encoding == 'br':
+                compressed = brotli_compress(response.content)
+            else:
+                compressed = compress_string(response.content, max_random_bytes=GZIP_RANDOM_BYTES)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # A strong ETag names the uncompressed bytes (RFC 9110 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
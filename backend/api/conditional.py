@@ -0,0 +1,162 @@
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+# Conditional GET for the API viewsets.
+#
+# Validators come from the database rather than from the rendered body:
+# a list is identified by max("UpdatedAt") and the row count of the filtered
+# queryset (the count catches deletes), a detail by the row's "UpdatedAt".
+# Relations embedded with ?expand= (api/fieldsets.py) add their own
+# max("UpdatedAt") and count, and the ETag covers the full URL, so each
+# ?fields=/?expand= representation has its own. When the client already
+# holds the current version we answer 304 Not Modified without serializing
+# anything.
+#
+# The list validators are one aggregate over the filtered queryset, counted
+# in the list query budgets; the job opening list keeps them in the job
+# cache with its pages (api/cache.py).
+#
+# Lists are only revalidated with If-None-Match: deleting an older row leaves
+# max("UpdatedAt") unchanged, so If-Modified-Since alone could return a stale
+# 304. Last-Modified is still sent for information.
+#
+# Writes that skip Model.save() (queryset.update(), bulk_update) must set
+# UpdatedAt themselves or clients may keep a stale copy.
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:32]
+    # Weak: the same version may be rendered slightly differently (e.g. link hosts)
+    return 'W/' + quote_etag(digest)
+
+
+def list_validators(updated_field='UpdatedAt', related=()):
+    """
+    Aggregate expressions identifying the current version of a list (or of
+    one row): its rows' max UpdatedAt and count, and the same for each of the
+    `related` relation paths.
+    """
+    # Distinct: joining a reverse relation repeats the rows
+    validators = {'last_modified': Max(updated_field), 'count': Count('pk', distinct=bool(related))}
+    for i, path in enumerate(related):
+        validators[f'last_modified_{i}'] = Max(f'{path}__UpdatedAt')
+        validators[f'count_{i}'] = Count(path, distinct=True)
+    return validators
+
+
+def query_path(model, path):
+    # Prefetch paths name reverse relations by accessor ('jobopening_set'),
+    # aggregates by query name ('jobopening')
+    names = []
+    for name in path.split('__'):
+        field = next(
+            field for field in model._meta.get_fields()
+            if field.name == name or (field.auto_created and not field.concrete and field.get_accessor_name() == name)
+        )
+        names.append(field.name)
+        model = field.related_model
+    return '__'.join(names)
+
+
+def get_last_modified(validators):
+    # The newest of the rows and their expanded relations
+    return max(
+        (value for name, value in validators.items() if name.startswith('last_modified') and value is not None),
+        default=None,
+    )
+
+
+def list_etag(request, validators):
+    return make_etag(request.get_full_path(), *(
+        (name, value.isoformat() if hasattr(value, 'isoformat') else value)
+        for name, value in sorted(validators.items())
+    ))
+
+
+# A row is a list of one
+detail_etag = list_etag
+
+
+def http_timestamp(last_modified):
+    # HTTP dates have one-second resolution
+    return int(last_modified.timestamp()) if last_modified else None
+
+
+def not_modified_response(request, etag, last_modified, use_last_modified=True):
+    """
+    The 304 (or 412) response for a request whose preconditions match, else None.
+    """
+    timestamp = http_timestamp(last_modified) if use_last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def add_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(http_timestamp(last_modified))
+    # Let browsers keep the body but revalidate it on every request
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for list and retrieve, answering matching
+    If-None-Match / If-Modified-Since requests with 304 Not Modified.
+    """
+    updated_field = 'UpdatedAt'
+
+    def conditional_response(self, request, etag, last_modified, render, use_last_modified=True):
+        response = not_modified_response(request, etag, last_modified, use_last_modified)
+        if response is None:
+            response = render()
+            if response.status_code != 200:
+                return response
+        return add_validators(response, etag, last_modified)
+
+    def get_validator_relations(self):
+        # The relation paths the request expands (with FieldsetViewMixin)
+        get_request_fieldset = getattr(self, 'get_request_fieldset', None)
+        fieldset = get_request_fieldset() if get_request_fieldset else None
+        if fieldset is None or not fieldset.expand:
+            return ()
+        _, select, prefetch = self.get_serializer(fieldset=fieldset).get_queryset_plan()
+        model = self.get_queryset().model
+        return tuple(query_path(model, path) for path in select + prefetch)
+
+    def get_list_validators(self, queryset):
+        return queryset.order_by().aggregate(**list_validators(self.updated_field, self.get_validator_relations()))
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        validators = self.get_list_validators(queryset)
+        render = super().list
+        return self.conditional_response(
+            request, list_etag(request, validators), validators['last_modified'],
+            lambda: render(request, *args, **kwargs),
+            use_last_modified=False,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            validators = (
+                self.get_queryset()
+                .filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+                .aggregate(**list_validators(self.updated_field, self.get_validator_relations()))
+            )
+        except (TypeError, ValueError, ValidationError):
+            validators = {'last_modified': None}
+        # Unknown or malformed id: let the normal handler produce the 404
+        if validators['last_modified'] is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        render = super().retrieve
+        return self.conditional_response(
+            request, detail_etag(request, validators), get_last_modified(validators),
+            lambda: render(request, *args, **kwargs),
+        )
@@ -0,0 +1,243 @@
+import hashlib
+import random
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Read replicas.
+#
+# With replicas configured (DB_REPLICA_HOSTS, see nextstep/settings.py),
+# ReplicaRoutingMiddleware picks a random healthy replica for each GET/HEAD
+# request and ReplicaRouter sends the request's reads to it. Everything else
+# reads from the primary: write requests, management commands and workers,
+# and reads inside a transaction.
+#
+# Read-your-writes: once a request writes, its later reads go to the
+# primary, and after a write request the client (keyed by its
+# Authorization header) is pinned to the primary for REPLICA_PIN_SECONDS,
+# longer than the replicas normally lag behind. Clients without a token get
+# no pin.
+#
+# Connections are persistent (CONN_MAX_AGE) with health checks, so a
+# request reuses its worker's connection instead of opening one. The
+# middleware checks (and if need be reopens) the replica's connection when
+# the request starts, in a worker thread under ASGI; the router itself only
+# returns that choice and does no I/O, so it is safe on the event loop. A
+# replica whose connection fails is skipped for REPLICA_RETRY_SECONDS; its
+# reads go to the primary meanwhile. Counters for all of this are in
+# get_stats().
+
+PIN_KEY = 'db-pin:{}'
+
+
+class RoutingState:
+    def __init__(self, use_replicas):
+        self.use_replicas = use_replicas
+        # Chosen by the middleware; None reads from the primary
+        self.replica = None
+        self.wrote = False
+        # Transactions already open around the request (ATOMIC_REQUESTS opens
+        # its own later, in the view handler)
+        self.atomic_depth = len(connections[DEFAULT_DB_ALIAS].atomic_blocks)
+
+
+_state = ContextVar('db_routing', default=None)
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+_down_until = {}
+
+
+def count(key, n=1):
+    with _stats_lock:
+        _stats[key] += n
+
+
+def get_replicas():
+    return getattr(settings, 'REPLICA_DATABASES', [])
+
+
+def get_pin_seconds():
+    return getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+
+
+def is_down(alias):
+    return _down_until.get(alias, 0) > time.monotonic()
+
+
+def mark_down(alias):
+    _down_until[alias] = time.monotonic() + getattr(settings, 'REPLICA_RETRY_SECONDS', 30)
+    count(f'{alias}.failures')
+
+
+def pin_key(request):
+    authorization = request.headers.get('Authorization')
+    if not authorization:
+        return None
+    return PIN_KEY.format(hashlib.sha1(authorization.encode()).hexdigest())
+
+
+def connect(alias):
+    # True if the alias has a usable connection, reconnecting (or failing)
+    # now rather than halfway through the request's first query
+    connection = connections[alias]
+    try:
+        connection.close_if_health_check_failed()
+        connection.ensure_connection()
+    except DatabaseError:
+        mark_down(alias)
+        return False
+    return True
+
+
+def choose_replica():
+    # A random replica with a usable connection, or None for the primary
+    replicas = [alias for alias in get_replicas() if not is_down(alias)]
+    random.shuffle(replicas)
+    for alias in replicas:
+        if connect(alias):
+            return alias
+    count('replica_fallbacks')
+    return None
+
+
+class ReplicaRouter:
+    """
+    Database router sending the reads of safe requests to the replicas in
+    REPLICA_DATABASES (see above).
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = self.get_replica()
+        count(f'{alias or DEFAULT_DB_ALIAS}.reads')
+        return alias
+
+    def get_replica(self):
+        # Routing only: the replica was chosen and checked by the middleware
+        state = _state.get()
+        if state is None or state.replica is None or state.wrote:
+            return None
+        if len(connections[DEFAULT_DB_ALIAS].atomic_blocks) > state.atomic_depth:
+            return None
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        count(f'{DEFAULT_DB_ALIAS}.writes')
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema by replication
+        return False if db in get_replicas() else None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets GET/HEAD requests read from the replicas unless their client is
+    pinned to the primary, and pins clients after their write requests.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not get_replicas():
+            return self.get_response(request)
+
+        key = pin_key(request)
+        pinned = key is not None and cache.get(key) is not None
+        state = self.start(request, pinned)
+        if state.use_replicas:
+            state.replica = choose_replica()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote and key is not None:
+            cache.set(key, 1, get_pin_seconds())
+        return response
+
+    async def __acall__(self, request):
+        if not get_replicas():
+            return await self.get_response(request)
+
+        key = pin_key(request)
+        pinned = key is not None and await cache.aget(key) is not None
+        state = self.start(request, pinned)
+        if state.use_replicas:
+            # On the thread the request's queries run on
+            state.replica = await sync_to_async(choose_replica)()
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote and key is not None:
+            await cache.aset(key, 1, get_pin_seconds())
+        return response
+
+    def start(self, request, pinned):
+        safe = request.method in ('GET', 'HEAD')
+        if safe and pinned:
+            count('pinned_requests')
+        return RoutingState(use_replicas=safe and not pinned)
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    count(f'{connection.alias}.connections')
+
+
+def get_stats():
+    """
+    Routing and connection counters of this process, per database alias.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    databases = {}
+    for alias in [DEFAULT_DB_ALIAS, *get_replicas()]:
+        connection = connections[alias]
+        databases[alias] = {
+            'reads': stats.get(f'{alias}.reads', 0),
+            'writes': stats.get(f'{alias}.writes', 0),
+            'connections_opened': stats.get(f'{alias}.connections', 0),
+            'failures': stats.get(f'{alias}.failures', 0),
+            'down': is_down(alias),
+            'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+            'health_checks': connection.settings_dict.get('CONN_HEALTH_CHECKS'),
+        }
+        # Django's connection pool (psycopg 3, OPTIONS["pool"])
+        if connection.settings_dict.get('OPTIONS', {}).get('pool'):
+            databases[alias]['pool'] = connection.pool.get_stats()
+    return {
+        'replicas': get_replicas(),
+        'pin_seconds': get_pin_seconds(),
+        'pinned_requests': stats.get('pinned_requests', 0),
+        'replica_fallbacks': stats.get('replica_fallbacks', 0),
+        'databases': databases,
+    }
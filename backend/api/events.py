@@ -0,0 +1,392 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.db.models.signals import post_init, post_save
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import ClaimsJWTAuthentication, check_token_is_current, get_profile
+from .models import Employer, JobApplication, Student, VerifyApplicant, VerifyEmployer
+
+# Status changes pushed to the users they concern, over Server-Sent Events.
+#
+# GET /api/events/ is a text/event-stream that stays open and carries, for
+# the signed-in student or employer:
+#
+#   application.status       a JobApplication was created or its Status
+#                            changed (sent to the student and the employer)
+#   applicant.verification   a VerifyApplicant row was created or its
+#                            VerificationStatus changed (to the student)
+#   employer.verification    the same for VerifyEmployer (to the employer)
+#
+# with the row's ids, the new and previous status as data. The React app
+# (frontend/src/services/events.js) opens it instead of polling the
+# application and verification lists.
+#
+# EventSource can't send an Authorization header (which works too), and an
+# access token in the URL would end up in proxy and access logs. So the
+# client first POSTs to /api/events/ticket/ with its token and gets a ticket:
+# signed, good only for opening the stream, and for EVENT_TICKET_MAX_AGE
+# seconds. It then opens `new EventSource('/api/events/?ticket=<ticket>')`.
+#
+# Events come from post_save signals, published once the transaction
+# commits, to an in-process EventBroker. It keeps the last EVENT_BUFFER_SIZE
+# events: a client reconnecting with Last-Event-ID (EventSource does this by
+# itself) or ?lastEventId= gets the ones it missed, or a `reset` event when
+# they are no longer there (the process restarted, or the buffer moved on),
+# telling it to re-fetch its lists once. Event ids are seeded from the clock
+# so that ids of a restarted process never repeat old ones.
+#
+# The broker lives in one process: only writes made by the process serving
+# the stream reach it, so the API runs as a single ASGI process (asgi.py
+# turns EVENT_STREAM on) or behind sticky sessions. Bulk writes send no
+# signals and are published by the views (publish_saved()). A stream ends
+# when the access token its ticket came from expires, and the client
+# reconnects with a fresh ticket.
+
+RESET_EVENT = 'reset'
+TICKET_SALT = 'api.events.ticket'
+# How long EventSource waits before reconnecting
+RECONNECT_DELAY_MS = 3000
+# The status field and event name of each model
+EVENT_MODELS = {
+    JobApplication: ('Status', 'application.status'),
+    VerifyApplicant: ('VerificationStatus', 'applicant.verification'),
+    VerifyEmployer: ('VerificationStatus', 'employer.verification'),
+}
+# Status as loaded from the database, to tell whether a save changed it
+LOADED_STATUS_ATTR = '_event_loaded_status'
+
+
+def get_buffer_size():
+    return getattr(settings, 'EVENT_BUFFER_SIZE', 1000)
+
+
+def get_heartbeat():
+    return getattr(settings, 'EVENT_STREAM_HEARTBEAT', 15)
+
+
+def get_ticket_max_age():
+    return getattr(settings, 'EVENT_TICKET_MAX_AGE', 30)
+
+
+def student_topic(ucid):
+    return f'student:{ucid}'
+
+
+def employer_topic(employer_id):
+    return f'employer:{employer_id}'
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    type: str
+    data: dict
+    topics: frozenset
+
+    def encode(self):
+        return f'id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data)}\n\n'
+
+
+class Subscription:
+    """
+    One open stream: receives the events for `topics` on the event loop it
+    was created on, whichever thread publishes them.
+    """
+
+    def __init__(self, broker, topics, max_queued):
+        self.broker = broker
+        self.topics = frozenset(topics)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(max_queued)
+        self.overflowed = False
+
+    def push(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self.put, event)
+        except RuntimeError:
+            pass  # the loop has closed; the stream is gone
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A client this far behind reconnects and replays from the buffer
+            self.overflowed = True
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    """
+    In-process publish/subscribe, with the last `size` events kept for
+    replay. Thread-safe: events are published from request threads and
+    consumed on the event loop.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.lock = threading.Lock()
+        self.events = deque()
+        self.subscriptions = set()
+        # Every id up to `floor` is gone: from before this process, or trimmed
+        self.last_id = self.floor = time.time_ns() // 1000
+
+    def publish(self, event_type, data, topics):
+        with self.lock:
+            self.last_id += 1
+            event = Event(self.last_id, event_type, data, frozenset(topics))
+            self.events.append(event)
+            while len(self.events) > self.size:
+                self.floor = self.events.popleft().id
+            subscriptions = [sub for sub in self.subscriptions if sub.topics & event.topics]
+        for subscription in subscriptions:
+            subscription.push(event)
+        return event
+
+    def subscribe(self, topics, last_id=None):
+        """
+        Returns the subscription and the events to send first: those after
+        `last_id` on its topics, or a reset event if some are gone.
+        """
+        subscription = Subscription(self, topics, self.size)
+        with self.lock:
+            backlog = []
+            if last_id is not None and last_id < self.floor:
+                backlog.append(Event(self.last_id, RESET_EVENT, {}, subscription.topics))
+            elif last_id is not None:
+                backlog.extend(
+                    event for event in self.events
+                    if event.id > last_id and event.topics & subscription.topics
+                )
+            self.subscriptions.add(subscription)
+        return subscription, backlog
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = EventBroker(get_buffer_size())
+    return _broker
+
+
+def reset_broker():
+    # Drops every event and subscription (for tests)
+    global _broker
+    with _broker_lock:
+        _broker = None
+
+
+def get_topics(instance):
+    if isinstance(instance, JobApplication):
+        return [student_topic(instance.ApplicantUCID_id), employer_topic(instance.EmployerID_id)]
+    if isinstance(instance, VerifyApplicant):
+        return [student_topic(instance.ApplicantUCID_id)]
+    return [employer_topic(instance.EmployerID_id)]
+
+
+def get_event_data(instance, previous):
+    status_field, _ = EVENT_MODELS[type(instance)]
+    data = {'Status': getattr(instance, status_field), 'PreviousStatus': previous}
+    if isinstance(instance, JobApplication):
+        return {
+            'ApplicationID': instance.pk, 'JobID': instance.JobID_id, 'EmployerID': instance.EmployerID_id,
+            'ApplicantUCID': instance.ApplicantUCID_id, **data,
+        }
+    data['VerificationDate'] = str(instance.VerificationDate)
+    if isinstance(instance, VerifyApplicant):
+        return {'VID': instance.pk, 'ApplicantUCID': instance.ApplicantUCID_id, **data}
+    return {'VID': instance.pk, 'EmployerID': instance.EmployerID_id, **data}
+
+
+def remember_loaded_status(sender, instance, **kwargs):
+    status_field, _ = EVENT_MODELS[sender]
+    # Not for deferred fields, which would cost a query each
+    setattr(instance, LOADED_STATUS_ATTR, instance.__dict__.get(status_field))
+
+
+def publish_saved(instances, created=False, using=None):
+    """
+    Publish status events for saved `instances` whose status is new or
+    changed since they were loaded, once the transaction commits.
+    """
+    for instance in instances:
+        status_field, event_type = EVENT_MODELS[type(instance)]
+        status = getattr(instance, status_field)
+        previous = None if created else getattr(instance, LOADED_STATUS_ATTR, None)
+        if not created and status == previous:
+            continue
+        setattr(instance, LOADED_STATUS_ATTR, status)
+        data, topics = get_event_data(instance, previous), get_topics(instance)
+        transaction.on_commit(partial(get_broker().publish, event_type, data, topics), using)
+
+
+def publish_status_event(sender, instance, created, using, update_fields=None, **kwargs):
+    status_field, _ = EVENT_MODELS[sender]
+    if update_fields is not None and status_field not in update_fields:
+        return
+    publish_saved([instance], created, using)
+
+
+def connect_event_signals():
+    # Only connected when EVENT_STREAM is on: nobody would receive them
+    for model in EVENT_MODELS:
+        post_init.connect(remember_loaded_status, sender=model, dispatch_uid=f'event_status_init_{model.__name__}')
+        post_save.connect(publish_status_event, sender=model, dispatch_uid=f'event_status_save_{model.__name__}')
+
+
+def disconnect_event_signals():
+    for model in EVENT_MODELS:
+        post_init.disconnect(sender=model, dispatch_uid=f'event_status_init_{model.__name__}')
+        post_save.disconnect(sender=model, dispatch_uid=f'event_status_save_{model.__name__}')
+
+
+def is_enabled():
+    return getattr(settings, 'EVENT_STREAM', False)
+
+
+def get_topics_of(user, token):
+    # Claims tokens cost no query
+    if 'is_moderator' in token:
+        ucid, employer_id = token.get('ucid'), token.get('employer_id')
+    else:
+        profile = get_profile(user)
+        ucid = profile.UCID if isinstance(profile, Student) else None
+        employer_id = profile.EmployerID if isinstance(profile, Employer) else None
+    topics = []
+    if ucid is not None:
+        topics.append(student_topic(ucid))
+    if employer_id is not None:
+        topics.append(employer_topic(employer_id))
+    return topics
+
+
+def make_ticket(user_id, token, topics):
+    return signing.dumps(
+        {'user': user_id, 'iat': token.get('iat'), 'exp': token.get('exp'), 'topics': topics}, salt=TICKET_SALT,
+    )
+
+
+def read_ticket(ticket):
+    """
+    The topics of a stream ticket and when its access token expires. The
+    account is checked like a claims token: a ticket of a revoked token or
+    an inactive user is refused.
+    """
+    try:
+        data = signing.loads(ticket, salt=TICKET_SALT, max_age=get_ticket_max_age())
+    except signing.SignatureExpired:
+        raise AuthenticationFailed('Ticket has expired')
+    except signing.BadSignature:
+        raise AuthenticationFailed('Ticket is invalid')
+    check_token_is_current(data['user'], data['iat'])
+    return data['topics'], data['exp']
+
+
+def authenticate(request):
+    """
+    The topics of the user behind the request's ticket or Authorization
+    header, and when their access token expires.
+    """
+    ticket = request.GET.get('ticket')
+    if ticket:
+        return read_ticket(ticket)
+    authentication = ClaimsJWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        raise AuthenticationFailed('Authentication credentials were not provided.')
+    token = authentication.get_validated_token(authentication.get_raw_token(header))
+    return get_topics_of(authentication.get_user(token), token), token.get('exp')
+
+
+class EventTicketView(APIView):
+    """
+    POST /api/events/ticket/: a ticket for opening the event stream (see above).
+    """
+    # The ticket carries the access token's iat and exp
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        topics = get_topics_of(request.user, request.auth)
+        if not topics:
+            raise PermissionDenied('Only students and employers receive status events.')
+        ticket = make_ticket(request.auth[api_settings.USER_ID_CLAIM], request.auth, topics)
+        return Response({'ticket': ticket, 'expires_in': get_ticket_max_age()})
+
+
+def get_last_event_id(request):
+    value = request.headers.get('Last-Event-ID') or request.GET.get('lastEventId')
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+async def event_stream(subscription, backlog, expires_at):
+    try:
+        yield f'retry: {RECONNECT_DELAY_MS}\n\n'
+        for event in backlog:
+            yield event.encode()
+        while not subscription.overflowed:
+            remaining = expires_at - time.time() if expires_at else get_heartbeat()
+            if remaining <= 0:
+                break
+            try:
+                event = await subscription.get(min(remaining, get_heartbeat()))
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield ': keep-alive\n\n'
+                continue
+            yield event.encode()
+    finally:
+        subscription.close()
+
+
+async def events_view(request):
+    """
+    GET /api/events/: the status events of the signed-in user (see above).
+    """
+    if request.method != 'GET':
+        return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+    try:
+        topics, expires_at = await sync_to_async(authenticate)(request)
+    except (AuthenticationFailed, TokenError) as exc:
+        return JsonResponse({'detail': getattr(exc, 'detail', str(exc))}, status=401)
+    if not topics:
+        return JsonResponse({'detail': 'Only students and employers receive status events.'}, status=403)
+
+    subscription, backlog = get_broker().subscribe(topics, get_last_event_id(request))
+    response = StreamingHttpResponse(event_stream(subscription, backlog, expires_at), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Sent as they come rather than buffered by nginx
+    response['X-Accel-Buffering'] = 'no'
+    return response
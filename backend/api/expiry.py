@@ -0,0 +1,186 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from .cache import get_cache, invalidate_job_openings
+from .models import JobOpening
+
+# Closing job openings once their Deadline has passed.
+#
+# expire_job_openings() moves Active openings with a Deadline before today to
+# Closed, in UPDATEs of at most JOB_EXPIRY_BATCH_SIZE rows, each in its own
+# short transaction so no run holds many row locks or one long transaction.
+# The rows are found through the partial index on Active openings
+# (job_opening_active_dl_idx), which stays small because expired ones leave
+# it. update() skips auto_now, so UpdatedAt is set explicitly: conditional
+# requests and the recommendation index (api/recommendations.py) go by it.
+# The job cache is invalidated per batch.
+#
+# It runs from `manage.py expire_job_openings` (cron, or --every N as a
+# worker), or in the web processes themselves: with JOB_EXPIRY_INTERVAL set,
+# nextstep/wsgi.py and asgi.py start a scheduler thread. A PostgreSQL
+# advisory lock keeps two processes from running at once; a cache key
+# skips the run when another process already did it in this interval (with
+# a shared cache, REDIS_URL, that means one run per interval overall; with
+# the per-process default each process runs, one at a time, and a run with
+# nothing to close is one index lookup). The last run is recorded in the
+# cache (get_stats()).
+
+logger = logging.getLogger('api.expiry')
+
+STATS_KEY = 'job-expiry:stats'
+RUN_KEY = 'job-expiry:run'
+# pg_try_advisory_lock() key of the expiry run
+RUN_LOCK_ID = 7_351_200_001
+
+
+def get_interval():
+    return getattr(settings, 'JOB_EXPIRY_INTERVAL', 0)
+
+
+def get_batch_size():
+    return getattr(settings, 'JOB_EXPIRY_BATCH_SIZE', 1000)
+
+
+def expired_job_openings(today=None):
+    return JobOpening.objects.filter(Status=JobOpening.STATUS_ACTIVE, Deadline__lt=today or timezone.localdate())
+
+
+def expire_job_openings(batch_size=None, today=None):
+    """
+    Close the active job openings past their Deadline; returns how many
+    were closed.
+    """
+    batch_size = batch_size or get_batch_size()
+    today = today or timezone.localdate()
+    started = time.perf_counter()
+    closed = batches = 0
+    while True:
+        with transaction.atomic():
+            batch = expired_job_openings(today).order_by('Deadline', 'JobID').values_list('pk', flat=True)
+            pks = list(batch[:batch_size])
+            if not pks:
+                break
+            # Filtered again: a row may have been extended or closed meanwhile
+            closed += expired_job_openings(today).filter(pk__in=pks).update(
+                Status=JobOpening.STATUS_CLOSED, UpdatedAt=timezone.now(),
+            )
+        batches += 1
+        invalidate_job_openings(pks)
+        if len(pks) < batch_size:
+            break
+
+    duration_ms = round((time.perf_counter() - started) * 1000, 2)
+    record_run(closed, batches, duration_ms)
+    logger.info('Closed %d expired job openings in %d batches (%.2f ms)', closed, batches, duration_ms)
+    return closed
+
+
+def record_run(closed, batches, duration_ms):
+    cache = get_cache()
+    stats = cache.get(STATS_KEY) or {'runs': 0, 'closed': 0}
+    stats.update({
+        'runs': stats['runs'] + 1,
+        'closed': stats['closed'] + closed,
+        'last_run_at': timezone.now().isoformat(),
+        'last_closed': closed,
+        'last_batches': batches,
+        'last_duration_ms': duration_ms,
+    })
+    cache.set(STATS_KEY, stats, None)
+
+
+def get_stats():
+    stats = get_cache().get(STATS_KEY) or {'runs': 0, 'closed': 0}
+    return {
+        **stats,
+        # Expired but still open: what the next run will close
+        'pending': expired_job_openings().count(),
+        'interval': get_interval(),
+        'batch_size': get_batch_size(),
+    }
+
+
+@contextmanager
+def run_lock():
+    """
+    Yields whether this process got the expiry lock: a session-level
+    advisory lock on PostgreSQL, released when the block ends or the
+    connection drops. Other databases (SQLite in development) have no
+    concurrent processes to keep out.
+    """
+    if connection.vendor != 'postgresql':
+        yield True
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_lock(%s)', [RUN_LOCK_ID])
+        acquired = cursor.fetchone()[0]
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [RUN_LOCK_ID])
+
+
+class ExpiryScheduler:
+    """
+    Runs expire_job_openings() every `interval` seconds, in a daemon thread
+    (start()) or in the calling thread (run()).
+    """
+
+    def __init__(self, interval, batch_size=None):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='job-expiry', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        while True:
+            self.tick()
+            # Not held open while sleeping
+            connections.close_all()
+            if self.stopped.wait(self.interval):
+                break
+
+    def tick(self):
+        # Skipped when another process already ran in this interval, or is running
+        if not get_cache().add(RUN_KEY, timezone.now().isoformat(), self.interval):
+            return False
+        with run_lock() as acquired:
+            if not acquired:
+                return False
+            try:
+                expire_job_openings(self.batch_size)
+            except Exception:
+                logger.exception('Closing expired job openings failed')
+            return True
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_scheduler():
+    """
+    Start this process's scheduler thread if JOB_EXPIRY_INTERVAL is set.
+    """
+    global _scheduler
+    interval = get_interval()
+    with _scheduler_lock:
+        if interval > 0 and _scheduler is None:
+            _scheduler = ExpiryScheduler(interval)
+            _scheduler.start()
+    return _scheduler
@@ -0,0 +1,150 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.db.models import Case, CharField, Count, F, Value, When
+from django.db.models.functions import Lower, StrIndex, Substr, Trim
+from django.utils import timezone
+
+# Facet counts for the job opening list: ?facets=true adds
+#
+#   "facets": {
+#       "location": [{"value": "calgary", "label": "Calgary", "count": 12}, ...],
+#       "industry": [{"value": "Energy", "count": 7}, ...],
+#       "salary":   [{"key": "40k-60k", "min": 40000, "max": 60000, "count": 5}, ...],
+#       "deadline": [{"key": "week", "count": 3}, ...]
+#   }
+#
+# to a list page (a bare ?paginate=false list comes back as
+# {"results": [...], "facets": {...}} instead), counted over every row matching the request's filters and
+# search (not just the page). Locations are normalized ("Calgary, AB",
+# " calgary" -> "calgary"), and ?location= matches on the same normalized
+# value, so a location facet selects exactly the rows it counted.
+# Salary buckets come with bounds usable as ?minSalary=/?salaryBelow= (min
+# inclusive, max exclusive, like the buckets; ?maxSalary= is inclusive).
+#
+# All four are counted in one grouped query: one row per combination of
+# (location, industry, salary bucket, deadline window) actually present, summed
+# per facet here. That is one scan of the filtered rows (plus the employer
+# join) instead of a COUNT per facet value. Location and industry keep their
+# FACET_LIMIT most common values.
+
+FACETS_PARAM = 'facets'
+FACET_LIMIT = 20
+
+# (key, min, max)
+SALARY_BUCKETS = [
+    ('under-40k', None, 40000),
+    ('40k-60k', 40000, 60000),
+    ('60k-80k', 60000, 80000),
+    ('80k-100k', 80000, 100000),
+    ('100k-plus', 100000, None),
+]
+# (key, days from today up to which the deadline falls in the window)
+DEADLINE_WINDOWS = [
+    ('expired', -1),
+    ('week', 7),
+    ('month', 30),
+    ('later', None),
+]
+
+
+def wants_facets(request):
+    return request.query_params.get(FACETS_PARAM, '').lower() in ('true', '1', 'yes')
+
+
+def normalized_location():
+    # Lowercased and trimmed, without a ", province" suffix
+    location = Trim('Location')
+    city = Case(
+        When(Location__contains=',', then=Substr(location, 1, StrIndex(location, Value(',')) - 1)),
+        default=location,
+    )
+    return Lower(Trim(city))
+
+
+def normalize_location(value):
+    # normalized_location() of a single value, for ?location=
+    return value.strip().split(',', 1)[0].strip().lower()
+
+
+def salary_bucket():
+    return Case(
+        *[When(Salary__lt=high, then=Value(key)) for key, _, high in SALARY_BUCKETS if high is not None],
+        default=Value(SALARY_BUCKETS[-1][0]),
+        output_field=CharField(),
+    )
+
+
+def deadline_window(today):
+    return Case(
+        *[
+            When(Deadline__lte=today + timedelta(days=days), then=Value(key))
+            for key, days in DEADLINE_WINDOWS if days is not None
+        ],
+        default=Value(DEADLINE_WINDOWS[-1][0]),
+        output_field=CharField(),
+    )
+
+
+def facet_queryset(queryset):
+    return (
+        queryset.order_by()
+        .values(
+            facet_location=normalized_location(),
+            facet_industry=F('Employer__Industry'),
+            facet_salary=salary_bucket(),
+            facet_deadline=deadline_window(timezone.localdate()),
+        )
+        .annotate(facet_count=Count('pk'))
+    )
+
+
+def build_facets(rows):
+    totals = {name: Counter() for name in ('location', 'industry', 'salary', 'deadline')}
+    for row in rows:
+        for name, counter in totals.items():
+            counter[row[f'facet_{name}']] += row['facet_count']
+
+    return {
+        'location': [
+            {'value': value, 'label': value.title(), 'count': count}
+            for value, count in totals['location'].most_common(FACET_LIMIT) if value
+        ],
+        'industry': [
+            {'value': value, 'count': count}
+            for value, count in totals['industry'].most_common(FACET_LIMIT) if value
+        ],
+        'salary': [
+            {'key': key, 'min': low, 'max': high, 'count': totals['salary'][key]}
+            for key, low, high in SALARY_BUCKETS
+        ],
+        'deadline': [{'key': key, 'count': totals['deadline'][key]} for key, _ in DEADLINE_WINDOWS],
+    }
+
+
+def get_facets(queryset):
+    return build_facets(facet_queryset(queryset))
+
+
+async def aget_facets(queryset):
+    return build_facets([row async for row in facet_queryset(queryset)])
+
+
+def with_facets(data, facets):
+    # A bare list (?paginate=false) has no room for them: wrapped like a page
+    if isinstance(data, list):
+        return {'results': data, 'facets': facets}
+    return {**data, 'facets': facets}
+
+
+class FacetedListMixin:
+    """
+    ?facets=true on a JobOpening list page (see above). Goes inside
+    CachedJobOpeningMixin so the counts are cached with the page.
+    """
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200 and wants_facets(request):
+            response.data = with_facets(response.data, get_facets(self.filter_queryset(self.get_queryset())))
+        return response
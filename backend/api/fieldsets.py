@@ -0,0 +1,223 @@
+from collections import namedtuple
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+# Sparse fieldsets, multi-get and expansion for the API read endpoints.
+#
+#   ?fields=JobID,JobTitle            only these fields in each row
+#   ?expand=Employer                  the employer embedded instead of its id
+#   ?expand=Employer&fields=JobTitle,Employer.CompanyName
+#                                     and only some of its fields
+#   ?ids=3,5,8                        just these rows, as one unpaginated list
+#
+# Expansions nest with dots too (?expand=JobID.Employer on applications).
+# The requested fields are loaded with .only(), so a list of job titles
+# never reads the job descriptions, and expanded relations are loaded with
+# select_related() (one JOIN) or prefetch_related() (one query per relation
+# for the whole page) rather than one query per row.
+#
+# Serializers declare what can be expanded and with which serializer in
+# Meta.expandable_fields: {name: 'SerializerName'} for a relation field of
+# the same name, or {name: ('SerializerName', 'source')} for another one,
+# e.g. a reverse relation.
+
+Fieldset = namedtuple('Fieldset', ['fields', 'expand'])
+Fieldset.__doc__ = """
+Parsed ?fields= / ?expand=: `fields` is {name: sub-fields} or None for every
+field, `expand` is {name: sub-expansions}. An empty sub-fields dict also
+means every field of the expanded object.
+"""
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+IDS_PARAM = 'ids'
+MAX_IDS = 200
+
+
+def parse_paths(value):
+    # "a,b.c,b.d" -> {'a': {}, 'b': {'c': {}, 'd': {}}}
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for name in path.strip().split('.'):
+            if name:
+                node = node.setdefault(name, {})
+    return tree
+
+
+def get_fieldset(request):
+    """
+    The Fieldset a request asks for, or None for the full representation.
+    """
+    fields = request.query_params.get(FIELDS_PARAM, '')
+    expand = request.query_params.get(EXPAND_PARAM, '')
+    if not fields.strip(' ,') and not expand.strip(' ,'):
+        return None
+    return Fieldset(parse_paths(fields) or None, parse_paths(expand))
+
+
+def get_ids(request, model):
+    """
+    The primary keys of ?ids=, or None without it.
+    """
+    value = request.query_params.get(IDS_PARAM)
+    if value is None:
+        return None
+    pk_field = model._meta.pk
+    try:
+        ids = [pk_field.to_python(pk.strip()) for pk in value.split(',') if pk.strip()]
+    except DjangoValidationError:
+        raise ValidationError({IDS_PARAM: 'Must be a comma separated list of ids.'})
+    if not 0 < len(ids) <= MAX_IDS:
+        raise ValidationError({IDS_PARAM: f'Give between 1 and {MAX_IDS} ids.'})
+    return ids
+
+
+def unwrap(field):
+    return field.child if isinstance(field, serializers.ListSerializer) else field
+
+
+def get_relation(model, source):
+    # The model field behind a relation attribute, reverse ones included
+    # (source "jobopening_set" is the relation named "jobopening")
+    try:
+        return model._meta.get_field(source)
+    except FieldDoesNotExist:
+        for relation in model._meta.related_objects:
+            if relation.get_accessor_name() == source:
+                return relation
+        raise
+
+
+class FieldsetSerializerMixin:
+    """
+    ModelSerializer mixin rendering only the fields of its `fieldset` and
+    embedding the relations it expands (see above).
+    """
+
+    def __init__(self, *args, fieldset=None, **kwargs):
+        self.fieldset = fieldset
+        super().__init__(*args, **kwargs)
+
+    def get_expandable_fields(self):
+        return getattr(self.Meta, 'expandable_fields', {})
+
+    def get_expanded_field(self, name, fieldset):
+        serializer_class, source = self.get_expandable_fields()[name], name
+        if isinstance(serializer_class, tuple):
+            serializer_class, source = serializer_class
+        if isinstance(serializer_class, str):
+            serializer_class = import_string(f'{type(self).__module__}.{serializer_class}')
+        model_field = get_relation(self.Meta.model, source)
+        kwargs = {'source': source} if source != name else {}
+        return serializer_class(
+            many=model_field.one_to_many or model_field.many_to_many, read_only=True, fieldset=fieldset, **kwargs,
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.fieldset is None:
+            return fields
+        only, expand = self.fieldset
+
+        unknown = [name for name in expand if name not in self.get_expandable_fields()]
+        if unknown:
+            raise ValidationError({EXPAND_PARAM: f'Can\'t expand {", ".join(unknown)}.'})
+        for name, sub_expand in expand.items():
+            fields[name] = self.get_expanded_field(name, Fieldset((only or {}).get(name) or None, sub_expand))
+
+        if only is None:
+            return fields
+        unknown = [name for name in only if name not in fields]
+        unknown += [f'{name}.*' for name, sub_fields in only.items() if sub_fields and name not in expand]
+        if unknown:
+            raise ValidationError({FIELDS_PARAM: f'Unknown fields: {", ".join(unknown)}.'})
+        return {name: field for name, field in fields.items() if name in only}
+
+    def get_queryset_plan(self, prefix='', prefetched=False):
+        """
+        (only, select_related, prefetch_related) lookups loading what this
+        serializer renders; `only` is None when some field isn't a plain
+        model field and everything has to be loaded.
+        """
+        model = self.Meta.model
+        only, select, prefetch = {prefix + model._meta.pk.name}, [], []
+        expanded = self.fieldset.expand if self.fieldset else {}
+        for name, field in self.fields.items():
+            if name in expanded:
+                model_field, path = get_relation(model, field.source), prefix + field.source
+                nested = unwrap(field)
+                if not prefetched and (model_field.many_to_one or model_field.one_to_one) and model_field.concrete:
+                    select.append(path)
+                    sub_only, sub_select, sub_prefetch = nested.get_queryset_plan(path + '__')
+                    only = None if only is None or sub_only is None else only | {path} | sub_only
+                else:
+                    # Rows of other tables: loaded in their own query, whole
+                    prefetch.append(path)
+                    sub_only, sub_select, sub_prefetch = nested.get_queryset_plan(path + '__', prefetched=True)
+                select += sub_select
+                prefetch += sub_prefetch
+                continue
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                model_field = None
+            if model_field is None or not model_field.concrete:
+                only = None
+            elif only is not None:
+                only.add(prefix + field.source)
+        return only, select, prefetch
+
+
+class FieldsetViewMixin:
+    """
+    ?fields=, ?expand= and ?ids= for a viewset's list and retrieve actions
+    (see above). The serializer must use FieldsetSerializerMixin.
+    """
+    fieldset_actions = ('list', 'retrieve')
+
+    def get_request_fieldset(self):
+        if self.action not in self.fieldset_actions or self.request is None:
+            return None
+        return get_fieldset(self.request)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fieldset', self.get_request_fieldset())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_required_fields(self, queryset):
+        # Loaded whatever the fieldset: the cursor is read off the last row of
+        # a page, and ConditionalGetMixin's validator off the row
+        names = [getattr(self, 'updated_field', None)]
+        paginator = self.paginator
+        if paginator is not None and hasattr(paginator, 'get_ordering'):
+            names += [name.lstrip('-') for name in paginator.get_ordering(self.request, queryset, self)]
+        fields = []
+        for name in filter(None, names):
+            try:
+                fields.append(queryset.model._meta.get_field(name).name)
+            except FieldDoesNotExist:
+                pass  # e.g. an annotation
+        return fields
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list':
+            ids = get_ids(self.request, queryset.model)
+            if ids is not None:
+                queryset = queryset.filter(pk__in=ids)
+
+        fieldset = self.get_request_fieldset()
+        if fieldset is None:
+            return queryset
+        only, select, prefetch = self.get_serializer(fieldset=fieldset).get_queryset_plan()
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        if only is not None:
+            queryset = queryset.only(*only, *self.get_required_fields(queryset))
+        return queryset
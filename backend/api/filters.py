@@ -1,11 +1,112 @@
 import django_filters
-from .models import JobOpening
+from django.db.models import Q
+from rest_framework import filters
+from django.utils import timezone
+from rest_framework.exceptions import NotAuthenticated
+from .facets import normalize_location, normalized_location
+from .forum import FEED_ORDERINGS, TOP_WINDOWS
+from .models import JobOpening, Post, ResumeText
+from .search import is_full_text_enabled, search_job_openings, search_resumes
 
 class JobOpeningFilter(django_filters.FilterSet):
-    location = django_filters.CharFilter(field_name='Location', lookup_expr='icontains')
+    # The normalized city the location facet counts (see api/facets.py)
+    location = django_filters.CharFilter(method='filter_location')
     minSalary = django_filters.NumberFilter(field_name='Salary', lookup_expr='gte')
     maxSalary = django_filters.NumberFilter(field_name='Salary', lookup_expr='lte')
+    # Exclusive, for the upper bound of a salary facet bucket (see api/facets.py)
+    salaryBelow = django_filters.NumberFilter(field_name='Salary', lookup_expr='lt')
+    # ?open=true: postings taking applications, read off the partial index on
+    # Active openings (expired ones are closed by api/expiry.py)
+    open = django_filters.BooleanFilter(method='filter_open')
 
     class Meta:
         model = JobOpening
-        fields = ['location', 'minSalary', 'maxSalary']
\ No newline at end of file
+        fields = ['location', 'minSalary', 'maxSalary', 'salaryBelow', 'open']
+
+    def filter_location(self, queryset, name, value):
+        return queryset.alias(location_value=normalized_location()).filter(location_value=normalize_location(value))
+
+    def filter_open(self, queryset, name, value):
+        is_open = Q(Status=JobOpening.STATUS_ACTIVE, Deadline__gte=timezone.localdate())
+        return queryset.filter(is_open) if value else queryset.exclude(is_open)
+
+
+class JobOpeningSearchFilter(filters.SearchFilter):
+    """
+    ?search= for job openings. On PostgreSQL this uses the ranked, prefix
+    matching full-text index (see api/search.py); elsewhere it falls back to
+    the regular icontains search over `search_fields`.
+    """
+    search_ordering = ('-search_rank', '-JobID')
+
+    def filter_queryset(self, request, queryset, view):
+        if not is_full_text_enabled(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        queryset = search_job_openings(queryset, terms)
+        if 'search_rank' not in queryset.query.annotations:
+            return queryset  # nothing searchable in the terms
+        # Ordered here too for ?paginate=false
+        return queryset.order_by(*self.search_ordering)
+
+    def get_cursor_ordering(self, request, queryset, view):
+        # Best matches first while searching, newest first among equal ranks;
+        # the cursor keeps both (see KeysetCursorPagination)
+        if is_full_text_enabled(queryset.db) and self.get_search_terms(request):
+            return self.search_ordering
+        return None
+
+
+class StudentResumeFilter(filters.BaseFilterBackend):
+    """
+    ?resume= for students: those with an uploaded resume whose extracted text
+    (api/resumes.py) matches the search terms. Logged in users only.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = [term for term in request.query_params.get('resume', '').replace(',', ' ').split() if term]
+        if not terms:
+            return queryset
+        if not request.user.is_authenticated:
+            raise NotAuthenticated('Log in to search resumes')
+        return queryset.filter(Email__in=search_resumes(ResumeText.objects.all(), terms).values('Email'))
+
+
+class PostFilter(django_filters.FilterSet):
+    # Plain number filter on the author: no query to validate the UCID
+    VUCID = django_filters.NumberFilter(field_name='VUCID')
+    Date__gte = django_filters.DateFilter(field_name='Date', lookup_expr='gte')
+    Date__lte = django_filters.DateFilter(field_name='Date', lookup_expr='lte')
+    Content__icontains = django_filters.CharFilter(field_name='Content', lookup_expr='icontains')
+
+    class Meta:
+        model = Post
+        fields = ['VUCID']
+
+
+class PostFeedFilter(filters.BaseFilterBackend):
+    """
+    ?sort=hot|new|top orders posts as a feed (see api/forum.py); with
+    ?window=day|week|month|year the top feed only has posts that recent.
+    """
+
+    def get_sort(self, request):
+        sort = request.query_params.get('sort', '').lower()
+        return sort if sort in FEED_ORDERINGS else None
+
+    def filter_queryset(self, request, queryset, view):
+        sort = self.get_sort(request)
+        if sort is None:
+            return queryset
+        window = TOP_WINDOWS.get(request.query_params.get('window', '').lower())
+        if sort == 'top' and window is not None:
+            queryset = queryset.filter(CreatedAt__gte=timezone.now() - window)
+        # Ordered here too for ?paginate=false
+        return queryset.order_by(*FEED_ORDERINGS[sort])
+
+    def get_cursor_ordering(self, request, queryset, view):
+        sort = self.get_sort(request)
+        return FEED_ORDERINGS[sort] if sort else None
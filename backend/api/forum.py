@@ -0,0 +1,139 @@
+import math
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, Max, Min, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Log
+from django.db.models.signals import pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .authentication import get_profile
+from .models import Post, PostVote, Student
+
+# Forum votes and feeds.
+#
+# Each upvote is a post_vote row (one per student and post) and
+# Post.Upvotes holds their count. A vote inserts or deletes its row and moves
+# the counter in the same transaction with UPDATE ... SET "Upvotes" =
+# "Upvotes" + 1, so concurrent votes never lose an increment and nothing ever
+# has to COUNT votes.
+#
+# The "hot" rank is log10(upvotes) + created / 45000s: ten times the votes
+# are worth 12.5 hours of recency. It doesn't depend on the current time, so
+# it is stored in Post.HotScore, set when the post is created and moved by
+# the change in log10(upvotes) in the same UPDATE as the counter. The feeds
+# (?sort=hot|new|top on the post list) are then index scans on the
+# (HotScore|CreatedAt|Upvotes, PostID) indexes, paged with keyset cursors.
+#
+# Writes that skip set_vote() (e.g. deleting votes in bulk) leave the
+# counters stale until `manage.py recount_post_votes` is run.
+
+HOT_SCORE_SECONDS = 45000
+
+FEED_ORDERINGS = {
+    'hot': ('-HotScore', '-PostID'),
+    'new': ('-CreatedAt', '-PostID'),
+    'top': ('-Upvotes', '-PostID'),
+}
+
+# ?window= for the "top" feed
+TOP_WINDOWS = {
+    'day': timedelta(days=1),
+    'week': timedelta(days=7),
+    'month': timedelta(days=30),
+    'year': timedelta(days=365),
+}
+
+
+def hot_score(upvotes, created_at):
+    return math.log10(max(upvotes, 1)) + created_at.timestamp() / HOT_SCORE_SECONDS
+
+
+def log_votes(upvotes):
+    return Log(Value(10), Greatest(upvotes, Value(1)))
+
+
+def move_votes(posts, delta):
+    """
+    Add `delta` to the upvote count of the posts in the queryset, moving
+    their hot score along, in one UPDATE.
+    """
+    return posts.update(
+        Upvotes=F('Upvotes') + delta,
+        HotScore=F('HotScore') + log_votes(F('Upvotes') + delta) - log_votes(F('Upvotes')),
+        UpdatedAt=timezone.now(),
+    )
+
+
+def set_vote(post_id, voter_id, voted):
+    """
+    Add (voted=True) or take back the student's upvote on an existing post.
+    Returns the post's upvote count afterwards.
+    """
+    with transaction.atomic():
+        if voted:
+            try:
+                with transaction.atomic():
+                    PostVote.objects.create(Post_id=post_id, Voter_id=voter_id)
+                changed = True
+            except IntegrityError:
+                changed = False  # voted already
+        else:
+            changed = PostVote.objects.filter(Post_id=post_id, Voter_id=voter_id).delete()[0] > 0
+        posts = Post.objects.filter(pk=post_id)
+        if changed:
+            move_votes(posts, 1 if voted else -1)
+        return posts.values_list('Upvotes', flat=True).get()
+
+
+def get_student_id(user):
+    # From the token claims when available (api.authentication.ClaimsUser)
+    if hasattr(user, 'token'):
+        return user.ucid
+    profile = get_profile(user)
+    return profile.pk if isinstance(profile, Student) else None
+
+
+def author_stats(ucid):
+    """
+    Forum numbers for one student, from one aggregate query, plus their
+    latest posts. None if there is no such student.
+    """
+    votes_cast = (
+        PostVote.objects.filter(Voter=OuterRef('pk')).order_by()
+        .values('Voter').annotate(count=Count('pk')).values('count')
+    )
+    stats = (
+        Student.objects.filter(pk=ucid)
+        .annotate(
+            post_count=Count('post'),
+            upvotes_received=Coalesce(Sum('post__Upvotes'), 0),
+            first_post=Min('post__CreatedAt'),
+            last_post=Max('post__CreatedAt'),
+            votes_cast=Coalesce(Subquery(votes_cast, output_field=IntegerField()), 0),
+        )
+        .values('UCID', 'post_count', 'upvotes_received', 'votes_cast', 'first_post', 'last_post')
+        .first()
+    )
+    if stats is None:
+        return None
+    stats['score'] = stats['post_count'] + stats['upvotes_received']
+    stats['recent_posts'] = list(
+        Post.objects.filter(VUCID=ucid).order_by('-CreatedAt', '-PostID')
+        .values('PostID', 'Content', 'Date', 'Upvotes')[:3]
+    )
+    return stats
+
+
+@receiver(pre_save, sender=Post)
+def set_hot_score(sender, instance, **kwargs):
+    if instance._state.adding:
+        instance.HotScore = hot_score(instance.Upvotes, instance.CreatedAt)
+
+
+@receiver(pre_delete, sender=Student)
+def withdraw_votes(sender, instance, **kwargs):
+    # The student's votes are deleted by cascade, which doesn't go through
+    # set_vote(); their own posts are going anyway
+    move_votes(Post.objects.filter(postvote__Voter=instance).exclude(VUCID=instance), -1)
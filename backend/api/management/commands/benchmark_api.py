@@ -0,0 +1,383 @@
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import date
+
+from asgiref.sync import ThreadSensitiveContext
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+
+from api.management.commands.benchmark_reads import QUERIES_RE, percentile
+from api.models import CustomUser, JobOpening, Moderator, Post, Student, VerifyApplicant
+from api.serializers import CustomTokenObtainPairSerializer
+
+# Accounts created by the benchmark; only these log in with the password
+BENCHMARK_PASSWORD = 'NextStep-benchmark-1'
+BENCHMARK_BIO = 'benchmark account'
+# Students generated in the throwaway database unless --seed says otherwise
+DEFAULT_SEED = 200
+SEARCH_TERMS = ['developer', 'analyst', 'engineer', 'intern', 'nurse', 'research']
+LOCATIONS = ['calgary', 'edmonton', 'remote', 'vancouver']
+
+# (scenario, weight): the share of the traffic each one gets
+TRAFFIC_MIX = [
+    ('jobs.browse', 25), ('jobs.detail', 15), ('jobs.search', 10), ('jobs.filter', 10),
+    ('forum.feed', 10), ('forum.upvote', 5), ('login', 3), ('apply', 7),
+    ('moderation.queue', 10), ('moderation.detail', 5),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Load benchmark of the API: drives a mixed workload (job browsing, '
+        'search and filters, login, applying, the moderator queue, the forum) '
+        'through the full middleware stack in-process, under WSGI or ASGI, and '
+        'reports throughput, p50/p95/p99 latency and queries per request for '
+        'each scenario. --output saves the results as JSON; --baseline compares '
+        'them with a saved run and fails on regressions. It writes (accounts, '
+        'logins, applications, votes), so it runs in a throwaway test database '
+        'seeded with --seed N students, unless --scratch-database says the '
+        'configured database may be written to.'
+    )
+
+    modes = ('wsgi', 'asgi')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int,
+                            help='First generate data for this many students (see generate_data); '
+                                 f'{DEFAULT_SEED} in the throwaway database, none with --scratch-database.')
+        parser.add_argument('--scratch-database', action='store_true',
+                            help='Run against DATABASES["default"] instead of a throwaway test database. '
+                                 'Everything the benchmark writes stays there, except its accounts.')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per run.')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--mode', choices=self.modes, default='wsgi')
+        parser.add_argument('--scenario', choices=[name for name, _ in TRAFFIC_MIX], action='append',
+                            help='Scenario(s) to run; the whole mix by default.')
+        parser.add_argument('--accounts', type=int, default=20, help='Student accounts sending the traffic.')
+        parser.add_argument('--random-seed', type=int, default=0,
+                            help='Seed of the workload; the same seed sends the same requests.')
+        parser.add_argument('--with-cache', action='store_true',
+                            help='Keep the job cache on (off by default so every request hits the database).')
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--baseline', help='JSON results of an earlier run to compare with.')
+        parser.add_argument('--max-latency-regression', type=float, default=0.25,
+                            help='Fail when a scenario\'s p95 latency grows by more than this fraction.')
+        parser.add_argument('--max-throughput-drop', type=float, default=0.2,
+                            help='Fail when the overall throughput drops by more than this fraction.')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+
+    def handle(self, *args, **options):
+        # No line per request, but never louder than configured
+        query_logger = logging.getLogger('api.queries')
+        query_logger.setLevel(max(query_logger.getEffectiveLevel(), logging.WARNING))
+        baseline = self.read_baseline(options['baseline']) if options['baseline'] else None
+        if options['scratch_database']:
+            return self.benchmark(options, baseline, {})
+
+        # A fresh database like the test runner's, dropped afterwards; reads
+        # stay on it rather than going to the configured replicas
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={DEFAULT_DB_ALIAS})
+        try:
+            seed = DEFAULT_SEED if options['seed'] is None else options['seed']
+            self.benchmark({**options, 'seed': seed}, baseline, {'REPLICA_DATABASES': []})
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    def benchmark(self, options, baseline, overrides):
+        if options['seed']:
+            call_command('generate_data', students=options['seed'], stdout=self.stdout, stderr=self.stderr)
+
+        context = self.get_context(options['accounts'])
+        try:
+            self.run_benchmark(options, baseline, overrides, context)
+        finally:
+            # The accounts get_context() created, with BENCHMARK_PASSWORD
+            CustomUser.objects.filter(email__in=context['created'], bio=BENCHMARK_BIO).delete()
+
+    def run_benchmark(self, options, baseline, overrides, context):
+        mix = [(name, weight) for name, weight in TRAFFIC_MIX if name in (options['scenario'] or [name])]
+        mix = [(name, weight) for name, weight in mix if self.can_run(name, context)]
+        if not mix:
+            raise CommandError('Nothing to request; seed the database with --seed N.')
+
+        rng = random.Random(options['random_seed'])
+        names, weights = zip(*mix)
+        workload = [
+            (name, getattr(self, 'request_' + name.replace('.', '_'))(rng, context))
+            for name in rng.choices(names, weights, k=options['requests'])
+        ]
+
+        overrides = {**overrides, 'ALLOWED_HOSTS': ['testserver'], 'DEBUG': False}
+        if not options['with_cache']:
+            overrides['JOB_CACHE_TIMEOUT'] = 0
+        with override_settings(**overrides):
+            if options['mode'] == 'wsgi':
+                samples, elapsed = self.run_threads(workload, options['concurrency'])
+            else:
+                samples, elapsed = asyncio.run(self.run_async(workload, options['concurrency']))
+
+        results = {
+            'meta': {
+                'started_at': timezone.now().isoformat(),
+                'mode': options['mode'],
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'random_seed': options['random_seed'],
+                'database': connection.vendor,
+                'rows': {
+                    'job_openings': JobOpening.objects.count(),
+                    'posts': Post.objects.count(),
+                    'students': Student.objects.count(),
+                },
+            },
+            **self.summarize(samples, elapsed),
+        }
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(results, file, indent=2)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            self.print_table(results)
+
+        if baseline is not None:
+            differing = [
+                key for key in ('mode', 'requests', 'concurrency', 'random_seed', 'database')
+                if baseline.get('meta', {}).get(key) != results['meta'][key]
+            ]
+            if differing:
+                self.stderr.write(f'The baseline ran with a different {", ".join(differing)}.')
+            regressions = self.compare(baseline, results, options)
+            if regressions:
+                raise CommandError('Regressions against the baseline:\n  ' + '\n  '.join(regressions))
+            self.stdout.write('No regressions against the baseline.')
+
+    def read_baseline(self, path):
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Can\'t read the baseline {path}: {exc}')
+
+    def get_context(self, account_count):
+        # The rows the requests refer to, and accounts (with tokens) to send them
+        students = list(Student.objects.order_by('UCID')[:account_count])
+        moderator_ids = set(
+            Moderator.objects.filter(pk__in=[student.pk for student in students]).values_list('pk', flat=True)
+        )
+        emails = [student.Email for student in students]
+        existing = set(CustomUser.objects.filter(email__in=emails).values_list('email', flat=True))
+        password = make_password(BENCHMARK_PASSWORD)  # hashed once for every account
+        created = [email for email in emails if email not in existing]
+        CustomUser.objects.bulk_create([
+            CustomUser(username=email, email=email, password=password, user_type='student', bio=BENCHMARK_BIO)
+            for email in created
+        ])
+        users = {user.email: user for user in CustomUser.objects.filter(email__in=emails)}
+
+        accounts = []
+        for student in students:
+            user = users[student.Email]
+            accounts.append({
+                'ucid': student.pk,
+                'email': student.Email,
+                'token': str(CustomTokenObtainPairSerializer.get_token(user).access_token),
+                'moderator': student.pk in moderator_ids,
+                'can_login': user.bio == BENCHMARK_BIO,
+            })
+        # Jobs taking applications, so that applying to them succeeds
+        jobs = JobOpening.objects.filter(
+            Status=JobOpening.STATUS_ACTIVE, Deadline__gte=timezone.localdate(),
+        ).values_list('JobID', 'Employer_id')
+        return {
+            'created': created,
+            'accounts': accounts,
+            'logins': [account for account in accounts if account['can_login']],
+            'moderators': [account for account in accounts if account['moderator']],
+            'jobs': list(jobs[:500]),
+            'posts': list(Post.objects.values_list('PostID', flat=True)[:500]),
+            'verifications': list(VerifyApplicant.objects.values_list('VID', flat=True)[:500]),
+        }
+
+    def can_run(self, name, context):
+        needs = {
+            'jobs': ('jobs',), 'forum': ('posts',), 'login': ('logins',), 'apply': ('jobs', 'accounts'),
+            'moderation': ('moderators', 'verifications'),
+        }[name.split('.')[0]]
+        if name == 'forum.upvote':
+            needs += ('accounts',)
+        return all(context[need] for need in needs)
+
+    # Requests as (method, path, data, token)
+
+    def request_jobs_browse(self, rng, context):
+        return 'GET', rng.choice(['/api/job-opening/', '/api/job-opening/?page_size=50']), None, None
+
+    def request_jobs_detail(self, rng, context):
+        return 'GET', f'/api/job-opening/{rng.choice(context["jobs"])[0]}/', None, None
+
+    def request_jobs_search(self, rng, context):
+        return 'GET', f'/api/job-opening/?search={rng.choice(SEARCH_TERMS)}', None, None
+
+    def request_jobs_filter(self, rng, context):
+        min_salary = rng.randrange(30000, 90000, 5000)
+        return 'GET', f'/api/job-opening/?location={rng.choice(LOCATIONS)}&minSalary={min_salary}', None, None
+
+    def request_forum_feed(self, rng, context):
+        return 'GET', f'/api/posts/?sort={rng.choice(["hot", "new", "top"])}', None, None
+
+    def request_forum_upvote(self, rng, context):
+        token = rng.choice(context['accounts'])['token']
+        return 'POST', f'/api/posts/{rng.choice(context["posts"])}/upvote/', {}, token
+
+    def request_login(self, rng, context):
+        email = rng.choice(context['logins'])['email']
+        return 'POST', '/api/login/', {'email': email, 'password': BENCHMARK_PASSWORD}, None
+
+    def request_apply(self, rng, context):
+        account = rng.choice(context['accounts'])
+        job_id, employer_id = rng.choice(context['jobs'])
+        data = {
+            'ApplicantUCID': account['ucid'], 'JobID': job_id, 'EmployerID': employer_id,
+            'Status': 'Submitted', 'DateApplied': date.today().isoformat(),
+        }
+        return 'POST', '/api/job-applications/', data, account['token']
+
+    def request_moderation_queue(self, rng, context):
+        token = rng.choice(context['moderators'])['token']
+        return 'GET', '/api/applicant-verifications/queue/', None, token
+
+    def request_moderation_detail(self, rng, context):
+        token = rng.choice(context['moderators'])['token']
+        return 'GET', f'/api/applicant-verifications/{rng.choice(context["verifications"])}/', None, token
+
+    def send(self, client, spec):
+        # Returns the response, or with the AsyncClient a coroutine of it
+        method, path, data, token = spec
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        if method == 'GET':
+            return client.get(path, headers=headers)
+        return client.post(path, data, content_type='application/json', headers=headers)
+
+    def run_threads(self, workload, concurrency):
+        samples = []
+        queue = iter(workload)
+        lock = threading.Lock()
+
+        def worker():
+            client = Client()
+            while True:
+                with lock:
+                    item = next(queue, None)
+                if item is None:
+                    break
+                name, spec = item
+                start = time.perf_counter()
+                response = self.send(client, spec)
+                samples.append((name, time.perf_counter() - start, response))
+
+        start = time.perf_counter()
+        if concurrency <= 1:
+            worker()  # in this thread, on this thread's connection
+        else:
+            def run():
+                try:
+                    worker()
+                finally:
+                    connections.close_all()
+
+            threads = [threading.Thread(target=run) for _ in range(concurrency)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return samples, time.perf_counter() - start
+
+    async def run_async(self, workload, concurrency):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+        samples = []
+
+        async def fetch(name, spec):
+            # Like the ASGI handler, give each request its own sync thread
+            async with semaphore, ThreadSensitiveContext():
+                start = time.perf_counter()
+                response = await self.send(client, spec)
+                samples.append((name, time.perf_counter() - start, response))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(fetch(name, spec) for name, spec in workload))
+        return samples, time.perf_counter() - start
+
+    def summarize(self, samples, elapsed):
+        groups = defaultdict(list)
+        for name, latency, response in samples:
+            groups[name].append((latency, response))
+        scenarios = {name: self.stats(groups[name], elapsed) for name, _ in TRAFFIC_MIX if name in groups}
+        everything = [(latency, response) for _, latency, response in samples]
+        return {'scenarios': scenarios, 'total': self.stats(everything, elapsed)}
+
+    def stats(self, samples, elapsed):
+        latencies = sorted(latency for latency, _ in samples)
+        queries = [
+            int(match.group(1))
+            for _, response in samples
+            if (match := QUERIES_RE.search(response.get('Server-Timing', '')))
+        ]
+        return {
+            'requests': len(samples),
+            'errors': sum(1 for _, response in samples if response.status_code >= 400),
+            'throughput': round(len(samples) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+        }
+
+    def print_table(self, results):
+        self.stdout.write(
+            f'{"scenario":<20}{"requests":>9}{"req/s":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}'
+            f'{"queries":>9}{"errors":>8}'
+        )
+        rows = [*results['scenarios'].items(), ('total', results['total'])]
+        for name, row in rows:
+            queries = row['queries_per_request']
+            self.stdout.write(
+                f'{name:<20}{row["requests"]:>9}{row["throughput"]:>9.1f}{row["p50_ms"]:>9.2f}{row["p95_ms"]:>9.2f}'
+                f'{row["p99_ms"]:>9.2f}{queries if queries is not None else "-":>9}{row["errors"]:>8}'
+            )
+
+    def compare(self, baseline, results, options):
+        """
+        What got worse since the baseline run, as messages.
+        """
+        regressions = []
+        old_total, new_total = baseline.get('total', {}), results['total']
+        if old_total.get('throughput') and \
+                new_total['throughput'] < old_total['throughput'] * (1 - options['max_throughput_drop']):
+            regressions.append(f'throughput {old_total["throughput"]} -> {new_total["throughput"]} req/s')
+
+        for name, new in results['scenarios'].items():
+            old = baseline.get('scenarios', {}).get(name)
+            if not old:
+                continue
+            if old.get('p95_ms') and new['p95_ms'] > old['p95_ms'] * (1 + options['max_latency_regression']):
+                regressions.append(f'{name}: p95 {old["p95_ms"]} -> {new["p95_ms"]} ms')
+            # Averages over a random mix: allow for rounding
+            old_queries, new_queries = old.get('queries_per_request'), new['queries_per_request']
+            if old_queries is not None and new_queries is not None and new_queries > old_queries + 0.05:
+                regressions.append(f'{name}: {old_queries} -> {new_queries} queries per request')
+            if new['errors'] / new['requests'] > old.get('errors', 0) / max(old.get('requests', 1), 1) + 0.01:
+                regressions.append(f'{name}: {old.get("errors", 0)} -> {new["errors"]} errors')
+        return regressions
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import logging
+import random
+import re
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from asgiref.sync import ThreadSensitiveContext
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import setup_databases, teardown_databases
+from django.urls import include, path
+
+from api.async_views import with_async_reads
+from api.models import Employer, JobOpening, Post, Student
+from api.urls import ASYNC_READ_VIEWSETS, router
+
+QUERIES_RE = re.compile(r'desc="(\d+) queries')
+# Job openings and posts seeded in the throwaway database
+DEFAULT_SEED = 500
+
+
+class SyncURLConf:
+    urlpatterns = [path('api/', include(router.urls))]
+
+
+class AsyncURLConf:
+    urlpatterns = [path('api/', include(with_async_reads(router.urls, ASYNC_READ_VIEWSETS)))]
+
+
+def percentile(samples, q):
+    return samples[min(len(samples) - 1, int(round(q * (len(samples) - 1))))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the public job/post read endpoints: synchronous DRF views '
+        'under WSGI, the same views under ASGI, and the native async read views '
+        'under ASGI. Requests go through the Django test clients (full '
+        'middleware stack, no network). Runs in a throwaway test database '
+        'seeded with --seed N rows, unless --scratch-database says the '
+        'configured database may be read (and seeded).'
+    )
+
+    modes = ('wsgi', 'asgi-sync', 'asgi-async')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int,
+                            help='Create this many job openings and posts before running; '
+                                 f'{DEFAULT_SEED} in the throwaway database, none with --scratch-database.')
+        parser.add_argument('--scratch-database', action='store_true',
+                            help='Run against DATABASES["default"] instead of a throwaway test database. '
+                                 'Rows created with --seed stay there.')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per mode.')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--mode', choices=self.modes, action='append',
+                            help='Mode(s) to run; all of them by default.')
+        parser.add_argument('--with-cache', action='store_true',
+                            help='Keep the job cache on (off by default so every request hits the database).')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+
+    def handle(self, *args, **options):
+        # No line per request, but never louder than configured
+        query_logger = logging.getLogger('api.queries')
+        query_logger.setLevel(max(query_logger.getEffectiveLevel(), logging.WARNING))
+        if options['scratch_database']:
+            return self.benchmark(options, {})
+
+        # A fresh database like the test runner's, dropped afterwards; reads
+        # stay on it rather than going to the configured replicas
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={DEFAULT_DB_ALIAS})
+        try:
+            seed = DEFAULT_SEED if options['seed'] is None else options['seed']
+            self.benchmark({**options, 'seed': seed}, {'REPLICA_DATABASES': []})
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    def benchmark(self, options, overrides):
+        if options['seed']:
+            self.seed(options['seed'])
+
+        paths = self.get_paths()
+        if not paths:
+            self.stderr.write('No job openings or posts to read; run with --seed N.')
+            return
+
+        rng = random.Random(0)
+        workload = [rng.choice(paths) for _ in range(options['requests'])]
+        overrides = {**overrides, 'ALLOWED_HOSTS': ['testserver'], 'DEBUG': False}
+        if not options['with_cache']:
+            overrides['JOB_CACHE_TIMEOUT'] = 0
+
+        results = []
+        for mode in options['mode'] or self.modes:
+            # Once for the whole run: override_settings swaps process-wide
+            # settings and clears the URL caches, so not per thread
+            urlconf = AsyncURLConf if mode == 'asgi-async' else SyncURLConf
+            with override_settings(ROOT_URLCONF=urlconf, **overrides):
+                if mode == 'wsgi':
+                    samples = self.run_threads(workload, options['concurrency'])
+                else:
+                    samples = asyncio.run(self.run_async(workload, options['concurrency']))
+            results.append(self.summarize(mode, samples))
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f'{"mode":<12}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"queries":>9}{"errors":>8}')
+        for row in results:
+            self.stdout.write(
+                f'{row["mode"]:<12}{row["throughput"]:>10.1f}{row["p50_ms"]:>10.2f}{row["p95_ms"]:>10.2f}'
+                f'{row["p99_ms"]:>10.2f}{row["queries_per_request"]:>9.2f}{row["errors"]:>8}'
+            )
+
+    def seed(self, count):
+        today = date.today()
+        employer = Employer.objects.create(
+            CompanyName='Benchmark Inc', Email=f'bench{time.time_ns()}@example.com', VerificationStatus='Approved',
+        )
+        student = Student.objects.order_by('UCID').last()
+        if student is None:
+            student = Student.objects.create(UCID=39999999, FName='Bench', LName='Mark', Email='bench@ucalgary.ca')
+        JobOpening.objects.bulk_create([
+            JobOpening(
+                Employer=employer, JobTitle=f'Developer {i}', Description='Benchmark job',
+                Salary=Decimal(40000 + i % 60 * 1000), Location=random.choice(['Calgary', 'Edmonton', 'Remote']),
+                Deadline=today + timedelta(days=i % 90), Status=JobOpening.STATUS_ACTIVE,
+            )
+            for i in range(count)
+        ], batch_size=1000)
+        Post.objects.bulk_create([
+            Post(VUCID=student, Content=f'Benchmark post {i}', Date=today - timedelta(days=i % 365))
+            for i in range(count)
+        ], batch_size=1000)
+        self.stdout.write(f'Seeded {count} job openings and {count} posts.')
+
+    def get_paths(self):
+        job_ids = list(JobOpening.objects.values_list('JobID', flat=True)[:200])
+        post_ids = list(Post.objects.values_list('PostID', flat=True)[:200])
+        paths = []
+        if job_ids:
+            paths += ['/api/job-opening/', '/api/job-opening/?location=calgary', '/api/job-opening/?page_size=20']
+            paths += [f'/api/job-opening/{pk}/' for pk in job_ids[:20]]
+        if post_ids:
+            paths += ['/api/posts/']
+            paths += [f'/api/posts/{pk}/' for pk in post_ids[:20]]
+        return paths
+
+    def run_threads(self, workload, concurrency):
+        samples = []
+        queue = iter(workload)
+        lock = threading.Lock()
+
+        def worker():
+            client = Client()
+            while True:
+                with lock:
+                    url = next(queue, None)
+                if url is None:
+                    break
+                samples.append(self.timed(client.get, url))
+            connections.close_all()
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return samples, time.perf_counter() - start
+
+    async def run_async(self, workload, concurrency):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+        samples = []
+
+        async def fetch(url):
+            # Like the ASGI handler, give each request its own sync thread
+            async with semaphore, ThreadSensitiveContext():
+                start = time.perf_counter()
+                response = await client.get(url)
+                samples.append((time.perf_counter() - start, response))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(fetch(url) for url in workload))
+        return samples, time.perf_counter() - start
+
+    def timed(self, get, url):
+        start = time.perf_counter()
+        response = get(url)
+        return time.perf_counter() - start, response
+
+    def summarize(self, mode, run):
+        samples, elapsed = run
+        latencies = sorted(latency for latency, _ in samples)
+        queries = [
+            int(match.group(1))
+            for _, response in samples
+            if (match := QUERIES_RE.search(response.get('Server-Timing', '')))
+        ]
+        return {
+            'mode': mode,
+            'requests': len(samples),
+            'errors': sum(1 for _, response in samples if response.status_code >= 400),
+            'seconds': round(elapsed, 3),
+            'throughput': round(len(samples) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+        }
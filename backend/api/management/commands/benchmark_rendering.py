@@ -0,0 +1,120 @@
+import gzip
+import json
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.compression import brotli, brotli_compress
+from api.models import Employer, JobApplication, JobOpening, Student
+from api.renderers import ORJSONRenderer, is_available as orjson_available
+from api.serializers import JobApplicationSerializer, JobOpeningSerializer
+
+
+def build_jobs(count):
+    employer = Employer(EmployerID=1, CompanyName='Benchmark Inc', Email='bench@example.com')
+    now = timezone.now()
+    return [
+        JobOpening(
+            JobID=i + 1, Employer=employer, JobTitle=f'Software Developer {i}',
+            Description='Design, build and maintain services for our customers. ' * 8,
+            Salary=Decimal(40000 + i % 60 * 1000) + Decimal('0.50'), Location=('Calgary', 'Edmonton', 'Remote')[i % 3],
+            Deadline=date.today() + timedelta(days=i % 90), Status=JobOpening.STATUS_ACTIVE,
+            PostedAt=now, UpdatedAt=now,
+        )
+        for i in range(count)
+    ]
+
+
+def build_applications(count):
+    employer = Employer(EmployerID=1, CompanyName='Benchmark Inc', Email='bench@example.com')
+    student = Student(UCID=30000001, FName='Bench', LName='Mark', Email='bench@ucalgary.ca')
+    job = JobOpening(JobID=1, Employer=employer)
+    now = timezone.now()
+    return [
+        JobApplication(
+            ApplicationID=i + 1, ApplicantUCID=student, JobID=job, EmployerID=employer,
+            Status=('Submitted', 'Under Review', 'Accepted')[i % 3], DateApplied=date.today(), UpdatedAt=now,
+        )
+        for i in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Micro-benchmark of the list payloads: serializing job openings and '
+        'job applications, rendering them with DRF\'s JSONRenderer and with '
+        'the orjson renderer (api/renderers.py), and compressing the result '
+        'with gzip and brotli. Rows are built in memory; no database needed.'
+    )
+
+    payloads = {
+        'job-openings': (build_jobs, JobOpeningSerializer),
+        'job-applications': (build_applications, JobApplicationSerializer),
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200, help='Rows per payload (one list page).')
+        parser.add_argument('--repeat', type=int, default=50, help='Timed runs per step; the median is reported.')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+
+    def handle(self, *args, **options):
+        renderers = {'drf-json': JSONRenderer()}
+        if orjson_available():
+            renderers['orjson'] = ORJSONRenderer()
+        else:
+            self.stderr.write('orjson is not installed; only timing the DRF renderer.')
+
+        results = []
+        for name, (build, serializer_class) in self.payloads.items():
+            rows = build(options['rows'])
+            serialize_ms, data = self.timed(lambda: serializer_class(rows, many=True).data, options['repeat'])
+            for renderer_name, renderer in renderers.items():
+                render_ms, content = self.timed(lambda: renderer.render(data), options['repeat'])
+                result = {
+                    'payload': name,
+                    'renderer': renderer_name,
+                    'rows': len(rows),
+                    'serialize_ms': round(serialize_ms, 3),
+                    'render_ms': round(render_ms, 3),
+                    'rows_per_second': round(len(rows) / ((serialize_ms + render_ms) / 1000)),
+                    'bytes': len(content),
+                }
+                for encoding, compress in self.compressors().items():
+                    compress_ms, compressed = self.timed(lambda: compress(content), options['repeat'])
+                    result[f'{encoding}_bytes'] = len(compressed)
+                    result[f'{encoding}_ms'] = round(compress_ms, 3)
+                results.append(result)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f'{"payload":<18}{"renderer":<10}{"serialize ms":>13}{"render ms":>11}{"rows/s":>10}'
+            f'{"bytes":>10}{"gzip":>9}{"br":>9}'
+        )
+        for row in results:
+            self.stdout.write(
+                f'{row["payload"]:<18}{row["renderer"]:<10}{row["serialize_ms"]:>13.3f}{row["render_ms"]:>11.3f}'
+                f'{row["rows_per_second"]:>10}{row["bytes"]:>10}{row["gzip_bytes"]:>9}{row.get("br_bytes", "-"):>9}'
+            )
+
+    def compressors(self):
+        # At the levels CompressionMiddleware uses
+        compressors = {'gzip': lambda content: gzip.compress(content, compresslevel=6)}
+        if brotli is not None:
+            compressors['br'] = brotli_compress
+        return compressors
+
+    def timed(self, func, repeat):
+        # Median wall time in ms, and the last result
+        timings = []
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            result = func()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return timings[len(timings) // 2], result
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from api import expiry
+
+
+class Command(BaseCommand):
+    help = (
+        'Close the active job openings whose Deadline has passed (api/expiry.py), '
+        'in batches. Run it daily from cron, or keep it running with --every.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=expiry.get_batch_size(), help='Rows per UPDATE.')
+        parser.add_argument('--every', type=int, default=0,
+                            help='Keep running, closing expired openings every this many seconds.')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the expired openings.')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.stdout.write(f'{expiry.expired_job_openings().count()} job openings are past their deadline.')
+            return
+        if options['every']:
+            scheduler = expiry.ExpiryScheduler(options['every'], options['batch_size'])
+            try:
+                scheduler.run()
+            except KeyboardInterrupt:
+                scheduler.stop()
+            return
+        closed = expiry.expire_job_openings(options['batch_size'])
+        self.stdout.write(f'Closed {closed} expired job openings.')
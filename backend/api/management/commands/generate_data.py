@@ -0,0 +1,246 @@
+import random
+import time
+from array import array
+from datetime import datetime, time as dt_time, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from api.bulkload import DEFAULT_BATCH_SIZE, load_rows, next_pk, reset_sequences, uses_copy
+from api.cache import invalidate_job_openings
+from api.forum import hot_score
+from api.models import (
+    Employer, JobApplication, JobOpening, Moderator, Post, Student, VerifyApplicant, VerifyEmployer,
+)
+from api.stats import is_summary_enabled, refresh_application_summary
+
+FIRST_NAMES = [
+    'Aisha', 'Ben', 'Chen', 'Daniel', 'Emma', 'Fatima', 'Gabriel', 'Hana', 'Ivan', 'Jasmine', 'Kai', 'Liam',
+    'Maria', 'Noah', 'Olivia', 'Priya', 'Quinn', 'Ravi', 'Sofia', 'Tariq', 'Uma', 'Victor', 'Wei', 'Yuki', 'Zara',
+]
+LAST_NAMES = [
+    'Anderson', 'Brown', 'Chen', 'Dhillon', 'Evans', 'Fraser', 'Gill', 'Huang', 'Ibrahim', 'Johnson', 'Kim',
+    'Lee', 'MacDonald', 'Nguyen', 'Okafor', 'Patel', 'Roy', 'Singh', 'Tremblay', 'Wong', 'Zhang',
+]
+MAJORS = [
+    'Computer Science', 'Software Engineering', 'Electrical Engineering', 'Mechanical Engineering', 'Geology',
+    'Business Analytics', 'Finance', 'Psychology', 'Biology', 'Mathematics', 'Economics', 'Nursing',
+]
+INDUSTRIES = [
+    'Technology', 'Energy', 'Finance', 'Healthcare', 'Education', 'Retail', 'Consulting', 'Government',
+    'Manufacturing', 'Agriculture',
+]
+COMPANY_WORDS = [
+    'Prairie', 'Chinook', 'Bow', 'Summit', 'Aurora', 'Foothills', 'Northern', 'Maple', 'Glacier', 'Boreal',
+]
+COMPANY_SUFFIXES = ['Labs', 'Energy', 'Systems', 'Partners', 'Analytics', 'Health', 'Solutions', 'Group']
+# (title, base salary)
+JOB_TITLES = [
+    ('Software Developer', 75000), ('Data Analyst', 65000), ('Field Geologist', 70000),
+    ('Financial Analyst', 68000), ('Research Assistant', 42000), ('Marketing Coordinator', 50000),
+    ('Mechanical Engineer in Training', 72000), ('Registered Nurse', 80000), ('IT Support Technician', 52000),
+    ('Summer Intern', 38000),
+]
+# As entered by employers, spelling variants and all
+LOCATIONS = [
+    'Calgary', 'Calgary, AB', 'calgary', 'Edmonton', 'Edmonton, AB', 'Remote', 'remote', 'Vancouver, BC',
+    'Toronto, ON', 'Red Deer', 'Banff',
+]
+SENTENCES = [
+    'You will work with a small team on products used across Alberta.',
+    'Strong written and verbal communication skills are required.',
+    'Experience with Python, SQL or similar tools is an asset.',
+    'This position offers flexible hours and mentorship.',
+    'Candidates should be enrolled in or recently graduated from a related program.',
+    'Some travel to site locations may be required.',
+]
+APPLICATION_STATUSES = ['Submitted', 'Under Review', 'Interview Scheduled', 'Accepted', 'Rejected']
+APPLICATION_WEIGHTS = [40, 25, 15, 5, 15]
+VERIFICATION_STATUSES = ['Pending', 'Approved', 'Rejected']
+VERIFICATION_WEIGHTS = [20, 70, 10]
+MAX_UCID = 39999999
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with synthetic, referentially consistent data for '
+        'scale testing: students, moderators, employers, job openings, job '
+        'applications, posts and verification rows. Counts default to ratios '
+        'of --students. Rows are streamed in with COPY on PostgreSQL and '
+        'batched INSERTs elsewhere (api/bulkload.py). Applicant rows are '
+        'not generated (they need resume files). Use a scratch database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--moderators', type=int, help='Default: one per 1000 students, at least 1.')
+        parser.add_argument('--employers', type=int,
+                            help='Default: one per 20 students. Each gets a verification row.')
+        parser.add_argument('--jobs', type=int, help='Default: 5 per employer.')
+        parser.add_argument('--applications', type=int, help='Default: 3 per student.')
+        parser.add_argument('--posts', type=int, help='Default: one per 2 students.')
+        parser.add_argument('--verifications', type=int,
+                            help='Applicant verification rows. Default: one per 4 students.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed gives the same data.')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows per COPY/INSERT.')
+
+    def handle(self, *args, **options):
+        students = options['students']
+
+        def count(name, default):
+            return options[name] if options[name] is not None else default
+
+        counts = {
+            'students': students,
+            'moderators': count('moderators', min(students, max(1, students // 1000))),
+            'employers': count('employers', max(1, students // 20)),
+            'applications': count('applications', students * 3),
+            'posts': count('posts', students // 2),
+            'verifications': count('verifications', students // 4),
+        }
+        counts['jobs'] = count('jobs', counts['employers'] * 5)
+        if min(counts.values()) < 0:
+            raise CommandError('Counts must not be negative.')
+        if counts['moderators'] > students:
+            raise CommandError('Moderators are students: --moderators can\'t exceed --students.')
+        for name, needs in (('applications', ('students', 'jobs')), ('posts', ('students',)),
+                            ('jobs', ('employers',)), ('employers', ('moderators',)),
+                            ('verifications', ('students', 'moderators'))):
+            if counts[name] and not all(counts[need] for need in needs):
+                raise CommandError(f'Generating {name} needs {" and ".join(needs)}.')
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.today = timezone.localdate()
+
+        self.first_ucid = next_pk(Student, start=30000000)
+        if self.first_ucid + students - 1 > MAX_UCID:
+            raise CommandError(f'Only {MAX_UCID - self.first_ucid + 1} UCIDs are left.')
+        self.first_employer = next_pk(Employer)
+        self.first_job = next_pk(JobOpening)
+
+        self.stdout.write(f'Loading with {"COPY" if uses_copy() else "batched INSERTs"}.')
+        start = time.perf_counter()
+        with transaction.atomic():
+            self.load(Student, ['UCID', 'FName', 'LName', 'Email', 'Major', 'GraduationYear', 'UpdatedAt'],
+                      self.students(students))
+            self.load(Moderator, ['ModeratorID', 'UpdatedAt'],
+                      ((self.first_ucid + i, self.now) for i in range(counts['moderators'])))
+            employer_statuses = [
+                self.rng.choices(VERIFICATION_STATUSES, VERIFICATION_WEIGHTS)[0] for _ in range(counts['employers'])
+            ]
+            self.load(Employer, ['EmployerID', 'CompanyName', 'Email', 'Industry', 'Website', 'Description',
+                                 'VerificationStatus', 'UpdatedAt'], self.employers(employer_statuses))
+            # Employer of each job, so applications can name the right one
+            job_employers = array('l', (
+                self.first_employer + self.rng.randrange(counts['employers']) for _ in range(counts['jobs'])
+            ))
+            self.load(JobOpening, ['JobID', 'Employer', 'JobTitle', 'Description', 'Salary', 'Location',
+                                   'Deadline', 'Status', 'PostedAt', 'UpdatedAt'], self.jobs(job_employers))
+            self.load(JobApplication, ['ApplicantUCID', 'JobID', 'EmployerID', 'Status', 'DateApplied', 'UpdatedAt'],
+                      self.applications(counts['applications'], students, job_employers))
+            self.load(Post, ['VUCID', 'Content', 'Date', 'CreatedAt', 'Upvotes', 'HotScore', 'UpdatedAt'],
+                      self.posts(counts['posts'], students))
+            self.load(VerifyApplicant, ['ModeratorID', 'ApplicantUCID', 'VerificationStatus', 'VerificationDate',
+                                        'UpdatedAt'],
+                      self.applicant_verifications(counts['verifications'], students, counts['moderators']))
+            self.load(VerifyEmployer, ['ModeratorID', 'EmployerID', 'VerificationStatus', 'VerificationDate',
+                                       'UpdatedAt'],
+                      self.employer_verifications(employer_statuses, counts['moderators']))
+            reset_sequences([Employer, JobOpening, JobApplication, Post, VerifyApplicant, VerifyEmployer])
+
+        # Bulk loads send no signals
+        invalidate_job_openings([])
+        if is_summary_enabled() and counts['applications']:
+            job_ids = range(self.first_job, self.first_job + counts['jobs'])
+            for i in range(0, len(job_ids), 500):
+                refresh_application_summary(list(job_ids[i:i + 500]))
+        self.stdout.write(f'Done in {time.perf_counter() - start:.1f}s.')
+
+    def load(self, model, fields, rows):
+        start = time.perf_counter()
+        loaded = load_rows(model, fields, rows, batch_size=self.batch_size)
+        elapsed = time.perf_counter() - start
+        rate = f' ({loaded / elapsed:,.0f} rows/s)' if loaded and elapsed else ''
+        self.stdout.write(f'{model._meta.db_table:<18}{loaded:>12,} rows in {elapsed:.1f}s{rate}')
+
+    def random_date(self, days_back, days_ahead=0):
+        return self.today + timedelta(days=self.rng.randint(-days_back, days_ahead))
+
+    def aware(self, day):
+        moment = datetime.combine(day, dt_time(self.rng.randrange(24), self.rng.randrange(60)))
+        return min(timezone.make_aware(moment), self.now)
+
+    def students(self, count):
+        rng = self.rng
+        for i in range(count):
+            ucid = self.first_ucid + i
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            yield (
+                ucid, first, last, f'{first}.{last}.{ucid}@ucalgary.ca'.lower(), rng.choice(MAJORS),
+                self.today.year + rng.randint(0, 4), self.now,
+            )
+
+    def employers(self, statuses):
+        rng = self.rng
+        for i, status in enumerate(statuses):
+            pk = self.first_employer + i
+            name = f'{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_SUFFIXES)} {pk}'
+            slug = name.lower().replace(' ', '-')
+            yield (
+                pk, name, f'careers@{slug}.example.com', rng.choice(INDUSTRIES), f'https://{slug}.example.com',
+                rng.choice(SENTENCES), status, self.now,
+            )
+
+    def jobs(self, job_employers):
+        rng = self.rng
+        for i, employer in enumerate(job_employers):
+            title, base = rng.choice(JOB_TITLES)
+            deadline = self.random_date(90, 120)
+            # Most postings past their deadline are closed; the rest await expiry
+            expired = deadline < self.today
+            status = JobOpening.STATUS_CLOSED if expired and rng.random() < 0.8 else JobOpening.STATUS_ACTIVE
+            salary = Decimal(max(30000, round(rng.gauss(base, base * 0.15), -2)))
+            yield (
+                self.first_job + i, employer, title, ' '.join(rng.sample(SENTENCES, 3)), salary,
+                rng.choice(LOCATIONS), deadline, status, self.aware(deadline - timedelta(days=rng.randint(14, 60))),
+                self.now,
+            )
+
+    def applications(self, count, students, job_employers):
+        rng = self.rng
+        for _ in range(count):
+            job = rng.randrange(len(job_employers))
+            yield (
+                self.first_ucid + rng.randrange(students), self.first_job + job, job_employers[job],
+                rng.choices(APPLICATION_STATUSES, APPLICATION_WEIGHTS)[0], self.random_date(120), self.now,
+            )
+
+    def posts(self, count, students):
+        rng = self.rng
+        for _ in range(count):
+            day = self.random_date(365)
+            created = self.aware(day)
+            yield (
+                self.first_ucid + rng.randrange(students), rng.choice(SENTENCES), day, created, 0,
+                hot_score(0, created), self.now,
+            )
+
+    def applicant_verifications(self, count, students, moderators):
+        rng = self.rng
+        for _ in range(count):
+            yield (
+                self.first_ucid + rng.randrange(moderators), self.first_ucid + rng.randrange(students),
+                rng.choices(VERIFICATION_STATUSES, VERIFICATION_WEIGHTS)[0], self.random_date(180), self.now,
+            )
+
+    def employer_verifications(self, statuses, moderators):
+        rng = self.rng
+        for i, status in enumerate(statuses):
+            yield (
+                self.first_ucid + rng.randrange(moderators), self.first_employer + i, status,
+                self.random_date(180), self.now,
+            )
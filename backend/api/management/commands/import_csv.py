@@ -0,0 +1,136 @@
+import csv
+import time
+
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.db.models import AutoField
+from django.utils import timezone
+
+from api.bulkload import DEFAULT_BATCH_SIZE, load_rows, reset_sequences, uses_copy
+from api.cache import invalidate_job_openings
+from api.models import CustomUser, JobApplication, JobOpening
+from api.stats import is_summary_enabled, refresh_application_summary
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-import a CSV file into one of the api tables, e.g. the registrar\'s '
+        'student roster: import_csv Student roster.csv. The header row names '
+        'the columns, by field name (UCID, Employer) or database column '
+        '(EmployerID); columns left out get their defaults, and UpdatedAt is '
+        'set to now. The file is loaded in one transaction, with COPY on '
+        'PostgreSQL and batched INSERTs elsewhere (api/bulkload.py). No save '
+        'signals are sent: imported applicant resumes are queued with '
+        '`process_resumes --backfill`, and imported posts get their feed '
+        'scores from `recount_post_votes`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help='Model name, e.g. Student, Employer, JobOpening.')
+        parser.add_argument('path', help='CSV file with a header row.')
+        parser.add_argument('--delimiter', default=',')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows per COPY/INSERT.')
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_app_config('api').get_model(options['model'])
+        except LookupError:
+            raise CommandError(f'No model named {options["model"]} in the api app.')
+        if model is CustomUser:
+            raise CommandError('User accounts need hashed passwords; create them through registration.')
+
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as file:
+                reader = csv.reader(file, delimiter=options['delimiter'])
+                header = next(reader, None)
+                if header is None:
+                    raise CommandError('The file is empty.')
+                fields, defaults = self.get_columns(model, header)
+                self.job_ids = set()
+
+                start = time.perf_counter()
+                with transaction.atomic():
+                    loaded = load_rows(
+                        model, [field.name for field in fields + defaults],
+                        self.read_rows(model, reader, fields, defaults), batch_size=options['batch_size'],
+                    )
+                    if model._meta.pk in fields:
+                        reset_sequences([model])
+        except OSError as exc:
+            raise CommandError(f'Can\'t read {options["path"]}: {exc}')
+        except IntegrityError as exc:
+            raise CommandError(f'Nothing imported: {exc}')
+        elapsed = time.perf_counter() - start
+
+        # Bulk loads send no signals
+        if model is JobOpening:
+            invalidate_job_openings([])
+        if model is JobApplication and is_summary_enabled():
+            job_ids = sorted(self.job_ids)
+            for i in range(0, len(job_ids), 500):
+                refresh_application_summary(job_ids[i:i + 500])
+        method = 'COPY' if uses_copy() else 'batched INSERTs'
+        self.stdout.write(f'Imported {loaded:,} rows into {model._meta.db_table} in {elapsed:.1f}s ({method}).')
+
+    def get_columns(self, model, header):
+        # The fields named by the header, in order, and the ones to default
+        names = {}
+        for field in model._meta.concrete_fields:
+            for name in (field.name, field.attname, field.column):
+                names[name.lower()] = field
+        fields = []
+        for column in header:
+            field = names.get(column.strip().lower())
+            if field is None:
+                raise CommandError(f'{model.__name__} has no field {column!r}.')
+            if field in fields:
+                raise CommandError(f'{column!r} appears twice in the header.')
+            fields.append(field)
+
+        defaults, missing = [], []
+        for field in model._meta.concrete_fields:
+            if field in fields or isinstance(field, AutoField):
+                continue  # numbered by the database
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False) or field.has_default():
+                defaults.append(field)
+            elif not field.null:
+                missing.append(field.name)
+            # else: left NULL (e.g. the search documents, filled in by a trigger)
+        if missing:
+            raise CommandError(f'Missing required columns: {", ".join(missing)}.')
+        return fields, defaults
+
+    def get_default(self, field, now):
+        # A function giving the value of a column left out of the file
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False) or field.default is timezone.now:
+            return lambda: now
+        if callable(field.default):
+            return field.get_default  # e.g. a new UUID per row
+        value = field.get_default()
+        return lambda: value
+
+    def read_rows(self, model, reader, fields, defaults):
+        now = timezone.now()
+        fill = [self.get_default(field, now) for field in defaults]
+        job_index = fields.index(model._meta.get_field('JobID')) if model is JobApplication else None
+        for line, row in enumerate(reader, start=2):
+            if not any(row):
+                continue  # blank line
+            if len(row) != len(fields):
+                raise CommandError(f'Line {line}: expected {len(fields)} values, got {len(row)}.')
+            values = []
+            for field, value in zip(fields, row):
+                if value == '' and (field.null or not field.empty_strings_allowed):
+                    if not field.null:
+                        raise CommandError(f'Line {line}: {field.name} is required.')
+                    values.append(None)
+                    continue
+                try:
+                    values.append(field.to_python(value))
+                except ValidationError as exc:
+                    raise CommandError(f'Line {line}: {field.name}: {" ".join(exc.messages)}')
+            if job_index is not None:
+                self.job_ids.add(values[job_index])
+            yield (*values, *(get() for get in fill))
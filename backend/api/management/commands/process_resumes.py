@@ -0,0 +1,55 @@
+import logging
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+
+from api import resumes
+
+logger = logging.getLogger('api.resumes')
+
+
+class Command(BaseCommand):
+    help = (
+        'Extract the text of queued resumes (api/resumes.py) in a process pool. '
+        'Runs until interrupted; several workers can share the queue.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Extraction processes.')
+        parser.add_argument('--batch-size', type=int, default=32, help='Resumes claimed at a time.')
+        parser.add_argument('--poll-interval', type=float, default=5,
+                            help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Stop when the queue is empty.')
+        parser.add_argument('--backfill', action='store_true',
+                            help='First queue uploaded resumes that were never queued.')
+
+    def handle(self, *args, **options):
+        if not resumes.is_available():
+            self.stderr.write('Resume extraction needs pypdf installed.')
+            return
+        if options['backfill']:
+            self.stdout.write(f'Queued {resumes.backfill()} resumes.')
+
+        processed = 0
+        pool = resumes.create_pool(options['workers'])
+        try:
+            while True:
+                try:
+                    count = resumes.process_batch(pool, options['batch_size'])
+                except BrokenProcessPool:
+                    logger.exception('Resume extraction process died; restarting the pool')
+                    pool.shutdown(cancel_futures=True)
+                    pool = resumes.create_pool(options['workers'])
+                    continue
+                processed += count
+                if count:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pool.shutdown(cancel_futures=True)
+        self.stdout.write(f'Processed {processed} resumes.')
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.models import JobOpening
+from api.stats import refresh_application_summary
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild job_application_summary (the employer dashboard stats table) '
+        'from job_application. Run after enabling EMPLOYER_STATS_SUMMARY.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Jobs refreshed per transaction.')
+
+    def handle(self, *args, **options):
+        job_ids = list(JobOpening.objects.order_by('JobID').values_list('JobID', flat=True))
+        batch_size = options['batch_size']
+        for start in range(0, len(job_ids), batch_size):
+            refresh_application_summary(job_ids[start:start + batch_size])
+        self.stdout.write(f'Rebuilt the application summary for {len(job_ids)} job openings.')
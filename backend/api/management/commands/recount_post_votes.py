@@ -0,0 +1,38 @@
+import math
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from api.forum import hot_score
+from api.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the denormalized Post.Upvotes and Post.HotScore from post_vote, '
+        'e.g. after votes were written or deleted in bulk.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Posts updated per query.')
+
+    def handle(self, *args, **options):
+        posts = (
+            Post.objects.annotate(votes=Count('postvote'))
+            .only('PostID', 'CreatedAt', 'Upvotes', 'HotScore', 'UpdatedAt').order_by('PostID')
+        )
+        changed, batch, now = 0, [], timezone.now()
+        fields = ['Upvotes', 'HotScore', 'UpdatedAt']  # bulk_update skips auto_now
+        for post in posts.iterator(chunk_size=options['batch_size']):
+            score = hot_score(post.votes, post.CreatedAt)
+            # The stored score is moved by increments, so allow for rounding
+            if post.Upvotes != post.votes or not math.isclose(post.HotScore, score, abs_tol=1e-6):
+                post.Upvotes, post.HotScore, post.UpdatedAt = post.votes, score, now
+                batch.append(post)
+            if len(batch) >= options['batch_size']:
+                changed += Post.objects.bulk_update(batch, fields)
+                batch = []
+        if batch:
+            changed += Post.objects.bulk_update(batch, fields)
+        self.stdout.write(f'Updated the vote counts of {changed} posts.')
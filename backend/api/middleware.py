@@ -0,0 +1,150 @@
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import connections
+
+logger = logging.getLogger('api.queries')
+
+
+class QueryMetrics:
+    """
+    Database execute wrapper that counts the queries run while it is installed,
+    their total time, and how many repeat an SQL statement already seen (the
+    usual sign of an N+1 lookup).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        return sum(n - 1 for n in self.statements.values())
+
+    def record(self):
+        # Install on every configured database for the duration of the block,
+        # once per connection: an alias can share another's (a test replica
+        # mirroring the primary), and its queries must not count twice
+        stack = ExitStack()
+        for connection in {id(connection): connection for connection in connections.all()}.values():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+
+def get_handler_name(view_func, method):
+    # ViewSets expose their method -> action mapping on the view function;
+    # plain APIViews are keyed by the HTTP method handler ('post', 'get', ...)
+    actions = getattr(view_func, 'actions', None) or {}
+    return actions.get(method.lower(), method.lower())
+
+
+def get_query_budget(view_class, handler_name):
+    """
+    Declared maximum number of queries for a view handler, or None.
+
+    Views declare `query_budget = {'list': 1, 'retrieve': 1, ...}`; a '*' key
+    applies to any handler without its own entry.
+    """
+    budget = getattr(view_class, 'query_budget', None) or {}
+    return budget.get(handler_name, budget.get('*'))
+
+
+class QueryMetricsMiddleware:
+    """
+    Records query count, DB time and duplicate SQL for each request.
+
+    The numbers are sent back in a Server-Timing header (visible in the
+    browser dev tools) and written as one log line on the `api.queries`
+    logger. Requests that exceed the view's declared query budget are logged
+    as warnings and flagged with an X-Query-Budget-Exceeded header.
+
+    Works under WSGI and ASGI. On the async path the async ORM runs queries
+    in the request's thread-sensitive worker thread, so the execute wrapper
+    is installed on that thread's connections.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        metrics = QueryMetrics()
+        request.query_budget = None
+        request.query_handler = None
+
+        start = time.perf_counter()
+        with metrics.record():
+            response = self.get_response(request)
+        return self.report(request, response, metrics, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        metrics = QueryMetrics()
+        request.query_budget = None
+        request.query_handler = None
+
+        start = time.perf_counter()
+        recording = await sync_to_async(metrics.record)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(recording.close)()
+        return self.report(request, response, metrics, time.perf_counter() - start)
+
+    def report(self, request, response, metrics, elapsed):
+        db_ms = metrics.duration * 1000
+        response['Server-Timing'] = (
+            f'db;dur={db_ms:.2f};desc="{metrics.count} queries, {metrics.duplicates} duplicate", '
+            f'total;dur={elapsed * 1000:.2f}'
+        )
+
+        budget = request.query_budget
+        over_budget = budget is not None and metrics.count > budget
+        if over_budget:
+            response['X-Query-Budget-Exceeded'] = f'{metrics.count}/{budget}'
+
+        logger.log(
+            logging.WARNING if over_budget else logging.INFO,
+            'method=%s path=%s handler=%s status=%s queries=%d duplicates=%d db_ms=%.2f total_ms=%.2f budget=%s',
+            request.method, request.path, request.query_handler, response.status_code,
+            metrics.count, metrics.duplicates, db_ms, elapsed * 1000, budget,
+            extra={
+                'method': request.method,
+                'path': request.path,
+                'handler': request.query_handler,
+                'status_code': response.status_code,
+                'queries': metrics.count,
+                'duplicate_queries': metrics.duplicates,
+                'db_ms': round(db_ms, 2),
+                'total_ms': round(elapsed * 1000, 2),
+                'query_budget': budget,
+            },
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        if view_class is None:
+            return None
+        request.query_handler = get_handler_name(view_func, request.method)
+        request.query_budget = get_query_budget(view_class, request.query_handler)
+        return None
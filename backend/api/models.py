@@ -1,6 +1,12 @@
+import uuid
+
 from django.db import models
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
+from django.utils import timezone
+
+from .storage import get_resume_storage
 
 class CustomUser(AbstractUser):
     USER_TYPE_CHOICES = (
@@ -9,7 +15,10 @@ class CustomUser(AbstractUser):
     )
     user_type = models.CharField(max_length=20, choices=USER_TYPE_CHOICES, default='student')
     bio = models.TextField(blank=True, null=True)
-    pdf_file = models.FileField(upload_to="resumes/", null=True, blank=True)
+    # Stored content-addressed (api/storage.py); indexed for download permission checks
+    pdf_file = models.FileField(upload_to="resumes/", storage=get_resume_storage, null=True, blank=True, db_index=True)
+    # Access tokens issued before this are rejected (api/authentication.py)
+    tokens_valid_after = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return f"{self.username} ({self.get_user_type_display()})"
@@ -31,6 +40,7 @@ class Student(models.Model):
     Email = models.EmailField(max_length=255, unique=True, db_column='Email')
     Major = models.CharField(max_length=255, null=True, blank=True, db_column='Major')
     GraduationYear = models.IntegerField(null=True, blank=True, db_column='GraduationYear')
+    UpdatedAt = models.DateTimeField(auto_now=True, db_column='UpdatedAt')
 
     class Meta:
         db_table = 'student'
@@ -41,6 +51,7 @@ class Student(models.Model):
 
 class Moderator(models.Model):
     ModeratorID  = models.OneToOneField(Student, on_delete=models.CASCADE, primary_key=True, db_column='ModeratorID')
+    UpdatedAt = models.DateTimeField(auto_now=True, db_column='UpdatedAt')
 
     class Meta:
         db_table = 'moderator'
@@ -59,9 +70,13 @@ class Employer(models.Model):
     Website = models.URLField(null=True, blank=True, db_column='Website')  #new
     Description = models.TextField(null=True, blank=True, db_column='Description')
     VerificationStatus = models.CharField(max_length=50, db_column='VerificationStatus')
+    UpdatedAt = models.DateTimeField(auto_now=True, db_column='UpdatedAt')
 
     class Meta:
         db_table = 'employer'
+        indexes = [
+            models.Index(fields=['VerificationStatus'], name='employer_verif_status_idx'),
+        ]
 
     def __str__(self):
         return self.CompanyName
@@ -70,32 +85,71 @@ class Employer(models.Model):
 class Applicant(models.Model):
     SUCID = models.OneToOneField(Student, on_delete=models.CASCADE, primary_key=True, db_column='SUCID')
     CGPA = models.DecimalField(max_digits=3, decimal_places=2, db_column='CGPA')
-    Resume = models.FileField(upload_to="resume/", db_column='Resume')
+    Resume = models.FileField(upload_to="resume/", storage=get_resume_storage, db_index=True, db_column='Resume')
     VerificationStatus = models.CharField(max_length=50, db_column='VerificationStatus')
+    UpdatedAt = models.DateTimeField(auto_now=True, db_column='UpdatedAt')
 
     class Meta:
         db_table = 'applicant'
+        indexes = [
+            models.Index(fields=['VerificationStatus'], name='applicant_verif_status_idx'),
+        ]
 
 
 class Post(models.Model):
     PostID = models.AutoField(primary_key=True, db_column='PostID')
-    VUCID = models.ForeignKey(Student, on_delete=models.CASCADE, db_column='VUCID')
+    # Indexed by post_author_date_idx, which leads with it
+    VUCID = models.ForeignKey(Student, on_delete=models.CASCADE, db_column='VUCID', db_index=False)
     Content = models.TextField(db_column='Content')
     Date = models.DateField(db_column='Date')
+    CreatedAt = models.DateTimeField(default=timezone.now, editable=False, db_column='CreatedAt')
+    # Denormalized from PostVote and kept in step with it (api/forum.py)
+    Upvotes = models.PositiveIntegerField(default=0, editable=False, db_column='Upvotes')
+    # Rank in the "hot" feed; only changes when the post is voted on
+    HotScore = models.FloatField(default=0, editable=False, db_column='HotScore')
+    UpdatedAt = models.DateTimeField(auto_now=True, db_column='UpdatedAt')
 
     class Meta:
         db_table = 'post'
+        indexes = [
+            # A student's posts, newest first
+            models.Index(fields=['VUCID', '-Date'], name='post_author_date_idx'),
+            # The feeds (api/forum.py) page on these, highest first
+            models.Index(fields=['-HotScore', '-PostID'], name='post_hot_idx'),
+            models.Index(fields=['-Upvotes', '-PostID'], name='post_top_idx'),
+            models.Index(fields=['-CreatedAt', '-PostID'], name='post_new_idx'),
+        ]
+
+
+class PostVote(models.Model):
+    # Indexed by the unique constraint and post_vote_voter_idx below
+    Post = models.ForeignKey(Post, on_delete=models.CASCADE, db_column='PostID', db_index=False)
+    Voter = models.ForeignKey(Student, on_delete=models.CASCADE, db_column='VoterUCID', db_index=False)
+    CreatedAt = models.DateTimeField(auto_now_add=True, db_column='CreatedAt')
+
+    class Meta:
+        db_table = 'post_vote'
+        constraints = [
+            models.UniqueConstraint(fields=['Post', 'Voter'], name='post_vote_post_voter_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['Voter'], name='post_vote_voter_idx'),
+        ]
 
 
 class Volunteer(models.Model):
     SUCID = models.OneToOneField(Student, on_delete=models.CASCADE, primary_key=True, db_column='SUCID')
     Hours = models.IntegerField(db_column='Hours')
+    UpdatedAt = models.DateTimeField(auto_now=True, db_column='UpdatedAt')
 
     class Meta:
         db_table = 'volunteer'
 
 
 class JobOpening(models.Model):
+    STATUS_ACTIVE = 'Active'
+    STATUS_CLOSED = 'Closed'
+
     JobID = models.AutoField(primary_key=True, db_column='JobID')
     Employer = models.ForeignKey(Employer, on_delete=models.CASCADE, db_column='EmployerID')
     JobTitle = models.CharField(max_length=255, db_column='JobTitle')
@@ -104,21 +158,131 @@ class JobOpening(models.Model):
     Location = models.CharField(max_length=255, db_column='Location')
     Deadline = models.DateField(db_column='Deadline')
     Status = models.CharField(max_length=50, db_column='Status') # new
+    PostedAt = models.DateTimeField(default=timezone.now, editable=False, db_column='PostedAt')
+    # Full-text document, maintained by a database trigger (see api/search.py)
+    SearchDocument = SearchVectorField(null=True, editable=False, db_column='SearchDocument')
+    UpdatedAt = models.DateTimeField(auto_now=True, db_column='UpdatedAt')
 
     class Meta:
         db_table = 'job_opening'
+        indexes = [
+            models.Index(fields=['Status', 'Deadline'], name='job_opening_status_dl_idx'),
+            models.Index(fields=['Salary'], name='job_opening_salary_idx'),
+            # Only the live postings; stays small however many jobs have closed
+            models.Index(
+                fields=['Deadline'],
+                name='job_opening_active_dl_idx',
+                condition=models.Q(Status='Active'),
+            ),
+        ]
+
+    def is_open(self, today=None):
+        # Taking applications, as ?open=true lists them (api/filters.py)
+        return self.Status == self.STATUS_ACTIVE and self.Deadline >= (today or timezone.localdate())
 
 
 class JobApplication(models.Model):
     ApplicationID = models.AutoField(primary_key=True, db_column='ApplicationID')
-    ApplicantUCID = models.ForeignKey(Student, on_delete=models.CASCADE, db_column='ApplicantUCID')
-    JobID = models.ForeignKey(JobOpening, on_delete=models.CASCADE, db_column='JobID')
-    EmployerID = models.ForeignKey(Employer, on_delete=models.CASCADE, db_column='EmployerID')
+    # No single-column FK indexes: the (FK, Status) indexes below lead with them
+    ApplicantUCID = models.ForeignKey(Student, on_delete=models.CASCADE, db_column='ApplicantUCID', db_index=False)
+    JobID = models.ForeignKey(JobOpening, on_delete=models.CASCADE, db_column='JobID', db_index=False)
+    EmployerID = models.ForeignKey(Employer, on_delete=models.CASCADE, db_column='EmployerID', db_index=False)
     Status = models.CharField(max_length=50, db_column='Status')
     DateApplied = models.DateField(db_column='DateApplied')
+    UpdatedAt = models.DateTimeField(auto_now=True, db_column='UpdatedAt')
 
     class Meta:
         db_table = 'job_application'
+        indexes = [
+            models.Index(fields=['ApplicantUCID', 'Status'], name='job_app_applicant_status_idx'),
+            models.Index(fields=['JobID', 'Status'], name='job_app_job_status_idx'),
+            models.Index(fields=['EmployerID', 'Status'], name='job_app_employer_status_idx'),
+        ]
+
+
+class JobApplicationSummary(models.Model):
+    """
+    Application count and first application date per job and status, kept up
+    to date by api/stats.py when EMPLOYER_STATS_SUMMARY is on.
+    """
+    # Indexed by the unique constraint and job_app_summary_employer_idx below
+    JobID = models.ForeignKey(JobOpening, on_delete=models.CASCADE, db_column='JobID', db_index=False)
+    EmployerID = models.ForeignKey(Employer, on_delete=models.CASCADE, db_column='EmployerID', db_index=False)
+    Status = models.CharField(max_length=50, db_column='Status')
+    ApplicationCount = models.PositiveIntegerField(db_column='ApplicationCount')
+    FirstApplied = models.DateField(db_column='FirstApplied')
+
+    class Meta:
+        db_table = 'job_application_summary'
+        constraints = [
+            models.UniqueConstraint(fields=['JobID', 'Status'], name='job_app_summary_job_status_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['EmployerID'], name='job_app_summary_employer_idx'),
+        ]
+
+
+class ResumeText(models.Model):
+    """
+    Text extracted from an uploaded resume, CustomUser.pdf_file or
+    Applicant.Resume. Rows double as the extraction queue (api/resumes.py).
+    """
+    SOURCE_ACCOUNT = 'account'      # OwnerID is the CustomUser id
+    SOURCE_APPLICANT = 'applicant'  # OwnerID is the Applicant SUCID
+
+    STATUS_PENDING = 'Pending'
+    STATUS_PROCESSING = 'Processing'
+    STATUS_DONE = 'Done'
+    STATUS_FAILED = 'Failed'
+
+    Source = models.CharField(max_length=20, db_column='Source')
+    OwnerID = models.IntegerField(db_column='OwnerID')
+    # Whose resume it is; students are matched to their resumes by email
+    Email = models.EmailField(max_length=255, db_column='Email')
+    File = models.CharField(max_length=255, db_column='File')
+    Status = models.CharField(max_length=20, default=STATUS_PENDING, db_column='Status')
+    Attempts = models.PositiveSmallIntegerField(default=0, db_column='Attempts')
+    # Set while a worker is extracting the file
+    LeaseExpiresAt = models.DateTimeField(null=True, blank=True, db_column='LeaseExpiresAt')
+    Text = models.TextField(blank=True, default='', db_column='Text')
+    Error = models.TextField(blank=True, default='', db_column='Error')
+    # Full-text document, maintained by a database trigger (see api/search.py)
+    SearchDocument = SearchVectorField(null=True, editable=False, db_column='SearchDocument')
+    QueuedAt = models.DateTimeField(default=timezone.now, db_column='QueuedAt')
+    ExtractedAt = models.DateTimeField(null=True, blank=True, db_column='ExtractedAt')
+    UpdatedAt = models.DateTimeField(auto_now=True, db_column='UpdatedAt')
+
+    class Meta:
+        db_table = 'resume_text'
+        constraints = [
+            models.UniqueConstraint(fields=['Source', 'OwnerID'], name='resume_text_source_owner_uniq'),
+        ]
+        indexes = [
+            # Worker queue: oldest pending first
+            models.Index(fields=['Status', 'QueuedAt'], name='resume_text_queue_idx'),
+            models.Index(fields=['Email'], name='resume_text_email_idx'),
+        ]
+
+
+class ResumeUpload(models.Model):
+    """
+    A chunked, resumable resume upload in progress (api/uploads.py).
+    """
+    UploadID = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, db_column='UploadID')
+    User = models.ForeignKey(CustomUser, on_delete=models.CASCADE, db_column='UserID')
+    # Where the finished file goes: ResumeText.SOURCE_ACCOUNT or SOURCE_APPLICANT
+    Target = models.CharField(max_length=20, db_column='Target')
+    FileName = models.CharField(max_length=255, db_column='FileName')
+    Size = models.PositiveIntegerField(db_column='Size')
+    # Bytes received so far
+    Offset = models.PositiveIntegerField(default=0, db_column='Offset')
+    # Optional hex SHA-256 the finished file is checked against
+    Sha256 = models.CharField(max_length=64, blank=True, default='', db_column='Sha256')
+    CreatedAt = models.DateTimeField(auto_now_add=True, db_column='CreatedAt')
+    UpdatedAt = models.DateTimeField(auto_now=True, db_column='UpdatedAt')
+
+    class Meta:
+        db_table = 'resume_upload'
 
 
 class VerifyApplicant(models.Model):
@@ -127,9 +291,16 @@ class VerifyApplicant(models.Model):
     ApplicantUCID = models.ForeignKey(Student, on_delete=models.CASCADE, db_column='ApplicantUCID')
     VerificationStatus = models.CharField(max_length=50, db_column='VerificationStatus')
     VerificationDate = models.DateField(db_column='VerificationDate')
+    # Set while the moderator in ModeratorID has claimed the row (api/moderation.py)
+    LeaseExpiresAt = models.DateTimeField(null=True, blank=True, db_column='LeaseExpiresAt')
+    UpdatedAt = models.DateTimeField(auto_now=True, db_column='UpdatedAt')
 
     class Meta:
         db_table = 'verify_applicant'
+        indexes = [
+            # Moderator queue: filter on status, page on VID
+            models.Index(fields=['VerificationStatus', 'VID'], name='verify_applicant_queue_idx'),
+        ]
 
 
 class VerifyEmployer(models.Model):
@@ -138,15 +309,24 @@ class VerifyEmployer(models.Model):
     EmployerID = models.ForeignKey(Employer, on_delete=models.CASCADE, db_column='EmployerID')
     VerificationStatus = models.CharField(max_length=50, db_column='VerificationStatus')
     VerificationDate = models.DateField(db_column='VerificationDate')
+    # Set while the moderator in ModeratorID has claimed the row (api/moderation.py)
+    LeaseExpiresAt = models.DateTimeField(null=True, blank=True, db_column='LeaseExpiresAt')
+    UpdatedAt = models.DateTimeField(auto_now=True, db_column='UpdatedAt')
 
     class Meta:
         db_table = 'verify_employer'
+        indexes = [
+            # Moderator queue: filter on status, page on VID
+            models.Index(fields=['VerificationStatus', 'VID'], name='verify_employer_queue_idx'),
+        ]
 
 
 class Reviews(models.Model):
-    ModeratorID = models.ForeignKey(Moderator, on_delete=models.CASCADE, db_column='ModeratorID')
+    # Indexed by the unique_together, which leads with it
+    ModeratorID = models.ForeignKey(Moderator, on_delete=models.CASCADE, db_column='ModeratorID', db_index=False)
     JobID = models.ForeignKey(JobOpening, on_delete=models.CASCADE, db_column='JobID')
     EmployerID = models.ForeignKey(Employer, on_delete=models.CASCADE, db_column='EmployerID')
+    UpdatedAt = models.DateTimeField(auto_now=True, db_column='UpdatedAt')
 
     class Meta:
         db_table = 'reviews'
@@ -0,0 +1,97 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, Q, When
+from django.utils import timezone
+
+from .models import Moderator
+
+# Moderator work queue for VerifyApplicant / VerifyEmployer rows.
+#
+# New rows are assigned at creation to the moderator with the fewest pending
+# rows (ties broken at random), so a registration spike is spread out and no
+# lock is taken. Moderators then claim batches of pending rows: the batch is
+# selected with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent claims never
+# wait on or return the same rows, and each claimed row gets a lease. A row
+# with a live lease is skipped by other claims and can't be decided by another
+# moderator; when the lease runs out the row is up for grabs again. Rows
+# assigned to the claiming moderator are handed out first.
+
+PENDING = 'Pending'
+
+
+def get_lease_duration():
+    return timedelta(seconds=getattr(settings, 'VERIFICATION_LEASE_SECONDS', 900))
+
+
+def assign_moderator(model, exclude=None):
+    """
+    The moderator with the fewest pending rows of `model` (VerifyApplicant or
+    VerifyEmployer), or None when there are no moderators.
+    """
+    related = model._meta.get_field('ModeratorID').related_query_name()
+    moderators = Moderator.objects.annotate(
+        pending=Count(related, filter=Q(**{f'{related}__VerificationStatus': PENDING})),
+    )
+    if exclude is not None:
+        moderators = moderators.exclude(pk=exclude)
+
+    loads = list(moderators.values_list('pk', 'pending'))
+    if not loads:
+        return None
+    least = min(pending for _, pending in loads)
+    return random.choice([pk for pk, pending in loads if pending == least])
+
+
+def is_leased(row, now=None):
+    return row.LeaseExpiresAt is not None and row.LeaseExpiresAt > (now or timezone.now())
+
+
+def claimable(queryset, now):
+    return queryset.filter(
+        Q(LeaseExpiresAt__isnull=True) | Q(LeaseExpiresAt__lte=now),
+        VerificationStatus=PENDING,
+    )
+
+
+def claim(queryset, moderator_id, limit):
+    """
+    Lease up to `limit` pending rows of `queryset` to `moderator_id`.
+    Returns the primary keys of the claimed rows.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        pks = list(
+            claimable(queryset, now)
+            .select_for_update(skip_locked=True)
+            .annotate(assigned_elsewhere=Case(
+                When(ModeratorID=moderator_id, then=0), default=1, output_field=IntegerField(),
+            ))
+            .order_by('assigned_elsewhere', 'pk')
+            .values_list('pk', flat=True)[:limit]
+        )
+        queryset.model.objects.filter(pk__in=pks).update(
+            ModeratorID=moderator_id, LeaseExpiresAt=now + get_lease_duration(), UpdatedAt=now,
+        )
+    return pks
+
+
+def release(queryset, moderator_id):
+    """
+    Give back the unfinished rows `moderator_id` holds a lease on.
+    Returns how many were released.
+    """
+    now = timezone.now()
+    return queryset.filter(
+        ModeratorID=moderator_id, VerificationStatus=PENDING, LeaseExpiresAt__gt=now,
+    ).update(LeaseExpiresAt=None, UpdatedAt=now)
+
+
+def get_moderator_id(user):
+    # From the token claims when available (api.authentication.ClaimsUser)
+    is_moderator = getattr(user, 'is_moderator', None)
+    if is_moderator is not None:
+        return user.ucid if is_moderator else None
+    return Moderator.objects.filter(ModeratorID__Email=user.email).values_list('pk', flat=True).first()
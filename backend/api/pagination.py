@@ -0,0 +1,218 @@
+from base64 import b64decode
+from urllib import parse
+
+from django.db.models import F, Q
+from django.db.models.fields.tuple_lookups import Tuple, TupleGreaterThan, TupleLessThan
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, _reverse_ordering
+from rest_framework.response import Response
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination ordered on the model's primary key, so pages
+    stay stable while rows are inserted and never need an OFFSET scan.
+
+    Orderings on a non-unique column end with a unique one, e.g. the post
+    feeds' ('-Upvotes', '-PostID'). The cursor then holds the whole tuple and
+    pages with a row-value comparison, ("Upvotes", "PostID") < (3, 1234), so
+    rows tied on the first column are paged like any other instead of
+    skipped over with DRF's OFFSET (which it caps at 1000 rows).
+
+    Query params:
+        cursor      opaque cursor returned in `next` / `previous`
+        page_size   rows per page (default PAGE_SIZE), capped at `max_page_size`
+        count=true  also return the total row count (costs an extra COUNT query)
+        paginate=false
+                    legacy mode: return the bare, unpaginated list so existing
+                    frontend callers keep working until they are migrated
+        ids=1,2,3   multi-get (api/fieldsets.py): a bounded set of rows, also
+                    returned as a bare list
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    count_query_param = 'count'
+    legacy_query_param = 'paginate'
+    ids_query_param = 'ids'
+
+    def get_ordering(self, request, queryset, view):
+        # A filter backend may impose its own order (e.g. search relevance)
+        for backend in getattr(view, 'filter_backends', []):
+            if hasattr(backend, 'get_cursor_ordering'):
+                ordering = backend().get_cursor_ordering(request, queryset, view)
+                if ordering:
+                    return tuple(ordering)
+
+        # Views can override the keyset column, otherwise use the primary key.
+        # attname keeps FK primary keys (e.g. Moderator.ModeratorID) as plain ids.
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering is None:
+            ordering = queryset.model._meta.pk.attname
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        return tuple(ordering)
+
+    def is_legacy_request(self, request):
+        return request.query_params.get(self.legacy_query_param, '').lower() in ('false', '0', 'no')
+
+    def is_unpaginated(self, request):
+        return self.is_legacy_request(request) or self.ids_query_param in request.query_params
+
+    def wants_count(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('true', '1', 'yes')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # Returning None makes DRF serialize the full list, as before pagination
+        if self.is_unpaginated(request):
+            return None
+
+        self.count = queryset.count() if self.wants_count(request) else None
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        return self.build_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset() for async views, fetching rows with the async ORM.
+        """
+        if self.is_unpaginated(request):
+            return None
+
+        self.count = await queryset.acount() if self.wants_count(request) else None
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        return self.build_page([obj async for obj in page_queryset])
+
+    # CursorPagination.paginate_queryset() split in two around the single
+    # database fetch, so the sync and async paths share the cursor logic.
+
+    def get_page_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (self.offset, self.reverse, self.current_position) = (0, False, None)
+        else:
+            (self.offset, self.reverse, self.current_position) = self.cursor
+
+        # Cursor pagination always enforces an ordering.
+        if self.reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        # If we have a cursor with a fixed position then filter by that.
+        if self.current_position is not None and len(self.ordering) > 1:
+            queryset = queryset.filter(self.get_keyset_filter())
+        elif self.current_position is not None:
+            order = self.ordering[0]
+            is_reversed = order.startswith('-')
+            order_attr = order.lstrip('-')
+
+            # Test for: (cursor reversed) XOR (queryset reversed)
+            if self.cursor.reverse != is_reversed:
+                kwargs = {order_attr + '__lt': self.current_position}
+            else:
+                kwargs = {order_attr + '__gt': self.current_position}
+
+            queryset = queryset.filter(**kwargs)
+
+        # Fetch one extra row to tell whether another page follows
+        return queryset[self.offset:self.offset + self.page_size + 1]
+
+    def get_keyset_filter(self):
+        # The rows after the cursor's position in the order of the query
+        columns = [order.lstrip('-') for order in self.ordering]
+        after = [self.cursor.reverse == order.startswith('-') for order in self.ordering]
+        if all(after) or not any(after):
+            lookup = TupleGreaterThan if after[0] else TupleLessThan
+            return lookup(Tuple(*[F(column) for column in columns]), self.current_position)
+
+        # Mixed directions have no row-value form: a > x OR (a = x AND b < y) ...
+        condition, equal = Q(), {}
+        for column, is_after, value in zip(columns, after, self.current_position):
+            condition |= Q(**equal, **{f'{column}__{"gt" if is_after else "lt"}': value})
+            equal[column] = value
+        return condition
+
+    def decode_cursor(self, request):
+        # DRF's cursor keeps only the first value of the position
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None or len(self.ordering) == 1:
+            return cursor
+        querystring = b64decode(request.query_params[self.cursor_query_param].encode('ascii')).decode('ascii')
+        position = tuple(parse.parse_qs(querystring, keep_blank_values=True).get('p', []))
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=cursor.offset, reverse=cursor.reverse, position=position)
+
+    def _get_position_from_instance(self, instance, ordering):
+        # A tuple of every ordering column (encoded as repeated p= values)
+        if len(ordering) == 1:
+            return super()._get_position_from_instance(instance, ordering)
+        return tuple(
+            str(instance[order.lstrip('-')] if isinstance(instance, dict) else getattr(instance, order.lstrip('-')))
+            for order in ordering
+        )
+
+    def build_page(self, results):
+        self.page = list(results[:self.page_size])
+
+        # Determine the position of the final item following the page.
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if self.reverse:
+            # The query ran in reverse order, so flip the page back
+            self.page = list(reversed(self.page))
+
+            self.has_next = (self.current_position is not None) or (self.offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = self.current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (self.current_position is not None) or (self.offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = self.current_position
+
+        # Display page controls in the browsable API if there is more
+        # than one page.
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            payload['count'] = self.count
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count'] = {
+            'type': 'integer',
+            'example': 123,
+        }
+        return response_schema
@@ -1,9 +1,28 @@
 from rest_framework.permissions import BasePermission
+from .authentication import get_employer_id
 from .models import Moderator
 
 class IsModerator(BasePermission):
     def has_permission(self, request, view):
-        try:
-            return Moderator.objects.filter(student__UCID=request.user.username).exists()
-        except:
-            return False
\ No newline at end of file
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        # Answered from the token claims when the user came from them
+        # (api.authentication.ClaimsJWTAuthentication)
+        is_moderator = getattr(user, 'is_moderator', None)
+        if is_moderator is not None:
+            return is_moderator
+        return Moderator.objects.filter(ModeratorID__Email=user.email).exists()
+
+
+class IsEmployerSelfOrModerator(BasePermission):
+    """
+    For an Employer object: the employer's own account, moderators and staff.
+    """
+
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated)
+
+    def has_object_permission(self, request, view, obj):
+        user = request.user
+        return user.is_staff or get_employer_id(user) == obj.pk or IsModerator().has_permission(request, view)
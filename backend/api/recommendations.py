@@ -0,0 +1,342 @@
+import math
+import re
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import CustomUser, JobOpening, ResumeText
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # optional dependencies, see requirements.txt
+    np = sparse = None
+
+# Job recommendations for students.
+#
+# Job openings (title, description, location) and students (major, bio and
+# resume text) are turned into TF-IDF vectors over a shared vocabulary. The
+# job side lives in memory as a sparse matrix of sublinear term frequencies;
+# IDF weights (fixed at each merge, see below) and row norms are applied at
+# query time, so a student's recommendations are one sparse matrix-vector
+# product plus a top-k selection, and several students can be scored at once
+# with a matrix-matrix product.
+#
+# The index is built when the web process starts (warm_index(), called from
+# nextstep/wsgi.py and asgi.py when RECOMMENDATIONS_WARM is on) or else on
+# first use, and kept in sync incrementally: max(UpdatedAt) and the row count
+# of job_opening, read from the database on each use so writes from any
+# process count, tell when jobs changed, and then only the rows with a newer
+# UpdatedAt are re-read. Both reads happen outside the index lock, which is
+# only held to apply them, so requests don't queue behind the database. Changed and new jobs go into a small delta matrix
+# that is merged into the main one once it grows. Deleted jobs are noticed
+# when recommended jobs are loaded and dropped then.
+
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]')
+STOP_WORDS = frozenset('''
+    a an and are as at be by for from has have in is it its of on or our that the their this to we
+    will with you your job role team work working experience ability skills etc
+'''.split())
+
+SYNC_SKEW = timedelta(seconds=2)
+
+
+def is_available():
+    return np is not None
+
+
+def get_job_state():
+    # Moves with every job write (UpdatedAt) and delete (the count)
+    state = JobOpening.objects.aggregate(updated=Max('UpdatedAt'), count=Count('pk'))
+    return state['updated'], state['count']
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall((text or '').lower()) if token not in STOP_WORDS]
+
+
+def job_text(job):
+    return ' '.join([job['JobTitle']] * 2 + [job['Description'] or '', job['Location'] or ''])
+
+
+def student_text(student):
+    """
+    The text a student is matched on: their major, account bio and the text
+    of their uploaded resumes (see api/resumes.py).
+    """
+    parts = [student.Major or '']
+    user = CustomUser.objects.filter(email=student.Email).values('bio').first()
+    if user:
+        parts.append(user['bio'] or '')
+    parts.extend(ResumeText.objects.filter(Email=student.Email).exclude(Text='').values_list('Text', flat=True))
+    return ' '.join(parts)
+
+
+class JobIndex:
+    """
+    In-memory TF-IDF index of the job openings. Thread safe; one per process.
+    """
+    job_fields = ('JobID', 'JobTitle', 'Description', 'Location', 'Status', 'Deadline')
+    # Merge the delta into the main matrix past this many rows
+    min_compact_rows = 1000
+    compact_ratio = 0.05
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        self.vocabulary = {}
+        self.df = np.zeros(0, dtype=np.int64)
+        # Main matrix and per-row metadata
+        self.matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.job_ids = np.zeros(0, dtype=np.int64)
+        self.live = np.zeros(0, dtype=bool)
+        self.active = np.zeros(0, dtype=bool)
+        self.deadlines = np.zeros(0, dtype=np.int64)
+        self.row_of = {}
+        # Jobs added or changed since the last merge: JobID -> (terms, weights, active, deadline)
+        self.delta = {}
+        self.merged_idf = np.zeros(0, dtype=np.float32)
+        self.norms = np.zeros(0, dtype=np.float32)
+        self.state = None
+        self.synced_at = None
+
+    # Vectors
+
+    def vectorize(self, text, grow=True):
+        counts = Counter(tokenize(text))
+        terms, weights = [], []
+        for token, count in counts.items():
+            column = self.vocabulary.get(token)
+            if column is None:
+                if not grow:
+                    continue
+                column = self.vocabulary[token] = len(self.vocabulary)
+            terms.append(column)
+            weights.append(1 + math.log(count))
+        return np.array(terms, dtype=np.int32), np.array(weights, dtype=np.float32)
+
+    def idf(self):
+        # Frozen at the last merge so the main matrix row norms stay valid
+        # between merges; terms first seen since then are weighted from the
+        # current document counts
+        idf = (np.log((1 + len(self.job_ids)) / (1 + self.df)) + 1).astype(np.float32)
+        idf[:len(self.merged_idf)] = self.merged_idf
+        return idf
+
+    def grow_df(self):
+        if len(self.df) < len(self.vocabulary):
+            self.df = np.concatenate([self.df, np.zeros(len(self.vocabulary) - len(self.df), dtype=np.int64)])
+
+    def row_terms(self, row):
+        return self.matrix.indices[self.matrix.indptr[row]:self.matrix.indptr[row + 1]]
+
+    # Loading
+
+    def build(self):
+        with self.lock:
+            started = timezone.now()
+            self.reset()
+            state = get_job_state()
+            self.upsert(JobOpening.objects.values(*self.job_fields).order_by('JobID').iterator(chunk_size=2000))
+            self.compact()
+            self.state, self.synced_at = state, started
+
+    def sync(self):
+        """
+        Pick up jobs changed since the last sync, if the job table says
+        anything changed.
+        """
+        if self.synced_at is None:
+            with self.lock:
+                if self.synced_at is None:
+                    return self.build()
+        state = get_job_state()
+        if state == self.state:
+            return
+        started, synced_at = timezone.now(), self.synced_at
+        changed = list(JobOpening.objects.filter(UpdatedAt__gte=synced_at - SYNC_SKEW).values(*self.job_fields))
+        with self.lock:
+            if self.synced_at != synced_at:
+                # Another request synced meanwhile; whatever it missed still
+                # shows in the state next time
+                return
+            self.upsert(changed)
+            self.state, self.synced_at = state, started
+            if len(self.delta) >= max(self.min_compact_rows, self.compact_ratio * len(self.job_ids)):
+                self.compact()
+
+    def upsert(self, jobs):
+        for job in jobs:
+            self.discard(job['JobID'])
+            terms, weights = self.vectorize(job_text(job))
+            self.grow_df()
+            self.df[terms] += 1
+            self.delta[job['JobID']] = (
+                terms, weights, job['Status'] == JobOpening.STATUS_ACTIVE, job['Deadline'].toordinal(),
+            )
+
+    def discard(self, job_id):
+        with self.lock:
+            if job_id in self.delta:
+                self.df[self.delta.pop(job_id)[0]] -= 1
+            row = self.row_of.get(job_id)
+            if row is not None and self.live[row]:
+                self.live[row] = False
+                self.df[self.row_terms(row)] -= 1
+
+    def compact(self):
+        """
+        Rebuild the main matrix from its live rows plus the delta.
+        """
+        with self.lock:
+            keep = np.flatnonzero(self.live)
+            main = self.matrix[keep]
+            main.resize((main.shape[0], len(self.vocabulary)))
+            delta, delta_ids, delta_active, delta_deadlines = self.delta_block()
+
+            self.matrix = sparse.vstack([main, delta], format='csr', dtype=np.float32)
+            self.job_ids = np.concatenate([self.job_ids[keep], delta_ids])
+            self.active = np.concatenate([self.active[keep], delta_active])
+            self.deadlines = np.concatenate([self.deadlines[keep], delta_deadlines])
+            self.live = np.ones(len(self.job_ids), dtype=bool)
+            self.row_of = {int(job_id): row for row, job_id in enumerate(self.job_ids)}
+            self.delta = {}
+            self.merged_idf = np.zeros(0, dtype=np.float32)
+            self.merged_idf = self.idf()
+            self.norms = row_norms(self.matrix, self.merged_idf)
+
+    def delta_block(self):
+        entries = list(self.delta.items())
+        return (
+            rows_to_csr([(terms, weights) for _, (terms, weights, _, _) in entries], len(self.vocabulary)),
+            np.array([job_id for job_id, _ in entries], dtype=np.int64),
+            np.array([entry[2] for _, entry in entries], dtype=bool),
+            np.array([entry[3] for _, entry in entries], dtype=np.int64),
+        )
+
+    # Scoring
+
+    def top_k(self, texts, k, open_only=True):
+        """
+        The k best matching job ids and scores for each text, scored together.
+        """
+        with self.lock:
+            idf = self.idf()
+            queries = []
+            for text in texts:
+                terms, weights = self.vectorize(text, grow=False)
+                weights = weights * idf[terms]
+                norm = np.linalg.norm(weights) or 1
+                # Folding the job side's IDF into the query keeps the job
+                # matrix as raw term frequencies
+                queries.append((terms, weights * idf[terms] / norm))
+            # Dense (terms x students): the jobs x terms CSR matrices multiply
+            # it in one pass over their non-zeros
+            query_matrix = rows_to_csr(queries, len(self.vocabulary)).T.toarray()
+
+            # (students x jobs) cosine similarities: the main matrix, then the delta
+            delta, delta_ids, delta_active, delta_deadlines = self.delta_block()
+            scores = np.hstack([
+                (self.matrix @ query_matrix[:self.matrix.shape[1]]).T / self.norms,
+                (delta @ query_matrix).T / row_norms(delta, idf),
+            ])
+            job_ids = np.concatenate([self.job_ids, delta_ids])
+            eligible = np.concatenate([self.live, np.ones(len(delta_ids), dtype=bool)])
+            if open_only:
+                today = date.today().toordinal()
+                eligible &= np.concatenate([self.active, delta_active])
+                eligible &= np.concatenate([self.deadlines, delta_deadlines]) >= today
+            scores[:, ~eligible] = 0
+
+            results = []
+            k = min(k, scores.shape[1])
+            for row in scores:
+                if k == 0:
+                    results.append([])
+                    continue
+                best = np.argpartition(-row, k - 1)[:k]
+                best = best[np.argsort(-row[best])]
+                results.append([(int(job_ids[i]), float(row[i])) for i in best if row[i] > 0])
+            return results
+
+
+def rows_to_csr(rows, width):
+    # [(column indices, values)] -> CSR matrix with one row per entry
+    indptr = np.cumsum([0] + [len(terms) for terms, _ in rows])
+    return sparse.csr_matrix(
+        (
+            np.concatenate([values for _, values in rows] or [np.zeros(0, np.float32)]),
+            np.concatenate([terms for terms, _ in rows] or [np.zeros(0, np.int32)]),
+            indptr,
+        ),
+        shape=(len(rows), width),
+        dtype=np.float32,
+    )
+
+
+def row_norms(matrix, idf):
+    # Norms of the TF-IDF rows, without materializing the weighted matrix
+    norms = np.sqrt(matrix.multiply(matrix).tocsr() @ (idf[:matrix.shape[1]] ** 2)).astype(np.float32)
+    norms[norms == 0] = 1
+    return norms
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """
+    The process-wide job index, built on first use and synced on each call.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = JobIndex()
+    _index.sync()
+    return _index
+
+
+def build_index():
+    try:
+        get_index()
+    finally:
+        # Not held open by this thread
+        connections.close_all()
+
+
+def warm_index():
+    """
+    Build this process's index in a background thread, so the first
+    recommendation request doesn't pay for it, if RECOMMENDATIONS_WARM is on.
+    """
+    if not is_available() or not getattr(settings, 'RECOMMENDATIONS_WARM', False):
+        return None
+    thread = threading.Thread(target=build_index, name='job-index-warm', daemon=True)
+    thread.start()
+    return thread
+
+
+def recommend_jobs(student, k=10):
+    """
+    [(JobOpening, score)] for the student, best first. Jobs deleted since the
+    index last saw them are dropped from the index on the way.
+    """
+    index = get_index()
+    started = time.perf_counter()
+    # Over-fetch a little so deleted jobs don't leave the list short
+    matches = index.top_k([student_text(student)], k + 5)[0]
+    jobs = JobOpening.objects.in_bulk([job_id for job_id, _ in matches])
+    for job_id, _ in matches:
+        if job_id not in jobs:
+            index.discard(job_id)
+    results = [(jobs[job_id], score) for job_id, score in matches if job_id in jobs][:k]
+    return results, (time.perf_counter() - started) * 1000
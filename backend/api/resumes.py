@@ -0,0 +1,226 @@
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from multiprocessing import get_context
+
+import django
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Applicant, CustomUser, ResumeText
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # optional dependency, see requirements.txt
+    PdfReader = None
+
+# Resume text extraction.
+#
+# Saving a CustomUser.pdf_file or Applicant.Resume only queues the file: a
+# post_save receiver upserts its resume_text row as Pending, which costs the
+# upload request a query or two and no parsing. `manage.py process_resumes`
+# runs the worker, which claims batches of pending rows with SELECT ... FOR
+# UPDATE SKIP LOCKED (several workers never take the same rows), extracts
+# the PDFs in a process pool and stores the normalized text. A claimed row
+# holds a lease; if its worker dies the row is picked up again once the lease
+# runs out, and a file that keeps failing is given up on after
+# RESUME_MAX_ATTEMPTS tries.
+#
+# The text feeds the student side of job recommendations
+# (api/recommendations.py) and the ?resume= student search (api/search.py).
+
+CONTROL_RE = re.compile(r'[\x00-\x08\x0b-\x1f\x7f]')
+HYPHENATED_RE = re.compile(r'(\w)-\n(\w)')
+SPACES_RE = re.compile(r'[^\S\n]+')
+BLANK_LINES_RE = re.compile(r'\n\s*\n+')
+
+
+def is_available():
+    return PdfReader is not None
+
+
+def get_lease_duration():
+    return timedelta(seconds=getattr(settings, 'RESUME_LEASE_SECONDS', 300))
+
+
+def get_max_attempts():
+    return getattr(settings, 'RESUME_MAX_ATTEMPTS', 3)
+
+
+def normalize_text(text):
+    """
+    Clean up text as it comes out of a PDF: Unicode compatibility forms
+    (ligatures, full-width letters), words hyphenated across lines, control
+    characters and runs of whitespace.
+    """
+    text = unicodedata.normalize('NFKC', text)
+    text = CONTROL_RE.sub(' ', text.replace('\r\n', '\n').replace('\r', '\n'))
+    text = HYPHENATED_RE.sub(r'\1\2', text)
+    text = SPACES_RE.sub(' ', text)
+    text = BLANK_LINES_RE.sub('\n\n', text)
+    lines = (line.strip() for line in text.split('\n'))
+    return '\n'.join(lines).strip()[:getattr(settings, 'RESUME_TEXT_MAX_CHARS', 100_000)]
+
+
+def extract_pdf_text(path, max_pages):
+    # Runs in a pool process
+    if PdfReader is None:
+        raise RuntimeError('Resume extraction needs pypdf installed')
+    with open(path, 'rb') as file:
+        if file.read(5) != b'%PDF-':
+            raise ValueError('Not a PDF file')
+        reader = PdfReader(file)
+        pages = [page.extract_text() or '' for page in reader.pages[:max_pages]]
+    return normalize_text('\n\n'.join(pages))
+
+
+# Queueing
+
+def enqueue(source, owner_id, email, file_name):
+    """
+    Queue (or re-queue) the resume of an owner for extraction. The text of
+    a previous file stays searchable until the new one is extracted.
+    """
+    if not file_name:
+        ResumeText.objects.filter(Source=source, OwnerID=owner_id).delete()
+        return
+    queued = ResumeText.objects.filter(Source=source, OwnerID=owner_id, File=file_name, Email=email)
+    if queued.exists():
+        return
+    defaults = {
+        'Email': email, 'File': file_name, 'Status': ResumeText.STATUS_PENDING,
+        'Attempts': 0, 'LeaseExpiresAt': None, 'Error': '', 'QueuedAt': timezone.now(),
+    }
+    # Files are stored by content (api/storage.py), so the same file may
+    # already have been extracted for another row
+    extracted = ResumeText.objects.filter(File=file_name, Status=ResumeText.STATUS_DONE).values('Text').first()
+    if extracted is not None:
+        defaults.update(Status=ResumeText.STATUS_DONE, Text=extracted['Text'], ExtractedAt=timezone.now())
+    ResumeText.objects.update_or_create(Source=source, OwnerID=owner_id, defaults=defaults)
+
+
+@receiver(post_save, sender=CustomUser)
+def queue_account_resume(sender, instance, created, update_fields=None, **kwargs):
+    # Logins save last_login only; new accounts have no file yet
+    if update_fields is not None and 'pdf_file' not in update_fields:
+        return
+    if created and not instance.pdf_file:
+        return
+    enqueue(ResumeText.SOURCE_ACCOUNT, instance.pk, instance.email, instance.pdf_file.name)
+
+
+@receiver(post_save, sender=Applicant)
+def queue_applicant_resume(sender, instance, **kwargs):
+    email = instance.SUCID.Email
+    enqueue(ResumeText.SOURCE_APPLICANT, instance.pk, email, instance.Resume.name)
+
+
+@receiver(post_delete, sender=CustomUser)
+@receiver(post_delete, sender=Applicant)
+def drop_resume_text(sender, instance, **kwargs):
+    source = ResumeText.SOURCE_ACCOUNT if sender is CustomUser else ResumeText.SOURCE_APPLICANT
+    ResumeText.objects.filter(Source=source, OwnerID=instance.pk).delete()
+
+
+def backfill():
+    """
+    Queue every uploaded resume that has no resume_text row yet, e.g. files
+    uploaded before the pipeline existed. Returns how many were queued.
+    """
+    rows = []
+    for pk, email, name in CustomUser.objects.exclude(pdf_file='').exclude(pdf_file=None).values_list(
+        'pk', 'email', 'pdf_file',
+    ):
+        rows.append(ResumeText(Source=ResumeText.SOURCE_ACCOUNT, OwnerID=pk, Email=email, File=name))
+    for pk, email, name in Applicant.objects.exclude(Resume='').values_list('pk', 'SUCID__Email', 'Resume'):
+        rows.append(ResumeText(Source=ResumeText.SOURCE_APPLICANT, OwnerID=pk, Email=email, File=name))
+    created = ResumeText.objects.bulk_create(rows, ignore_conflicts=True, batch_size=1000)
+    return len(created)
+
+
+# Worker
+
+def claim(limit):
+    """
+    Lease up to `limit` queued rows to this worker: pending ones, and ones
+    whose worker's lease ran out. Returns [(pk, file name)].
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            ResumeText.objects.filter(
+                Q(Status=ResumeText.STATUS_PENDING)
+                | Q(Status=ResumeText.STATUS_PROCESSING, LeaseExpiresAt__lte=now)
+            )
+            .select_for_update(skip_locked=True)
+            .order_by('QueuedAt', 'pk')
+            .values_list('pk', 'File')[:limit]
+        )
+        ResumeText.objects.filter(pk__in=[pk for pk, _ in rows]).update(
+            Status=ResumeText.STATUS_PROCESSING, Attempts=F('Attempts') + 1,
+            LeaseExpiresAt=now + get_lease_duration(), UpdatedAt=now,
+        )
+    return rows
+
+
+def finish(pk, file_name, text=None, error=None):
+    # Only if the row still holds the claimed file: a re-upload while it was
+    # being extracted re-queued the row and this result is stale
+    now = timezone.now()
+    row = ResumeText.objects.filter(pk=pk, File=file_name, Status=ResumeText.STATUS_PROCESSING)
+    if error is None:
+        return row.update(
+            Status=ResumeText.STATUS_DONE, Text=text, Error='', LeaseExpiresAt=None,
+            ExtractedAt=now, UpdatedAt=now,
+        )
+    return row.update(
+        Status=Case(
+            When(Attempts__gte=get_max_attempts(), then=Value(ResumeText.STATUS_FAILED)),
+            default=Value(ResumeText.STATUS_PENDING),
+        ),
+        Error=error[:1000], LeaseExpiresAt=None, UpdatedAt=now,
+    )
+
+
+def process_batch(pool, limit):
+    """
+    Claim up to `limit` rows, extract them in `pool` and store the results.
+    Returns how many rows were processed; raises BrokenProcessPool (after
+    recording the batch as failed) if a pool process died.
+    """
+    rows = claim(limit)
+    max_pages = getattr(settings, 'RESUME_MAX_PAGES', 20)
+    futures = [
+        (pk, name, pool.submit(extract_pdf_text, default_storage.path(name), max_pages))
+        for pk, name in rows
+    ]
+    broken = None
+    for pk, name, future in futures:
+        try:
+            text = future.result()
+        except Exception as e:
+            # e.g. a PDF that crashes the parser takes its process down
+            if isinstance(e, BrokenProcessPool):
+                broken = e
+            finish(pk, name, error=f'{type(e).__name__}: {e}')
+        else:
+            finish(pk, name, text=text)
+    if broken is not None:
+        raise broken
+    return len(rows)
+
+
+def create_pool(workers):
+    # Spawned, not forked, so pool processes don't share the parent's
+    # database connections; each sets Django up before taking work
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=get_context('spawn'), initializer=django.setup,
+        max_tasks_per_child=100,
+    )
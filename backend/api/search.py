@@ -0,0 +1,113 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+# Full-text search for JobOpening on PostgreSQL.
+#
+# job_opening."SearchDocument" holds a weighted tsvector of the title (A),
+# description (B) and location (C). A trigger keeps it in sync on every
+# INSERT/UPDATE, including bulk writes that skip Django signals, and a GIN
+# index makes matching independent of table size. The DDL is installed after
+# `migrate` (see ApiDataConfig.ready) so the models stay usable on SQLite,
+# where search falls back to DRF's icontains SearchFilter.
+
+SEARCH_CONFIG = 'english'
+
+SEARCH_TRIGGER_SQL = f"""
+CREATE OR REPLACE FUNCTION job_opening_search_document() RETURNS trigger AS $$
+BEGIN
+    NEW."SearchDocument" :=
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW."JobTitle", '')), 'A') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW."Description", '')), 'B') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW."Location", '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS job_opening_search_document_trg ON job_opening;
+CREATE TRIGGER job_opening_search_document_trg
+    BEFORE INSERT OR UPDATE OF "JobTitle", "Description", "Location", "SearchDocument"
+    ON job_opening
+    FOR EACH ROW EXECUTE FUNCTION job_opening_search_document();
+
+CREATE INDEX IF NOT EXISTS job_opening_search_gin ON job_opening USING gin ("SearchDocument");
+
+-- Backfill rows written before the trigger existed
+UPDATE job_opening SET "JobTitle" = "JobTitle" WHERE "SearchDocument" IS NULL;
+"""
+
+# The same for the extracted resume text (api/resumes.py)
+RESUME_SEARCH_TRIGGER_SQL = f"""
+CREATE OR REPLACE FUNCTION resume_text_search_document() RETURNS trigger AS $$
+BEGIN
+    NEW."SearchDocument" := to_tsvector('{SEARCH_CONFIG}', coalesce(NEW."Text", ''));
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS resume_text_search_document_trg ON resume_text;
+CREATE TRIGGER resume_text_search_document_trg
+    BEFORE INSERT OR UPDATE OF "Text", "SearchDocument"
+    ON resume_text
+    FOR EACH ROW EXECUTE FUNCTION resume_text_search_document();
+
+CREATE INDEX IF NOT EXISTS resume_text_search_gin ON resume_text USING gin ("SearchDocument");
+
+UPDATE resume_text SET "Text" = "Text" WHERE "SearchDocument" IS NULL;
+"""
+
+
+def is_full_text_enabled(using='default'):
+    return connections[using].vendor == 'postgresql'
+
+
+def install_search_trigger(sender, using='default', **kwargs):
+    # post_migrate handler; a no-op on databases without tsvector support
+    if not is_full_text_enabled(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(SEARCH_TRIGGER_SQL)
+        cursor.execute(RESUME_SEARCH_TRIGGER_SQL)
+
+
+def build_search_query(terms):
+    """
+    Turn free-text search terms into a prefix-matching tsquery, so "soft eng"
+    matches "Software Engineer". Returns None when nothing searchable is left.
+    """
+    words = []
+    for term in terms:
+        words.extend(re.findall(r'\w+', term))
+    if not words:
+        return None
+    raw = ' & '.join(f'{word}:*' for word in words)
+    return SearchQuery(raw, search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_job_openings(queryset, terms):
+    query = build_search_query(terms)
+    if query is None:
+        return queryset
+    # Cast to double precision so the rank survives the round trip through a
+    # pagination cursor exactly
+    return queryset.filter(SearchDocument=query).annotate(
+        search_rank=Cast(SearchRank(F('SearchDocument'), query), FloatField())
+    )
+
+
+def search_resumes(queryset, terms):
+    """
+    Filter ResumeText rows to those matching all the words in `terms`.
+    """
+    if not is_full_text_enabled(queryset.db):
+        for term in terms:
+            for word in re.findall(r'\w+', term):
+                queryset = queryset.filter(Text__icontains=word)
+        return queryset
+    query = build_search_query(terms)
+    if query is None:
+        return queryset
+    return queryset.filter(SearchDocument=query)
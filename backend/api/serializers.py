@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import *
 from django.utils import timezone
+from django.core.exceptions import ValidationError as DjangoValidationError
 
 from rest_framework import serializers
 from .models import *
@@ -8,7 +9,12 @@ from .models import *
 from rest_framework import serializers
 from .models import *
 
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from .authentication import set_profile_claims
+from .fieldsets import FieldsetSerializerMixin
+from .moderation import assign_moderator
 
 class RegisterSerializer(serializers.ModelSerializer):
     user_type = serializers.ChoiceField(choices=CustomUser.USER_TYPE_CHOICES)
@@ -63,13 +69,13 @@ class RegisterSerializer(serializers.ModelSerializer):
                 GraduationYear=validated_data.pop('graduation_year', None)
             )
             
-            # Try to find an available moderator for student verification
+            # Queue the student for verification with the least busy moderator
             try:
-                moderator = Moderator.objects.first()
-                if moderator:
+                moderator_id = assign_moderator(VerifyApplicant)
+                if moderator_id:
                     # Add the student to the verification queue
                     VerifyApplicant.objects.create(
-                        ModeratorID=moderator,
+                        ModeratorID_id=moderator_id,
                         ApplicantUCID=student,
                         VerificationStatus='Pending',
                         VerificationDate=timezone.now().date()
@@ -98,13 +104,15 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     def get_token(cls, user):
         token = super().get_token(user)
         
-        # Add custom claims
-        token['user_type'] = user.user_type
-        token['email'] = user.email
+        # Add custom claims: user type and profile ids, so requests can be
+        # authorized without a database lookup (see api/authentication.py)
+        set_profile_claims(token, user)
         
         return token
 
     def validate(self, attrs):
+        # The frontend logs in with the email, which is also the username
+        attrs['username'] = attrs.get('email', attrs.get('username', ''))
         data = super().validate(attrs)
         
         # Add custom response data
@@ -112,6 +120,21 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         data['email'] = self.user.email
         
         return data
+
+
+class ProfileTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refreshed access tokens get the user's current profile claims rather
+    than the ones copied from the refresh token.
+    """
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data['access'], verify=False)
+        user = CustomUser.objects.filter(pk=access[jwt_settings.USER_ID_CLAIM]).first()
+        if user is not None:
+            data['access'] = str(set_profile_claims(access, user))
+        return data
     
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -119,57 +142,179 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'user_type']
     
 
-class StudentSerializer(serializers.ModelSerializer):
+class StudentSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Student
         fields = '__all__'
+        # ?expand= (api/fieldsets.py)
+        expandable_fields = {'posts': ('PostSerializer', 'post_set')}
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Post
-        fields = '__all__'
+        # HotScore only orders the hot feed; it and Upvotes are kept up to date by votes (api/forum.py)
+        exclude = ['HotScore']
+        expandable_fields = {'VUCID': 'StudentSerializer'}
 
-class VolunteerSerializer(serializers.ModelSerializer):
+class VolunteerSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Volunteer
         fields = '__all__'
+        expandable_fields = {'SUCID': 'StudentSerializer'}
 
-class ApplicantSerializer(serializers.ModelSerializer):
+class ApplicantSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Applicant
         fields = '__all__'
+        expandable_fields = {'SUCID': 'StudentSerializer'}
 
-class ModeratorSerializer(serializers.ModelSerializer):
+class ModeratorSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Moderator
         fields = '__all__'
+        expandable_fields = {'ModeratorID': 'StudentSerializer'}
 
-class EmployerSerializer(serializers.ModelSerializer):
+class EmployerSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Employer
         fields = '__all__'
+        expandable_fields = {'jobs': ('JobOpeningSerializer', 'jobopening_set')}
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    many=True serializer used by the bulk endpoints.
+
+    Related objects referenced by the rows are fetched with one query per
+    relation instead of one per row, and rows are written with bulk_create /
+    bulk_update. For updates pass `instance` as a {pk: object} dict; every row
+    must then carry its primary key.
+    """
+
+    def get_pk_field(self):
+        return self.child.Meta.model._meta.pk
+
+    def preload_related(self, data):
+        rows = [item for item in data if isinstance(item, dict)]
+        for name, field in self.child.fields.items():
+            if field.read_only or not isinstance(field, serializers.PrimaryKeyRelatedField):
+                continue
+            pk_field = field.get_queryset().model._meta.pk
+            ids = set()
+            for row in rows:
+                try:
+                    ids.add(pk_field.to_python(row.get(name)))
+                except DjangoValidationError:
+                    pass
+            ids.discard(None)
+            field.to_internal_value = self.make_related_lookup(field, pk_field, field.get_queryset().in_bulk(ids))
+
+    @staticmethod
+    def make_related_lookup(field, pk_field, objects):
+        def to_internal_value(data):
+            try:
+                key = pk_field.to_python(data)
+            except DjangoValidationError:
+                field.fail('incorrect_type', data_type=type(data).__name__)
+            if key not in objects:
+                field.fail('does_not_exist', pk_value=data)
+            return objects[key]
+        return to_internal_value
+
+    def to_internal_value(self, data):
+        self.row_instances = []
+        if isinstance(data, list):
+            self.preload_related(data)
+        return super().to_internal_value(data)
+
+    def run_child_validation(self, data):
+        if self.instance is not None:
+            pk_field = self.get_pk_field()
+            try:
+                pk = pk_field.to_python(data.get(pk_field.name)) if isinstance(data, dict) else None
+            except DjangoValidationError:
+                pk = None
+            if pk not in self.instance:
+                raise serializers.ValidationError({pk_field.name: ['Object does not exist.']})
+            self.child.instance = self.instance[pk]
+            self.child.initial_data = data
+            self.row_instances.append(self.child.instance)
+        return super().run_child_validation(data)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        return model.objects.bulk_create([model(**attrs) for attrs in validated_data])
+
+    def update(self, instance, validated_data):
+        model = self.child.Meta.model
+        fields = {'UpdatedAt'}
+        now = timezone.now()
+        for obj, attrs in zip(self.row_instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(obj, attr, value)
+                fields.add(attr)
+            # bulk_update() bypasses auto_now
+            obj.UpdatedAt = now
+        model.objects.bulk_update(self.row_instances, sorted(fields))
+        return self.row_instances
+
 
-class JobOpeningSerializer(serializers.ModelSerializer):
+class JobOpeningSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = JobOpening
-        fields = '__all__'
+        exclude = ['SearchDocument']
+        list_serializer_class = BulkListSerializer
+        expandable_fields = {'Employer': 'EmployerSerializer'}
 
-class JobApplicationSerializer(serializers.ModelSerializer):
+class JobApplicationSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = JobApplication
         fields = '__all__'
+        list_serializer_class = BulkListSerializer
+        expandable_fields = {
+            'ApplicantUCID': 'StudentSerializer', 'JobID': 'JobOpeningSerializer', 'EmployerID': 'EmployerSerializer',
+        }
 
-class VerifyApplicantSerializer(serializers.ModelSerializer):
+    def validate_JobID(self, job):
+        # New applications, and ones moved to another job, need a job taking
+        # applications; existing ones keep moving through their statuses
+        if (self.instance is None or self.instance.JobID_id != job.pk) and not job.is_open():
+            raise serializers.ValidationError('This job opening is no longer taking applications.')
+        return job
+
+class VerifyApplicantSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = VerifyApplicant
         fields = '__all__'
+        read_only_fields = ['LeaseExpiresAt']
+        expandable_fields = {'ModeratorID': 'ModeratorSerializer', 'ApplicantUCID': 'StudentSerializer'}
 
-class VerifyEmployerSerializer(serializers.ModelSerializer):
+class VerifyEmployerSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = VerifyEmployer
         fields = '__all__'
+        read_only_fields = ['LeaseExpiresAt']
+        expandable_fields = {'ModeratorID': 'ModeratorSerializer', 'EmployerID': 'EmployerSerializer'}
+
+class VerifyApplicantQueueSerializer(serializers.ModelSerializer):
+    # Embed the student so the moderator queue needs no per-row lookups
+    student = StudentSerializer(source='ApplicantUCID', read_only=True)
 
-class ReviewsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = VerifyApplicant
+        fields = '__all__'
+
+class VerifyEmployerQueueSerializer(serializers.ModelSerializer):
+    # Embed the employer so the moderator queue needs no per-row lookups
+    employer = EmployerSerializer(source='EmployerID', read_only=True)
+
+    class Meta:
+        model = VerifyEmployer
+        fields = '__all__'
+
+class ReviewsSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Reviews
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        expandable_fields = {
+            'ModeratorID': 'ModeratorSerializer', 'JobID': 'JobOpeningSerializer', 'EmployerID': 'EmployerSerializer',
+        }
\ No newline at end of file
@@ -0,0 +1,194 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+from django.db.models.signals import post_delete, post_init, post_save
+
+from .models import Employer, JobApplication, JobApplicationSummary, JobOpening
+
+# Employer dashboard statistics.
+#
+# Everything is derived from one grouped row per (job, status): the number of
+# applications and the earliest DateApplied. Those rows come either straight
+# from job_application (GROUP BY on the EmployerID/Status index) or, when
+# EMPLOYER_STATS_SUMMARY is on, from job_application_summary, which holds the
+# same rows precomputed. With the summary the dashboard reads
+# O(jobs x statuses) rows however many applications an employer has.
+#
+# The summary rows of a job are recomputed whenever one of its applications
+# is saved or deleted, and those of the job it was moved away from when its
+# JobID changes. Bulk writes (which send no signals) refresh the jobs
+# they touched explicitly; `manage.py rebuild_application_summary` backfills.
+
+_deferred_jobs = ContextVar('deferred_summary_jobs', default=None)
+# JobID as loaded from the database, to tell whether a save moved the application
+LOADED_JOB_ATTR = '_summary_loaded_job'
+
+
+def is_summary_enabled():
+    return getattr(settings, 'EMPLOYER_STATS_SUMMARY', False)
+
+
+def live_rows(queryset):
+    return (
+        queryset.order_by()
+        .values('JobID', 'Status')
+        .annotate(ApplicationCount=Count('pk'), FirstApplied=Min('DateApplied'))
+    )
+
+
+def summary_rows(queryset):
+    return queryset.values('JobID', 'Status', 'ApplicationCount', 'FirstApplied')
+
+
+def refresh_application_summary(job_ids):
+    """
+    Recompute the summary rows of the given jobs from job_application.
+    """
+    job_ids = sorted(set(job_ids))
+    if not job_ids:
+        return
+
+    deferred = _deferred_jobs.get()
+    if deferred is not None:
+        deferred.update(job_ids)
+        return
+
+    with transaction.atomic():
+        # Lock the jobs so concurrent refreshes of the same job don't both
+        # insert its rows
+        employers = dict(
+            JobOpening.objects.select_for_update().filter(pk__in=job_ids).order_by('pk')
+            .values_list('JobID', 'Employer')
+        )
+        rows = live_rows(JobApplication.objects.filter(JobID__in=employers))
+        JobApplicationSummary.objects.filter(JobID__in=job_ids).delete()
+        JobApplicationSummary.objects.bulk_create([
+            JobApplicationSummary(
+                JobID_id=row['JobID'], EmployerID_id=employers[row['JobID']], Status=row['Status'],
+                ApplicationCount=row['ApplicationCount'], FirstApplied=row['FirstApplied'],
+            )
+            for row in rows
+        ])
+
+
+@contextmanager
+def deferred_summary_refresh():
+    """
+    Collect the refreshes requested inside the block and run them once at
+    the end, e.g. around a bulk delete that sends a signal per row.
+    """
+    if _deferred_jobs.get() is not None:
+        yield
+        return
+
+    job_ids = set()
+    token = _deferred_jobs.set(job_ids)
+    try:
+        yield
+    finally:
+        _deferred_jobs.reset(token)
+    refresh_application_summary(job_ids)
+
+
+def remember_loaded_job(sender, instance, **kwargs):
+    # Not for a deferred JobID, which would cost a query
+    setattr(instance, LOADED_JOB_ATTR, instance.__dict__.get('JobID_id'))
+
+
+def touched_job_ids(applications):
+    """
+    The jobs whose summary rows a write of `applications` changes: their
+    current jobs and those they were loaded with.
+    """
+    job_ids = set()
+    for application in applications:
+        job_ids.add(application.JobID_id)
+        loaded = getattr(application, LOADED_JOB_ATTR, None)
+        if loaded is not None:
+            job_ids.add(loaded)
+        setattr(application, LOADED_JOB_ATTR, application.JobID_id)
+    return job_ids
+
+
+def update_application_summary(sender, instance, **kwargs):
+    # Deleting a job or employer removes its summary rows by cascade
+    if isinstance(kwargs.get('origin'), (JobOpening, Employer)):
+        return
+    refresh_application_summary(touched_job_ids([instance]))
+
+
+def connect_summary_signals():
+    # Only connected when the summary is enabled: a post_delete receiver makes
+    # Django fetch every cascaded application instead of deleting in bulk
+    post_init.connect(remember_loaded_job, sender=JobApplication, dispatch_uid='application_summary_init')
+    post_save.connect(update_application_summary, sender=JobApplication, dispatch_uid='application_summary_save')
+    post_delete.connect(update_application_summary, sender=JobApplication, dispatch_uid='application_summary_delete')
+
+
+def disconnect_summary_signals():
+    post_init.disconnect(sender=JobApplication, dispatch_uid='application_summary_init')
+    post_save.disconnect(sender=JobApplication, dispatch_uid='application_summary_save')
+    post_delete.disconnect(sender=JobApplication, dispatch_uid='application_summary_delete')
+
+
+def employer_stats(employer):
+    """
+    Dashboard numbers for one employer: job counts by status, the
+    application status funnel, applications per job and time to first
+    application (days from posting to the first application).
+    """
+    use_summary = is_summary_enabled()
+    if use_summary:
+        rows = summary_rows(JobApplicationSummary.objects.filter(EmployerID=employer))
+    else:
+        rows = live_rows(JobApplication.objects.filter(EmployerID=employer))
+
+    by_job = defaultdict(list)
+    funnel = defaultdict(int)
+    for row in rows:
+        by_job[row['JobID']].append(row)
+        funnel[row['Status']] += row['ApplicationCount']
+
+    jobs = []
+    job_status = defaultdict(int)
+    waits = []
+    for job in employer.jobopening_set.order_by('JobID').values('JobID', 'JobTitle', 'Status', 'PostedAt'):
+        job_status[job['Status']] += 1
+        job_rows = by_job.get(job['JobID'], [])
+
+        first_applied = min((row['FirstApplied'] for row in job_rows), default=None)
+        days_to_first = None
+        if first_applied is not None and job['PostedAt'] is not None:
+            days_to_first = max((first_applied - job['PostedAt'].date()).days, 0)
+            waits.append(days_to_first)
+
+        jobs.append({
+            'JobID': job['JobID'],
+            'JobTitle': job['JobTitle'],
+            'Status': job['Status'],
+            'applications': sum(row['ApplicationCount'] for row in job_rows),
+            'by_status': {row['Status']: row['ApplicationCount'] for row in job_rows},
+            'first_application': first_applied,
+            'days_to_first_application': days_to_first,
+        })
+
+    return {
+        'EmployerID': employer.pk,
+        'source': 'summary' if use_summary else 'live',
+        'jobs': {
+            'total': len(jobs),
+            'open': job_status[JobOpening.STATUS_ACTIVE],
+            'closed': job_status[JobOpening.STATUS_CLOSED],
+            'by_status': dict(job_status),
+        },
+        'applications': {
+            'total': sum(funnel.values()),
+            'by_status': dict(funnel),
+        },
+        'average_days_to_first_application': round(sum(waits) / len(waits), 2) if waits else None,
+        'per_job': jobs,
+    }
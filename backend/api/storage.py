@@ -0,0 +1,168 @@
+import hashlib
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.deconstruct import deconstructible
+from django.utils.http import quote_etag
+
+# Resume file storage and serving.
+#
+# Resumes are stored content-addressed: a file's name is the SHA-256 of its
+# bytes (blobs/ab/<sha256>.pdf), so uploading the same PDF again, or two
+# users uploading the same one, stores it once and the FileFields share the
+# name. Files are written to a temporary name and renamed into place, so a
+# reader never sees a partial blob, and a blob is never overwritten with
+# different content. Blobs are not deleted when a field moves on to another
+# file: another row may still point at them.
+#
+# Downloads (ResumeFileView) check permissions in Django and then hand the
+# bytes off to the web server: with MEDIA_ACCEL_REDIRECT set (nginx
+# `internal` location) the response is an X-Accel-Redirect, with
+# MEDIA_SENDFILE_HEADER (e.g. X-Sendfile for Apache/lighttpd) the header
+# carries the file's path. Either way the server does the Range handling and
+# the Python worker is free as soon as the headers are out. Without either,
+# the file is streamed by Django with single-range support, as in
+# development.
+
+BLOB_DIR = 'blobs'
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that names each file after the SHA-256 of its content.
+    The name given to save() only contributes its extension.
+    """
+
+    def blob_name(self, digest, name):
+        extension = os.path.splitext(name)[1].lower()
+        return f'{BLOB_DIR}/{digest[:2]}/{digest}{extension}'
+
+    def get_available_name(self, name, max_length=None):
+        # The same content gets the same name; there is nothing to avoid
+        return name
+
+    def _save(self, name, content):
+        temp_dir = self.path(os.path.join(BLOB_DIR, 'tmp'))
+        os.makedirs(temp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        with tempfile.NamedTemporaryFile(dir=temp_dir, delete=False) as temp:
+            for chunk in content.chunks():
+                digest.update(chunk)
+                temp.write(chunk)
+        return self.store(temp.name, self.blob_name(digest.hexdigest(), name))
+
+    def adopt(self, path, name, digest):
+        """
+        Move the local file at `path` (on the same filesystem), whose hex
+        SHA-256 is `digest`, into storage without copying it. Returns its
+        storage name.
+        """
+        return self.store(path, self.blob_name(digest, name))
+
+    def store(self, path, name):
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            os.unlink(path)
+            return name
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        # Temporary files are created private
+        os.chmod(path, self.file_permissions_mode or 0o644)
+        # Atomic, and harmless if a concurrent save of the same content won
+        os.replace(path, full_path)
+        return name
+
+
+resume_storage = ContentAddressedStorage()
+
+
+def get_resume_storage():
+    return resume_storage
+
+
+def blob_etag(name):
+    # The name holds the content hash, so it is a strong validator
+    return quote_etag(os.path.splitext(os.path.basename(name))[0])
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single-range "bytes=" header, None to send
+    the whole file, or False when the range can't be satisfied.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+def read_range(file, start, length):
+    file.seek(start)
+    while length > 0:
+        chunk = file.read(min(CHUNK_SIZE, length))
+        if not chunk:
+            break
+        length -= len(chunk)
+        yield chunk
+    file.close()
+
+
+def serve_file(request, name, content_type='application/pdf'):
+    """
+    Response with the stored file `name`, offloaded to the web server when
+    configured to (see above). The caller has checked permissions.
+    """
+    etag = blob_etag(name)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        accel_prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT', '')
+        sendfile_header = getattr(settings, 'MEDIA_SENDFILE_HEADER', '')
+        if accel_prefix:
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + name
+        elif sendfile_header:
+            response = HttpResponse(content_type=content_type)
+            response[sendfile_header] = resume_storage.path(name)
+        else:
+            response = stream_file(request, name, content_type)
+    response['ETag'] = etag
+    response['Content-Disposition'] = 'inline; filename="resume%s"' % os.path.splitext(name)[1]
+    # Only the requester may see it; the content behind a name never changes
+    patch_cache_control(response, private=True, max_age=3600)
+    return response
+
+
+def stream_file(request, name, content_type):
+    size = resume_storage.size(name)
+    byte_range = parse_range(request.headers.get('Range'), size) if request.method == 'GET' else None
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    elif byte_range is None:
+        response = FileResponse(resume_storage.open(name), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            read_range(resume_storage.open(name), start, end - start + 1),
+            status=206, content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -1,3 +1,2278 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+from urllib.parse import urlsplit
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.apps import apps
+from django.core.cache import cache as default_cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.db.models import Count
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, resolve
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .async_views import with_async_reads
+from .authentication import revoke_user_tokens
+from .events import events_view
+from .cache import get_cache as get_job_cache, get_stats as get_job_cache_stats
+from .middleware import get_handler_name, get_query_budget
+from .stats import connect_summary_signals, disconnect_summary_signals
+from .models import *
+from . import compression, db_router, events, expiry, forum, recommendations
+from .management.commands import benchmark_api
+from .permissions import IsModerator
+from .recommendations import is_available as recommendations_available
+from .renderers import ORJSONParser, ORJSONRenderer, is_available as orjson_available
+from .resumes import is_available as resume_extraction_available, normalize_text, process_batch
+from .serializers import CustomTokenObtainPairSerializer
+from .urls import ASYNC_READ_VIEWSETS, router
+from .views import JobOpeningViewSet
+
+
+class PaginationTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Student.objects.bulk_create([
+            Student(UCID=30000000 + i, FName='Student', LName=str(i), Email=f'student{i}@ucalgary.ca')
+            for i in range(250)
+        ])
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_pages_follow_the_primary_key(self):
+        page = self.get('/api/students/?page_size=100')
+        self.assertNotIn('count', page)
+        self.assertIsNone(page['previous'])
+        seen = [row['UCID'] for row in page['results']]
+        self.assertEqual(seen, list(range(30000000, 30000100)))
+
+        # Rows inserted before the cursor neither shift nor repeat the next page
+        Student.objects.create(UCID=29999999, FName='New', LName='Student', Email='new@ucalgary.ca')
+        while page['next']:
+            page = self.get(page['next'])
+            seen += [row['UCID'] for row in page['results']]
+        self.assertEqual(seen, list(range(30000000, 30000250)))
+
+        # And back
+        previous = self.get(page['previous'])
+        self.assertEqual(previous['results'][0]['UCID'], 30000100)
+        self.assertEqual(len(previous['results']), 100)
+
+    def test_page_size_and_count(self):
+        self.assertEqual(len(self.get('/api/students/')['results']), 50)
+        self.assertEqual(len(self.get('/api/students/?page_size=1000')['results']), 200)
+        page = self.get('/api/students/?page_size=10&count=true')
+        self.assertEqual(page['count'], 250)
+        self.assertEqual(len(page['results']), 10)
+        self.assertEqual(self.get(page['next'])['count'], 250)
+
+    def test_legacy_unpaginated_list(self):
+        rows = self.get('/api/students/?paginate=false')
+        self.assertIsInstance(rows, list)
+        self.assertEqual(len(rows), 250)
+        self.assertIsInstance(self.get('/api/students/?paginate=false&page_size=10'), list)
+
+class VerificationQueueTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        today = date.today()
+        students = Student.objects.bulk_create([
+            Student(UCID=30000000 + i, FName='Student', LName=str(i), Email=f'student{i}@ucalgary.ca')
+            for i in range(6)
+        ])
+        moderator = Moderator.objects.create(ModeratorID=students[0])
+        VerifyApplicant.objects.all().delete()  # the moderator's own auto-approval
+        VerifyApplicant.objects.bulk_create([
+            VerifyApplicant(
+                ModeratorID=moderator, ApplicantUCID=student, VerificationDate=today,
+                VerificationStatus='Approved' if i % 3 == 0 else 'Pending',
+            )
+            for i, student in enumerate(students)
+        ])
+        employer = Employer.objects.create(CompanyName='Acme', Email='hr@acme.com', VerificationStatus='Pending')
+        VerifyEmployer.objects.create(
+            ModeratorID=moderator, EmployerID=employer, VerificationStatus='Pending', VerificationDate=today,
+        )
+
+    def test_pending_rows_with_their_profiles(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/applicant-verifications/queue/')
+        rows = response.data['results']
+        self.assertEqual([row['ApplicantUCID'] for row in rows], [30000001, 30000002, 30000004, 30000005])
+        self.assertEqual({row['VerificationStatus'] for row in rows}, {'Pending'})
+        self.assertEqual(rows[0]['student']['Email'], 'student1@ucalgary.ca')
+
+        response = self.client.get('/api/employer-verification/queue/')
+        self.assertEqual(response.data['results'][0]['employer']['CompanyName'], 'Acme')
+
+    def test_status_filter_and_pages(self):
+        response = self.client.get('/api/applicant-verifications/queue/?status=Approved')
+        self.assertEqual([row['ApplicantUCID'] for row in response.data['results']], [30000000, 30000003])
+        response = self.client.get('/api/applicant-verifications/queue/?status=&page_size=4')
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual(len(self.client.get(response.data['next']).data['results']), 2)
+        self.assertEqual(self.client.get('/api/applicant-verifications/queue/?status=Rejected').data['results'], [])
+
+class JobSearchTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = Employer.objects.create(CompanyName='Acme', Email='hr@acme.com', VerificationStatus='Approved')
+        cls.engineer = cls.create_job('Software Engineer', 'Python services')
+        cls.developer = cls.create_job('Developer', 'Join our software engineering team')
+        cls.analyst = cls.create_job('Data Analyst', 'Reports', location='Edmonton')
+
+    @classmethod
+    def create_job(cls, title, description, location='Calgary'):
+        return JobOpening.objects.create(
+            Employer=cls.employer, JobTitle=title, Description=description, Salary=Decimal('70000'),
+            Location=location, Deadline=date.today(), Status=JobOpening.STATUS_ACTIVE,
+        )
+
+    def setUp(self):
+        get_job_cache().clear()
+
+    def search(self, terms, **params):
+        response = self.client.get('/api/job-opening/', {'search': terms, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row['JobID'] for row in response.data['results']]
+
+    def test_title_description_and_location(self):
+        self.assertEqual(set(self.search('software')), {self.engineer.pk, self.developer.pk})
+        self.assertEqual(self.search('edmonton'), [self.analyst.pk])
+        self.assertEqual(self.search('plumber'), [])
+
+    @skipUnless(connection.vendor == 'postgresql', 'full-text search needs PostgreSQL')
+    def test_ranked_prefix_matches(self):
+        # Title matches (weight A) before description matches (B)
+        self.assertEqual(self.search('soft eng'), [self.engineer.pk, self.developer.pk])
+        self.assertEqual(self.search('analy'), [self.analyst.pk])
+        # Nothing searchable left: unfiltered
+        self.assertEqual(len(self.search('?!')), 3)
+
+    @skipUnless(connection.vendor == 'postgresql', 'full-text search needs PostgreSQL')
+    def test_unpaginated_results_are_ranked(self):
+        # The update moves the engineer's row after the others on disk
+        JobOpening.objects.filter(pk=self.engineer.pk).update(Salary=Decimal('71000'))
+        response = self.client.get('/api/job-opening/', {'search': 'soft eng', 'paginate': 'false'})
+        self.assertEqual([row['JobID'] for row in response.data], [self.engineer.pk, self.developer.pk])
+
+    @skipUnless(connection.vendor == 'postgresql', 'full-text search needs PostgreSQL')
+    def test_trigger_follows_writes_without_signals(self):
+        JobOpening.objects.filter(pk=self.analyst.pk).update(JobTitle='Software Tester')
+        self.assertEqual(self.search('tester'), [self.analyst.pk])
+        self.assertEqual(self.search('analyst'), [])
+
+    @skipUnless(connection.vendor == 'postgresql', 'full-text search needs PostgreSQL')
+    def test_equal_ranks_are_paged_by_job_id(self):
+        tied = [self.create_job('Barista', 'Coffee').pk for _ in range(25)]
+        job_ids, url, params = [], '/api/job-opening/', {'search': 'barista', 'page_size': 10}
+        while url:
+            response = self.client.get(url, params)
+            job_ids += [row['JobID'] for row in response.data['results']]
+            url, params = response.data['next'], None
+        self.assertEqual(job_ids, sorted(tied, reverse=True))
+
+class QueryPlanTests(TestCase):
+    """
+    Runs EXPLAIN on the list/filter querysets the API issues most often and
+    fails if any of them falls back to a full table scan. The data is seeded
+    at a size where the planner prefers an index when a usable one exists.
+    """
+    STUDENTS = 2000
+    EMPLOYERS = 200
+    JOBS_PER_EMPLOYER = 25
+    APPLICATIONS_PER_STUDENT = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        today = date.today()
+
+        students = Student.objects.bulk_create([
+            Student(UCID=30000000 + i, FName='Student', LName=str(i), Email=f'student{i}@ucalgary.ca')
+            for i in range(cls.STUDENTS)
+        ])
+        moderator = Moderator.objects.create(ModeratorID=students[0])
+
+        employers = Employer.objects.bulk_create([
+            Employer(
+                CompanyName=f'Company {i}',
+                Email=f'hr{i}@company.com',
+                # A handful are still waiting on verification
+                VerificationStatus='Pending' if i % 50 == 0 else 'Approved',
+            )
+            for i in range(cls.EMPLOYERS)
+        ])
+
+        jobs = JobOpening.objects.bulk_create([
+            JobOpening(
+                Employer=employer,
+                JobTitle=f'Job {n}',
+                Description='Description',
+                Salary=Decimal(40000 + (n * 37) % 80000),
+                Location='Calgary',
+                Deadline=today + timedelta(days=(n % 365) - 300),
+                Status=JobOpening.STATUS_ACTIVE if n % 20 == 0 else JobOpening.STATUS_CLOSED,
+            )
+            for n, employer in enumerate(e for e in employers for _ in range(cls.JOBS_PER_EMPLOYER))
+        ])
+
+        JobApplication.objects.bulk_create([
+            JobApplication(
+                ApplicantUCID=student,
+                JobID=job,
+                EmployerID_id=job.Employer_id,
+                Status=('Submitted', 'Under Review', 'Interview', 'Rejected')[k % 4],
+                DateApplied=today,
+            )
+            for i, student in enumerate(students)
+            for k in range(cls.APPLICATIONS_PER_STUDENT)
+            for job in [jobs[(i * cls.APPLICATIONS_PER_STUDENT + k) % len(jobs)]]
+        ])
+
+        VerifyApplicant.objects.bulk_create([
+            VerifyApplicant(
+                ModeratorID=moderator,
+                ApplicantUCID=student,
+                VerificationStatus='Pending' if i % 50 == 0 else 'Approved',
+                VerificationDate=today,
+            )
+            for i, student in enumerate(students)
+        ])
+
+        Post.objects.bulk_create([
+            Post(VUCID=student, Content='Hello', Date=today - timedelta(days=k))
+            for student in students[:500]
+            for k in range(3)
+        ])
+
+        # Give the planner real statistics
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def assertUsesIndex(self, queryset):
+        table = queryset.model._meta.db_table
+        plan = queryset.explain()
+        if connection.vendor == 'postgresql':
+            full_scan = re.search(rf'Seq Scan on {table}\b', plan)
+        else:
+            # SQLite reports "SCAN <table>" for a full scan and
+            # "SEARCH <table> USING INDEX ..." / "SCAN <table> USING ... INDEX" otherwise
+            full_scan = re.search(rf'\bSCAN {table}\b(?! USING)', plan)
+        self.assertIsNone(full_scan, f'{table} is scanned sequentially:\n{plan}')
+
+    def test_active_jobs_by_deadline(self):
+        self.assertUsesIndex(JobOpening.objects.filter(
+            Status=JobOpening.STATUS_ACTIVE, Deadline__gte=date.today(),
+        ))
+
+    def test_jobs_by_salary(self):
+        self.assertUsesIndex(JobOpening.objects.filter(Salary__gte=Decimal('119000')))
+
+    def test_applications_by_student_and_status(self):
+        self.assertUsesIndex(JobApplication.objects.filter(ApplicantUCID=30000042, Status='Submitted'))
+
+    def test_applications_by_job(self):
+        self.assertUsesIndex(JobApplication.objects.filter(JobID=1))
+
+    def test_applications_by_employer_and_status(self):
+        self.assertUsesIndex(JobApplication.objects.filter(EmployerID=1, Status='Interview'))
+
+    def test_pending_applicant_verifications(self):
+        self.assertUsesIndex(VerifyApplicant.objects.filter(VerificationStatus='Pending').order_by('VID'))
+
+    def test_pending_employers(self):
+        self.assertUsesIndex(Employer.objects.filter(VerificationStatus='Pending'))
+
+    def test_posts_by_author(self):
+        self.assertUsesIndex(Post.objects.filter(VUCID=30000007).order_by('-Date'))
+
+    def test_no_redundant_indexes(self):
+        # A plain index on a prefix of another index's columns only slows writes
+        for model in apps.get_app_config('api').get_models():
+            table = model._meta.db_table
+            with connection.cursor() as cursor:
+                constraints = connection.introspection.get_constraints(cursor, table)
+            indexes = [
+                (name, tuple(info['columns'])) for name, info in constraints.items()
+                if info['index'] or info['unique'] or info['primary_key']
+            ]
+            for name, columns in indexes:
+                info = constraints[name]
+                if info['unique'] or info['primary_key'] or info.get('type') == 'gin':
+                    continue
+                for other, other_columns in indexes:
+                    if other != name and other_columns[:len(columns)] == columns:
+                        self.fail(f'{table}: {name} {columns} is covered by {other} {other_columns}')
+
+
+query_logger = logging.getLogger('api.queries')
+query_log_level = None
+
+
+def setUpModule():
+    # A line per request otherwise; budgets are checked by QueryBudgetMixin
+    global query_log_level
+    query_log_level = query_logger.level
+    query_logger.setLevel(max(query_logger.getEffectiveLevel(), logging.ERROR))
+
+
+def tearDownModule():
+    query_logger.setLevel(query_log_level)
+
+
+class QueryBudgetMixin:
+    """
+    assertWithinQueryBudget() issues a request and fails if it runs more
+    queries than the view declares in its `query_budget`.
+    """
+
+    def assertWithinQueryBudget(self, method, path, data=None, **extra):
+        # Sent as JSON unless a content_type says the data is a raw body
+        extra.setdefault('format', None if extra.get('content_type') else 'json')
+        match = resolve(urlsplit(path).path)
+        view_class = getattr(match.func, 'cls', None) or match.func.view_class
+        handler = get_handler_name(match.func, method)
+        budget = get_query_budget(view_class, handler)
+        self.assertIsNotNone(budget, f'{view_class.__name__}.{handler} declares no query budget')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method.lower())(path, data, **extra)
+
+        self.assertLessEqual(
+            len(queries), budget,
+            f'{method} {path} ({view_class.__name__}.{handler}) ran {len(queries)} queries, '
+            f'budget is {budget}:\n' + '\n'.join(q['sql'] for q in queries.captured_queries),
+        )
+        self.assertNotIn('X-Query-Budget-Exceeded', response)
+        return response
+
+
+class QueryBudgetTests(QueryBudgetMixin, APITestCase):
+    password = 'NextStep!2025'
+
+    @classmethod
+    def setUpTestData(cls):
+        today = date.today()
+        cls.user = CustomUser.objects.create_user(
+            username='jane.doe@ucalgary.ca', email='jane.doe@ucalgary.ca',
+            password=cls.password, user_type='student',
+        )
+        cls.student = Student.objects.create(UCID=30000001, FName='Jane', LName='Doe', Email='jane.doe@ucalgary.ca')
+        cls.moderator = Moderator.objects.create(ModeratorID=cls.student)
+        cls.employer = Employer.objects.create(CompanyName='Acme', Email='hr@acme.com', VerificationStatus='Approved')
+        cls.job = JobOpening.objects.create(
+            Employer=cls.employer, JobTitle='Developer', Description='Build things', Salary=Decimal('70000'),
+            Location='Calgary', Deadline=today, Status=JobOpening.STATUS_ACTIVE,
+        )
+        cls.application = JobApplication.objects.create(
+            ApplicantUCID=cls.student, JobID=cls.job, EmployerID=cls.employer, Status='Submitted', DateApplied=today,
+        )
+        cls.post = Post.objects.create(VUCID=cls.student, Content='Hello', Date=today)
+        Volunteer.objects.create(SUCID=cls.student, Hours=10)
+        Applicant.objects.create(SUCID=cls.student, CGPA=Decimal('3.50'), Resume='resume/jane.pdf', VerificationStatus='Pending')
+        VerifyEmployer.objects.create(
+            ModeratorID=cls.moderator, EmployerID=cls.employer, VerificationStatus='Pending', VerificationDate=today,
+        )
+        Reviews.objects.create(ModeratorID=cls.moderator, JobID=cls.job, EmployerID=cls.employer)
+
+    def authenticate(self):
+        self.client.force_authenticate(None)
+        token = self.client.post('/api/login/', {'email': self.user.email, 'password': self.password}, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token.data['token']}")
+
+    def test_every_viewset_declares_a_budget(self):
+        for prefix, viewset, basename in router.registry:
+            for handler in ('list', 'retrieve', 'create', 'update', 'partial_update', 'destroy'):
+                self.assertIsNotNone(get_query_budget(viewset, handler), f'{viewset.__name__}.{handler}')
+
+    def test_list_and_retrieve(self):
+        for authenticated in (False, True):
+            if authenticated:
+                self.authenticate()
+            for prefix, viewset, basename in router.registry:
+                with self.subTest(prefix=prefix, authenticated=authenticated):
+                    response = self.assertWithinQueryBudget('GET', f'/api/{prefix}/?count=true')
+                    self.assertEqual(response.status_code, 200)
+                    pk_name = viewset.queryset.model._meta.pk.name
+                    pk = response.data['results'][0][pk_name]
+                    response = self.assertWithinQueryBudget('GET', f'/api/{prefix}/{pk}/')
+                    self.assertEqual(response.status_code, 200)
+
+    def test_verification_queues(self):
+        self.assertWithinQueryBudget('GET', '/api/applicant-verifications/queue/?status=')
+        self.assertWithinQueryBudget('GET', '/api/employer-verification/queue/')
+
+    def test_login(self):
+        response = self.assertWithinQueryBudget(
+            'POST', '/api/login/', {'email': self.user.email, 'password': self.password},
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_register(self):
+        response = self.assertWithinQueryBudget('POST', '/api/register/', {
+            'email': 'new.student@ucalgary.ca', 'password': self.password, 'user_type': 'student',
+            'fname': 'New', 'lname': 'Student', 'ucid': '30000002',
+        })
+        self.assertEqual(response.status_code, 201)
+        response = self.assertWithinQueryBudget('POST', '/api/register/', {
+            'email': 'hr@initech.com', 'password': self.password, 'user_type': 'employer',
+            'fname': 'Bill', 'lname': 'Lumbergh', 'company_name': 'Initech',
+        })
+        self.assertEqual(response.status_code, 201)
+
+    def test_writes(self):
+        self.authenticate()
+        today = str(date.today())
+        response = self.assertWithinQueryBudget('POST', '/api/job-opening/', {
+            'Employer': self.employer.pk, 'JobTitle': 'Analyst', 'Description': 'Analyse things',
+            'Salary': '60000.00', 'Location': 'Calgary', 'Deadline': today, 'Status': JobOpening.STATUS_ACTIVE,
+        })
+        self.assertEqual(response.status_code, 201)
+        response = self.assertWithinQueryBudget('POST', '/api/job-applications/', {
+            'ApplicantUCID': self.student.pk, 'JobID': self.job.pk, 'EmployerID': self.employer.pk,
+            'Status': 'Submitted', 'DateApplied': today,
+        })
+        self.assertEqual(response.status_code, 201)
+        response = self.assertWithinQueryBudget(
+            'PATCH', f'/api/job-applications/{self.application.pk}/', {'Status': 'Interview'},
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.assertWithinQueryBudget('POST', '/api/posts/', {
+            'VUCID': self.student.pk, 'Content': 'Hi all', 'Date': today,
+        })
+        self.assertEqual(response.status_code, 201)
+        response = self.assertWithinQueryBudget('DELETE', f'/api/posts/{self.post.pk}/')
+        self.assertEqual(response.status_code, 204)
+        response = self.assertWithinQueryBudget('DELETE', f'/api/job-opening/{self.job.pk}/')
+        self.assertEqual(response.status_code, 204)
+        response = self.assertWithinQueryBudget('DELETE', f'/api/employers/{self.employer.pk}/')
+        self.assertEqual(response.status_code, 204)
+        response = self.assertWithinQueryBudget('DELETE', f'/api/moderators/{self.moderator.pk}/')
+        self.assertEqual(response.status_code, 204)
+        # Losing moderator status revokes the user's tokens
+        self.authenticate()
+        response = self.assertWithinQueryBudget('DELETE', f'/api/students/{self.student.pk}/')
+        self.assertEqual(response.status_code, 204)
+
+
+class TokenClaimsTests(APITestCase):
+    password = 'NextStep!2025'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='jane.doe@ucalgary.ca', email='jane.doe@ucalgary.ca',
+            password=cls.password, user_type='student',
+        )
+        cls.student = Student.objects.create(UCID=30000001, FName='Jane', LName='Doe', Email='jane.doe@ucalgary.ca')
+        Post.objects.create(VUCID=cls.student, Content='Hello', Date=date.today())
+
+    def setUp(self):
+        default_cache.clear()
+
+    def login(self):
+        response = self.client.post('/api/login/', {'email': self.user.email, 'password': self.password}, format='json')
+        return response.data
+
+    def use(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_claims_and_no_user_query(self):
+        login = self.login()
+        claims = AccessToken(login['token'])
+        self.assertEqual(
+            (claims['user_type'], claims['ucid'], claims['employer_id'], claims['is_moderator']),
+            ('student', 30000001, None, False),
+        )
+        self.use(login['token'])
+        self.client.get('/api/posts/')
+        # Account state is cached now: validators and page only
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get('/api/posts/').status_code, 200)
+
+    def test_moderator_change_revokes_tokens(self):
+        login = self.login()
+        self.use(login['token'])
+        self.assertFalse(IsModerator().has_permission(self.client.get('/api/posts/').wsgi_request, None))
+
+        # A token from before the change (iat has one-second resolution)
+        token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        token['iat'] -= 5
+        self.use(token)
+        self.assertEqual(self.client.get('/api/posts/').status_code, 200)
+        Moderator.objects.create(ModeratorID=self.student)
+        self.assertEqual(self.client.get('/api/posts/').status_code, 401)
+
+        refreshed = self.client.post('/api/token/refresh/', {'refresh': login['refresh_token']}, format='json').data
+        self.assertTrue(AccessToken(refreshed['access'])['is_moderator'])
+
+    def test_revocation_is_stored_with_the_user(self):
+        token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        token['iat'] -= 5
+        self.use(token)
+        self.assertEqual(self.client.get('/api/posts/').status_code, 200)
+
+        revoke_user_tokens([self.user.pk])
+        # What a process that never saw the revocation finds once its cached state expires
+        default_cache.clear()
+        self.assertEqual(self.client.get('/api/posts/').status_code, 401)
+        self.use(CustomTokenObtainPairSerializer.get_token(self.user).access_token)
+        self.assertEqual(self.client.get('/api/posts/').status_code, 200)
+
+    def test_inactive_user(self):
+        self.use(self.login()['token'])
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        default_cache.clear()
+        self.assertEqual(self.client.get('/api/posts/').status_code, 401)
+
+
+class JobOpeningCacheTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = Employer.objects.create(CompanyName='Acme', Email='hr@acme.com', VerificationStatus='Approved')
+        cls.job = JobOpening.objects.create(
+            Employer=cls.employer, JobTitle='Developer', Description='Build things', Salary=Decimal('70000'),
+            Location='Calgary', Deadline=date.today(), Status=JobOpening.STATUS_ACTIVE,
+        )
+
+    def setUp(self):
+        get_job_cache().clear()
+
+    def test_list_is_served_from_cache_until_a_job_changes(self):
+        self.assertEqual(self.client.get('/api/job-opening/?location=calgary&page_size=10')['X-Cache'], 'MISS')
+        # Same query in a different order hits the same entry, ETag
+        # validators included
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/job-opening/?page_size=10&location=calgary&search=')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+        self.job.JobTitle = 'Senior Developer'
+        self.job.save()
+        response = self.client.get('/api/job-opening/?location=calgary&page_size=10')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['JobTitle'], 'Senior Developer')
+
+    def test_detail_is_invalidated_on_delete(self):
+        self.client.get(f'/api/job-opening/{self.job.pk}/')
+        self.assertEqual(self.client.get(f'/api/job-opening/{self.job.pk}/')['X-Cache'], 'HIT')
+        self.job.delete()
+        self.assertEqual(self.client.get(f'/api/job-opening/{self.job.pk}/').status_code, 404)
+
+    def test_stats(self):
+        self.client.get('/api/job-opening/')
+        self.client.get('/api/job-opening/')
+        stats = get_job_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+
+class ConditionalGetTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = Student.objects.create(UCID=30000001, FName='Jane', LName='Doe', Email='jane.doe@ucalgary.ca')
+        cls.post = Post.objects.create(VUCID=cls.student, Content='Hello', Date=date.today())
+
+    def test_list_not_modified_until_a_row_changes(self):
+        response = self.client.get('/api/posts/')
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Post.objects.create(VUCID=self.student, Content='Another', Date=date.today())
+        response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+
+        # A delete changes the row count and therefore the ETag
+        etag = response['ETag']
+        self.post.delete()
+        self.assertEqual(self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_not_modified(self):
+        response = self.client.get(f'/api/posts/{self.post.pk}/')
+        response = self.client.get(
+            f'/api/posts/{self.post.pk}/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        self.assertEqual(response.status_code, 304)
+
+        self.post.Content = 'Edited'
+        self.post.save()
+        response = self.client.get(f'/api/posts/{self.post.pk}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['Content'], 'Edited')
+
+    def test_unknown_object(self):
+        self.assertEqual(self.client.get('/api/posts/999/').status_code, 404)
+        self.assertEqual(self.client.get('/api/posts/abc/').status_code, 404)
+
+    def test_each_representation_has_its_own_etag(self):
+        path = f'/api/posts/{self.post.pk}/'
+        etag = self.client.get(path)['ETag']
+        for query in ('?fields=Content', '?expand=VUCID'):
+            response = self.client.get(path + query, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_expanded_rows_are_part_of_the_version(self):
+        for path in (f'/api/posts/{self.post.pk}/?expand=VUCID', '/api/posts/?expand=VUCID'):
+            with self.subTest(path=path):
+                etag = self.client.get(path)['ETag']
+                self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+                self.student.FName = f'Janet {etag}'
+                self.student.save()
+                response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_reverse_expansions_are_part_of_the_version(self):
+        employer = Employer.objects.create(CompanyName='Acme', Email='hr@acme.com', VerificationStatus='Approved')
+        job = JobOpening.objects.create(
+            Employer=employer, JobTitle='Developer', Description='Build things', Salary=Decimal('70000'),
+            Location='Calgary', Deadline=date.today(), Status=JobOpening.STATUS_ACTIVE,
+        )
+        path = f'/api/employers/{employer.pk}/?expand=jobs'
+        etag = self.client.get(path)['ETag']
+        job.JobTitle = 'Senior Developer'
+        job.save()
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class BulkWriteTests(QueryBudgetMixin, APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='hr@acme.com', email='hr@acme.com', password='NextStep!2025', user_type='employer',
+        )
+        cls.employer = Employer.objects.create(CompanyName='Acme', Email='hr@acme.com', VerificationStatus='Approved')
+        cls.student = Student.objects.create(UCID=30000001, FName='Jane', LName='Doe', Email='jane.doe@ucalgary.ca')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def job_rows(self, count):
+        return [{
+            'Employer': self.employer.pk, 'JobTitle': f'Job {i}', 'Description': 'Description',
+            'Salary': '50000.00', 'Location': 'Calgary', 'Deadline': str(date.today()),
+            'Status': JobOpening.STATUS_ACTIVE,
+        } for i in range(count)]
+
+    def test_create_many_jobs_in_a_few_queries(self):
+        response = self.assertWithinQueryBudget('POST', '/api/job-opening/bulk/', self.job_rows(200))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(JobOpening.objects.count(), 200)
+
+    def test_invalid_rows_are_reported_and_nothing_is_written(self):
+        rows = self.job_rows(3)
+        rows[1]['Employer'] = 999
+        rows[2]['Salary'] = 'lots'
+        response = self.client.post('/api/job-opening/bulk/', rows, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.assertFalse(JobOpening.objects.exists())
+
+    def test_dry_run(self):
+        response = self.client.post('/api/job-opening/bulk/?dry_run=true', self.job_rows(5), format='json')
+        self.assertEqual(response.data['count'], 5)
+        self.assertFalse(JobOpening.objects.exists())
+
+    def test_update_and_delete_application_statuses(self):
+        self.client.post('/api/job-opening/bulk/', self.job_rows(100), format='json')
+        applications = JobApplication.objects.bulk_create([
+            JobApplication(ApplicantUCID=self.student, JobID=job, EmployerID=self.employer,
+                           Status='Submitted', DateApplied=date.today())
+            for job in JobOpening.objects.all()
+        ])
+
+        response = self.assertWithinQueryBudget('PATCH', '/api/job-applications/bulk/', [
+            {'ApplicationID': application.pk, 'Status': 'Rejected'} for application in applications
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(JobApplication.objects.filter(Status='Rejected').count(), 100)
+
+        ids = [application.pk for application in applications[:10]] + [999999]
+        response = self.client.delete('/api/job-applications/bulk/', {'ids': ids}, format='json')
+        self.assertEqual((response.data['count'], response.data['not_found']), (10, [999999]))
+        self.assertEqual(JobApplication.objects.count(), 90)
+
+    def test_employers_write_only_their_own_rows(self):
+        other = Employer.objects.create(CompanyName='Other', Email='hr@other.com', VerificationStatus='Approved')
+        self.client.post('/api/job-opening/bulk/', self.job_rows(1), format='json')
+        mine = JobOpening.objects.get()
+        theirs = JobOpening.objects.create(
+            Employer=other, JobTitle='Theirs', Description='', Salary=Decimal('50000'), Location='Calgary',
+            Deadline=date.today(), Status=JobOpening.STATUS_ACTIVE,
+        )
+
+        response = self.client.delete('/api/job-opening/bulk/', {'ids': [mine.pk, theirs.pk]}, format='json')
+        self.assertEqual((response.data['count'], response.data['not_found']), (1, [theirs.pk]))
+        self.assertTrue(JobOpening.objects.filter(pk=theirs.pk).exists())
+
+        response = self.client.patch('/api/job-opening/bulk/', [{'JobID': theirs.pk, 'Status': 'Closed'}], format='json')
+        self.assertEqual(response.status_code, 400)
+        rows = self.job_rows(2)
+        rows[1]['Employer'] = other.pk
+        response = self.client.post('/api/job-opening/bulk/', rows, format='json')
+        self.assertEqual([error['index'] for error in response.data['errors']], [1])
+        self.assertEqual(JobOpening.objects.get(pk=theirs.pk).Status, JobOpening.STATUS_ACTIVE)
+
+        student = CustomUser.objects.create_user(
+            username='jane', email='jane.doe@ucalgary.ca', password='NextStep!2025', user_type='student',
+        )
+        self.client.force_authenticate(student)
+        response = self.client.delete('/api/job-opening/bulk/', {'ids': [theirs.pk]}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class EmployerStatsTests(QueryBudgetMixin, APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='hr@acme.com', email='hr@acme.com', password='NextStep!2025', user_type='employer',
+        )
+        cls.employer = Employer.objects.create(CompanyName='Acme', Email='hr@acme.com', VerificationStatus='Approved')
+        cls.student = Student.objects.create(UCID=30000001, FName='Jane', LName='Doe', Email='jane.doe@ucalgary.ca')
+        today = date.today()
+        cls.jobs = [
+            JobOpening.objects.create(
+                Employer=cls.employer, JobTitle=f'Job {i}', Description='Description', Salary=Decimal('50000'),
+                Location='Calgary', Deadline=today, Status=status,
+            )
+            for i, status in enumerate([JobOpening.STATUS_ACTIVE, JobOpening.STATUS_ACTIVE, JobOpening.STATUS_CLOSED])
+        ]
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def apply(self, job, status, days_after_posting=0):
+        return JobApplication.objects.create(
+            ApplicantUCID=self.student, JobID=job, EmployerID=self.employer, Status=status,
+            DateApplied=job.PostedAt.date() + timedelta(days=days_after_posting),
+        )
+
+    def check_stats(self):
+        response = self.assertWithinQueryBudget('GET', f'/api/employers/{self.employer.pk}/stats/')
+        self.assertEqual(response.status_code, 200)
+        stats = response.data
+        self.assertEqual(stats['jobs'], {'total': 3, 'open': 2, 'closed': 1, 'by_status': {'Active': 2, 'Closed': 1}})
+        self.assertEqual(stats['applications'], {'total': 3, 'by_status': {'Submitted': 2, 'Interview': 1}})
+        self.assertEqual([job['applications'] for job in stats['per_job']], [2, 1, 0])
+        self.assertEqual(stats['per_job'][0]['days_to_first_application'], 2)
+        self.assertEqual(stats['average_days_to_first_application'], 3.5)
+        return stats
+
+    def test_live_stats(self):
+        self.apply(self.jobs[0], 'Submitted', 2)
+        self.apply(self.jobs[0], 'Interview', 4)
+        self.apply(self.jobs[1], 'Submitted', 5)
+        self.assertEqual(self.check_stats()['source'], 'live')
+
+    @override_settings(EMPLOYER_STATS_SUMMARY=True)
+    def test_summary_follows_application_writes(self):
+        connect_summary_signals()
+        self.addCleanup(disconnect_summary_signals)
+
+        self.apply(self.jobs[0], 'Submitted', 2)
+        application = self.apply(self.jobs[0], 'Submitted', 4)
+        self.apply(self.jobs[1], 'Submitted', 5)
+        application.Status = 'Interview'
+        application.save()
+        self.assertEqual(self.check_stats()['source'], 'summary')
+
+        response = self.client.delete('/api/job-applications/bulk/', {'ids': [application.pk]}, format='json')
+        self.assertEqual(response.data['count'], 1)
+        stats = self.client.get(f'/api/employers/{self.employer.pk}/stats/').data
+        self.assertEqual(stats['applications']['by_status'], {'Submitted': 2})
+
+        self.jobs[0].delete()
+        self.assertEqual(JobApplicationSummary.objects.count(), 1)
+
+    @override_settings(EMPLOYER_STATS_SUMMARY=True)
+    def test_summary_follows_an_application_to_another_job(self):
+        connect_summary_signals()
+        self.addCleanup(disconnect_summary_signals)
+
+        application = self.apply(self.jobs[0], 'Submitted')
+        application = JobApplication.objects.get(pk=application.pk)
+        application.JobID = self.jobs[1]
+        application.save()
+        self.assertEqual(
+            list(JobApplicationSummary.objects.values_list('JobID', 'ApplicationCount')), [(self.jobs[1].pk, 1)],
+        )
+
+        response = self.client.patch(
+            '/api/job-applications/bulk/', [{'ApplicationID': application.pk, 'JobID': self.jobs[0].pk}], format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(JobApplicationSummary.objects.values_list('JobID', 'ApplicationCount')), [(self.jobs[0].pk, 1)],
+        )
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(f'/api/employers/{self.employer.pk}/stats/').status_code, 401)
+
+    def test_only_the_employer_and_moderators(self):
+        other = Employer.objects.create(CompanyName='Globex', Email='hr@globex.com', VerificationStatus='Approved')
+        self.assertEqual(self.client.get(f'/api/employers/{other.pk}/stats/').status_code, 403)
+
+        student = CustomUser.objects.create_user(
+            username='jane.doe@ucalgary.ca', email='jane.doe@ucalgary.ca', password='NextStep!2025',
+            user_type='student',
+        )
+        self.client.force_authenticate(student)
+        self.assertEqual(self.client.get(f'/api/employers/{self.employer.pk}/stats/').status_code, 403)
+        Moderator.objects.create(ModeratorID=self.student)
+        self.assertEqual(self.client.get(f'/api/employers/{self.employer.pk}/stats/').status_code, 200)
+
+
+class ApplicationExportTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='hr@acme.com', email='hr@acme.com', password='NextStep!2025', user_type='employer',
+        )
+        employers = [
+            Employer.objects.create(CompanyName=name, Email=f'hr@{name.lower()}.com', VerificationStatus='Approved')
+            for name in ('Acme', 'Globex')
+        ]
+        cls.employer = employers[0]
+        cls.student = Student.objects.create(UCID=30000001, FName='Jane', LName='Doe', Email='jane.doe@ucalgary.ca')
+        for employer in employers:
+            job = JobOpening.objects.create(
+                Employer=employer, JobTitle='Developer, Backend', Description='Description', Salary=Decimal('50000'),
+                Location='Calgary', Deadline=date.today(), Status=JobOpening.STATUS_ACTIVE,
+            )
+            JobApplication.objects.create(
+                ApplicantUCID=cls.student, JobID=job, EmployerID=employer, Status='Submitted', DateApplied=date.today(),
+            )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_csv(self):
+        response = self.client.get(f'/api/job-applications/export/?EmployerID={self.employer.pk}')
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith('ApplicationID,Status,DateApplied,ApplicantUCID,FName'))
+        self.assertIn('Jane,Doe,jane.doe@ucalgary.ca', lines[1])
+        self.assertIn('"Developer, Backend"', lines[1])
+
+    def test_ndjson(self):
+        response = self.client.get('/api/job-applications/export/?format=ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['EmployerID'] for row in rows], [self.employer.pk])
+        self.assertEqual(rows[0]['DateApplied'], str(date.today()))
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/job-applications/export/').status_code, 401)
+
+    def test_only_the_employers_own_applications(self):
+        response = self.client.get(f'/api/job-applications/export/?EmployerID={self.employer.pk + 1}')
+        self.assertEqual(b''.join(response.streaming_content).decode().count('\n'), 1)
+
+        student = CustomUser.objects.create_user(
+            username='jane.doe@ucalgary.ca', email='jane.doe@ucalgary.ca', password='NextStep!2025',
+            user_type='student',
+        )
+        self.client.force_authenticate(student)
+        self.assertEqual(self.client.get('/api/job-applications/export/').status_code, 403)
+
+    async def test_async_stream_under_asgi(self):
+        token = await sync_to_async(lambda: str(CustomTokenObtainPairSerializer.get_token(self.user).access_token))()
+        response = await self.async_client.get(
+            '/api/job-applications/export/', headers={'Authorization': f'Bearer {token}'},
+        )
+        self.assertTrue(response.is_async)
+        lines = b''.join([chunk async for chunk in response.streaming_content]).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn('Jane,Doe,jane.doe@ucalgary.ca', lines[1])
+
+
+class ModerationQueueTests(QueryBudgetMixin, APITestCase):
+    password = 'NextStep!2025'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = []
+        for ucid, name in ((30000001, 'ada'), (30000002, 'grace')):
+            email = f'{name}@ucalgary.ca'
+            student = Student.objects.create(UCID=ucid, FName=name.title(), LName='Mod', Email=email)
+            Moderator.objects.create(ModeratorID=student)
+            cls.users.append(CustomUser.objects.create_user(
+                username=email, email=email, password=cls.password, user_type='student',
+            ))
+        cls.employer_user = CustomUser.objects.create_user(
+            username='hr@acme.com', email='hr@acme.com', password=cls.password, user_type='employer',
+        )
+
+    def register_students(self, count):
+        for i in range(count):
+            response = self.client.post('/api/register/', {
+                'email': f'student{i}@ucalgary.ca', 'password': self.password, 'user_type': 'student',
+                'fname': 'New', 'lname': 'Student', 'ucid': str(30001000 + i),
+            }, format='json')
+            self.assertEqual(response.status_code, 201)
+
+    def test_registrations_are_spread_over_moderators(self):
+        self.register_students(6)
+        loads = (
+            VerifyApplicant.objects.filter(VerificationStatus='Pending')
+            .values('ModeratorID').annotate(n=Count('pk')).values_list('n', flat=True)
+        )
+        self.assertEqual(sorted(loads), [3, 3])
+
+    def test_claims_never_overlap_and_leases_expire(self):
+        self.register_students(4)
+        ada, grace = self.users
+
+        self.client.force_authenticate(ada)
+        response = self.assertWithinQueryBudget('POST', '/api/applicant-verifications/claim/', {'limit': 3})
+        ada_rows = [row['VID'] for row in response.data['results']]
+        self.assertEqual(len(ada_rows), 3)
+        # Her own assignments come first
+        own = VerifyApplicant.objects.filter(ModeratorID=30000001, VID__in=ada_rows).count()
+        self.assertGreaterEqual(own, 2)
+
+        self.client.force_authenticate(grace)
+        response = self.client.post('/api/applicant-verifications/claim/', {'limit': 10}, format='json')
+        grace_rows = [row['VID'] for row in response.data['results']]
+        self.assertEqual(len(grace_rows), 1)
+        self.assertFalse(set(ada_rows) & set(grace_rows))
+
+        response = self.client.patch(f'/api/applicant-verifications/{ada_rows[0]}/', {'VerificationStatus': 'Approved'})
+        self.assertEqual(response.status_code, 409)
+
+        VerifyApplicant.objects.filter(VID__in=ada_rows).update(LeaseExpiresAt=timezone.now() - timedelta(seconds=1))
+        response = self.client.post('/api/applicant-verifications/claim/', {'limit': 10}, format='json')
+        self.assertEqual(response.data['count'], 3)
+        response = self.client.patch(f'/api/applicant-verifications/{ada_rows[0]}/', {'VerificationStatus': 'Approved'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data['LeaseExpiresAt'])
+
+        self.assertEqual(self.client.post('/api/applicant-verifications/release/').data['count'], 3)
+
+    def test_only_moderators_claim(self):
+        self.client.force_authenticate(self.employer_user)
+        response = self.client.post('/api/employer-verification/claim/', {'limit': 1}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.client.force_authenticate(self.users[0])
+        response = self.client.post('/api/employer-verification/claim/', {'limit': 500}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+@skipUnless(recommendations_available(), 'numpy and scipy are not installed')
+class RecommendationTests(QueryBudgetMixin, APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='jane.doe@ucalgary.ca', email='jane.doe@ucalgary.ca', password='NextStep!2025',
+            user_type='student', bio='Python and Django developer, interested in machine learning',
+        )
+        cls.student = Student.objects.create(
+            UCID=30000001, FName='Jane', LName='Doe', Email='jane.doe@ucalgary.ca', Major='Computer Science',
+        )
+        cls.employer = Employer.objects.create(CompanyName='Acme', Email='hr@acme.com', VerificationStatus='Approved')
+        cls.jobs = {
+            title: JobOpening.objects.create(
+                Employer=cls.employer, JobTitle=title, Description=description, Salary=Decimal('50000'),
+                Location='Calgary', Deadline=date.today() + timedelta(days=30), Status=JobOpening.STATUS_ACTIVE,
+            )
+            for title, description in [
+                ('Machine Learning Intern', 'Train models in Python for computer vision'),
+                ('Backend Developer', 'Build REST APIs with Django and PostgreSQL'),
+                ('Accountant', 'Prepare financial statements and audits'),
+            ]
+        }
+
+    def setUp(self):
+        get_job_cache().clear()
+        recommendations._index = None
+        self.client.force_authenticate(self.user)
+
+    def recommend(self, k=3):
+        response = self.assertWithinQueryBudget('GET', f'/api/students/{self.student.pk}/recommendations/?k={k}')
+        self.assertEqual(response.status_code, 200)
+        return [result['job']['JobTitle'] for result in response.data['results']]
+
+    def test_ranks_matching_jobs(self):
+        titles = self.recommend()
+        self.assertEqual(set(titles), {'Machine Learning Intern', 'Backend Developer'})
+        self.assertEqual(self.recommend(k=1), titles[:1])
+
+    def test_follows_job_changes(self):
+        self.recommend()
+        job = self.jobs['Accountant']
+        job.Description = 'Django developer for our Python APIs'
+        job.save()
+        self.assertIn('Accountant', self.recommend())
+
+        job.Status = JobOpening.STATUS_CLOSED
+        job.save()
+        self.assertNotIn('Accountant', self.recommend())
+
+        JobOpening.objects.filter(JobTitle='Backend Developer').delete()
+        self.assertEqual(self.recommend(), ['Machine Learning Intern'])
+
+    def test_follows_writes_without_signals(self):
+        self.recommend()
+        # As another process, or expire_job_openings, would write it
+        JobOpening.objects.filter(pk=self.jobs['Accountant'].pk).update(
+            Description='Django developer for our Python APIs', UpdatedAt=timezone.now(),
+        )
+        self.assertIn('Accountant', self.recommend())
+
+    def test_database_reads_outside_the_index_lock(self):
+        index = recommendations.get_index()
+        get_job_state, lock_free = recommendations.get_job_state, []
+
+        def try_lock():
+            if index.lock.acquire(blocking=False):
+                index.lock.release()
+                lock_free.append(True)
+            else:
+                lock_free.append(False)
+
+        def job_state():
+            # Other requests can still use the index meanwhile
+            thread = threading.Thread(target=try_lock)
+            thread.start()
+            thread.join()
+            return get_job_state()
+
+        JobOpening.objects.filter(pk=self.jobs['Accountant'].pk).update(UpdatedAt=timezone.now())
+        with mock.patch.object(recommendations, 'get_job_state', side_effect=job_state):
+            index.sync()
+        self.assertEqual(lock_free, [True])
+
+    def test_warmed_at_startup(self):
+        with mock.patch.object(recommendations, 'build_index') as build_index:
+            with override_settings(RECOMMENDATIONS_WARM=False):
+                self.assertIsNone(recommendations.warm_index())
+            with override_settings(RECOMMENDATIONS_WARM=True):
+                recommendations.warm_index().join()
+        build_index.assert_called_once_with()
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(f'/api/students/{self.student.pk}/recommendations/').status_code, 401)
+
+def make_pdf(text):
+    # A one page PDF showing `text`
+    stream = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'.encode()
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R '
+        b'/Resources << /Font << /F1 5 0 R >> >> >>',
+        b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    pdf, offsets = b'%PDF-1.4\n', []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(pdf)
+    pdf += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    pdf += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    pdf += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return pdf
+
+
+@skipUnless(resume_extraction_available(), 'pypdf is not installed')
+class ResumeExtractionTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='jane.doe@ucalgary.ca', email='jane.doe@ucalgary.ca', password='NextStep!2025',
+        )
+        cls.student = Student.objects.create(UCID=30000001, FName='Jane', LName='Doe', Email='jane.doe@ucalgary.ca')
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def upload(self, content, name='resume.pdf'):
+        self.user.pdf_file = SimpleUploadedFile(name, content, content_type='application/pdf')
+        self.user.save()
+        return ResumeText.objects.get(Source=ResumeText.SOURCE_ACCOUNT, OwnerID=self.user.pk)
+
+    def test_upload_only_queues(self):
+        resume = self.upload(make_pdf('Python developer'))
+        self.assertEqual((resume.Status, resume.Email, resume.Text), ('Pending', self.user.email, ''))
+
+        # Saves that don't touch the file leave the queue alone
+        self.user.save(update_fields=['last_login'])
+        self.user.save()
+        self.assertEqual(ResumeText.objects.get().QueuedAt, resume.QueuedAt)
+
+        self.user.pdf_file = None
+        self.user.save()
+        self.assertFalse(ResumeText.objects.exists())
+
+    def test_worker_extracts_and_indexes_text(self):
+        self.upload(make_pdf('Machine learning engi-\nneer, Python and Django'))
+        call_command('process_resumes', once=True, workers=1, stdout=StringIO())
+
+        resume = ResumeText.objects.get()
+        self.assertEqual(resume.Status, 'Done')
+        self.assertIn('Python and Django', resume.Text)
+        self.assertIsNotNone(resume.ExtractedAt)
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get('/api/students/', {'resume': 'django python'})
+        self.assertEqual([student['UCID'] for student in response.data['results']], [self.student.pk])
+        response = self.client.get('/api/students/', {'resume': 'accounting'})
+        self.assertEqual(response.data['results'], [])
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/students/', {'resume': 'django'}).status_code, 401)
+
+    @override_settings(RESUME_MAX_ATTEMPTS=2)
+    def test_failing_files_are_retried_then_given_up(self):
+        self.upload(b'not a pdf')
+        with ThreadPoolExecutor(1) as pool:
+            self.assertEqual(process_batch(pool, 10), 1)
+            resume = ResumeText.objects.get()
+            self.assertEqual(resume.Status, 'Pending')
+            self.assertIn('Not a PDF file', resume.Error)
+
+            self.assertEqual(process_batch(pool, 10), 1)
+            self.assertEqual(ResumeText.objects.get().Status, 'Failed')
+            self.assertEqual(process_batch(pool, 10), 0)
+
+    def test_normalize_text(self):
+        self.assertEqual(
+            normalize_text('Software engi-\nneer\x00 at   \ufb01rm\r\n\n\n\n  Calgary '),
+            'Software engineer at firm\n\nCalgary',
+        )
+
+
+class ResumeStorageTests(QueryBudgetMixin, APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='jane.doe@ucalgary.ca', email='jane.doe@ucalgary.ca', password='NextStep!2025',
+        )
+        cls.student = Student.objects.create(UCID=30000001, FName='Jane', LName='Doe', Email='jane.doe@ucalgary.ca')
+        cls.other = CustomUser.objects.create_user(
+            username='john.roe@ucalgary.ca', email='john.roe@ucalgary.ca', password='NextStep!2025',
+        )
+        cls.hr = CustomUser.objects.create_user(
+            username='hr@acme.com', email='hr@acme.com', password='NextStep!2025', user_type='employer',
+        )
+        cls.employer = Employer.objects.create(CompanyName='Acme', Email='hr@acme.com', VerificationStatus='Approved')
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, RESUME_UPLOAD_MAX_CHUNK=1024)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.pdf = make_pdf('Python developer ' * 100)
+
+    def blobs(self):
+        return sorted(name for _, _, names in os.walk(os.path.join(self.media_root, 'blobs')) for name in names)
+
+    def test_identical_files_are_stored_once(self):
+        for user in (self.user, self.other, self.user):
+            user.pdf_file = SimpleUploadedFile('resume.pdf', self.pdf)
+            user.save()
+        digest = hashlib.sha256(self.pdf).hexdigest()
+        self.assertEqual(self.user.pdf_file.name, f'blobs/{digest[:2]}/{digest}.pdf')
+        self.assertEqual(self.other.pdf_file.name, self.user.pdf_file.name)
+        self.assertEqual(self.blobs(), [f'{digest}.pdf'])
+
+    def upload_chunk(self, upload_id, offset, data):
+        return self.assertWithinQueryBudget(
+            'PATCH', f'/api/resume-uploads/{upload_id}/', HTTP_UPLOAD_OFFSET=str(offset),
+            data=data, content_type='application/offset+octet-stream',
+        )
+
+    def test_chunked_upload(self):
+        self.client.force_authenticate(self.user)
+        response = self.assertWithinQueryBudget('POST', '/api/resume-uploads/', {
+            'file_name': 'Resume.PDF', 'size': len(self.pdf), 'sha256': hashlib.sha256(self.pdf).hexdigest(),
+        })
+        self.assertEqual(response.status_code, 201)
+        upload_id = response.data['upload_id']
+
+        chunks = [self.pdf[start:start + 1000] for start in range(0, len(self.pdf), 1000)]
+        self.assertEqual(self.upload_chunk(upload_id, 0, chunks[0]).data['offset'], 1000)
+        # A retried chunk at the wrong offset says where to resume
+        response = self.upload_chunk(upload_id, 0, chunks[0])
+        self.assertEqual((response.status_code, response['Upload-Offset']), (409, '1000'))
+        self.assertEqual(self.client.get(f'/api/resume-uploads/{upload_id}/')['Upload-Offset'], '1000')
+
+        for index, chunk in enumerate(chunks[1:], 1):
+            response = self.upload_chunk(upload_id, index * 1000, chunk)
+        self.assertTrue(response.data['complete'])
+        self.user.refresh_from_db()
+        self.assertEqual(response.data['file'], self.user.pdf_file.name)
+        self.assertEqual(self.user.pdf_file.read(), self.pdf)
+        self.assertEqual(ResumeText.objects.get(OwnerID=self.user.pk).Status, 'Pending')
+        self.assertFalse(ResumeUpload.objects.exists())
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'uploads')), [])
+
+    def test_chunked_upload_is_checked(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/api/resume-uploads/', {'file_name': 'resume.pdf', 'size': 4, 'sha256': '0' * 64})
+        response = self.upload_chunk(response.data['upload_id'], 0, b'%PDF')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ResumeUpload.objects.exists())
+
+        response = self.client.post('/api/resume-uploads/', {'file_name': 'resume.pdf', 'size': 10, 'target': 'applicant'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post('/api/resume-uploads/', {'file_name': 'resume.exe', 'size': 10}).status_code, 400)
+
+    def test_download_permissions(self):
+        self.user.pdf_file = SimpleUploadedFile('resume.pdf', self.pdf)
+        self.user.save()
+        url = f'/media/{self.user.pdf_file.name}'
+
+        self.assertEqual(self.client.get(url).status_code, 401)
+        for user, status_code in [(self.user, 200), (self.other, 403), (self.hr, 403)]:
+            self.client.force_authenticate(user)
+            self.assertEqual(self.client.get(url).status_code, status_code)
+
+        job = JobOpening.objects.create(
+            Employer=self.employer, JobTitle='Developer', Description='Python', Salary=Decimal('50000'),
+            Location='Calgary', Deadline=date.today(), Status=JobOpening.STATUS_ACTIVE,
+        )
+        JobApplication.objects.create(
+            ApplicantUCID=self.student, JobID=job, EmployerID=self.employer, Status='Submitted',
+            DateApplied=date.today(),
+        )
+        response = self.assertWithinQueryBudget('GET', url)
+        self.assertEqual(b''.join(response.streaming_content), self.pdf)
+        self.assertEqual(self.client.get('/media/blobs/00/missing.pdf').status_code, 404)
+
+    def test_download_ranges_and_offload(self):
+        self.user.pdf_file = SimpleUploadedFile('resume.pdf', self.pdf)
+        self.user.save()
+        url = f'/media/{self.user.pdf_file.name}'
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(url, HTTP_RANGE='bytes=5-14')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 5-14/{len(self.pdf)}')
+        self.assertEqual(b''.join(response.streaming_content), self.pdf[5:15])
+        response = self.client.get(url, HTTP_RANGE='bytes=-4')
+        self.assertEqual(b''.join(response.streaming_content), self.pdf[-4:])
+        self.assertEqual(self.client.get(url, HTTP_RANGE=f'bytes={len(self.pdf)}-').status_code, 416)
+
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.settings(MEDIA_ACCEL_REDIRECT='/protected-media/'):
+            response = self.client.get(url, HTTP_RANGE='bytes=5-14')
+        self.assertEqual((response.status_code, response.content), (200, b''))
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.user.pdf_file.name}')
+        with self.settings(MEDIA_SENDFILE_HEADER='X-Sendfile'):
+            response = self.client.get(url)
+        self.assertEqual(response['X-Sendfile'], self.user.pdf_file.path)
+
+
+class ForumTests(QueryBudgetMixin, APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users, cls.students = [], []
+        for i in range(3):
+            email = f'student{i}@ucalgary.ca'
+            cls.users.append(CustomUser.objects.create_user(username=email, email=email, password='NextStep!2025'))
+            cls.students.append(Student.objects.create(UCID=30000001 + i, FName='Student', LName=str(i), Email=email))
+        now = timezone.now()
+        cls.posts = [
+            Post.objects.create(
+                VUCID=cls.students[0], Content=f'Post {i}', Date=now.date(), CreatedAt=now - timedelta(hours=hours),
+            )
+            for i, hours in enumerate([25, 22, 1])
+        ]
+
+    def vote(self, user, post, method='POST'):
+        self.client.force_authenticate(user)
+        response = self.assertWithinQueryBudget(method, f'/api/posts/{post.pk}/upvote/')
+        self.assertEqual(response.status_code, 200)
+        return response.data['Upvotes']
+
+    def feed(self, sort, **params):
+        contents, url, params = [], '/api/posts/', {'sort': sort, 'page_size': 2, **params}
+        while url:
+            response = self.client.get(url, params)
+            contents += [post['Content'] for post in response.data['results']]
+            url, params = response.data['next'], None
+        return contents
+
+    def test_upvotes(self):
+        old, older, new = self.posts[0], self.posts[1], self.posts[2]
+        self.assertEqual(self.vote(self.users[1], old), 1)
+        self.assertEqual(self.vote(self.users[1], old), 1)  # once per student
+        self.assertEqual(self.vote(self.users[2], old), 2)
+        self.assertEqual(self.vote(self.users[2], older), 1)
+        self.assertEqual(self.vote(self.users[2], older, 'DELETE'), 0)
+        self.assertEqual(self.vote(self.users[2], older, 'DELETE'), 0)
+
+        old.refresh_from_db()
+        self.assertEqual(old.Upvotes, PostVote.objects.filter(Post=old).count())
+        self.assertAlmostEqual(old.HotScore, forum.hot_score(2, old.CreatedAt))
+        self.assertEqual(self.client.get(f'/api/posts/{old.pk}/').data['Upvotes'], 2)
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.post(f'/api/posts/{old.pk}/upvote/').status_code, 401)
+
+    def test_feeds(self):
+        for user in self.users:
+            self.vote(user, self.posts[0])
+        self.vote(self.users[1], self.posts[1])
+        self.client.force_authenticate(None)
+
+        self.assertEqual(self.feed('new'), ['Post 2', 'Post 1', 'Post 0'])
+        self.assertEqual(self.feed('top'), ['Post 0', 'Post 1', 'Post 2'])
+        self.assertEqual(self.feed('top', window='day'), ['Post 1', 'Post 2'])
+        # 3 votes make up for 3 hours (not 24), 1 vote for nothing
+        self.assertEqual(self.feed('hot'), ['Post 2', 'Post 0', 'Post 1'])
+        self.assertEqual(
+            [post['Content'] for post in self.client.get('/api/posts/', {'sort': 'hot', 'paginate': 'false'}).data],
+            ['Post 2', 'Post 0', 'Post 1'],
+        )
+
+    def test_ties_are_paged_by_post_id(self):
+        # More tied rows than DRF's OFFSET cap (1000), as generate_data makes them
+        Post.objects.bulk_create([
+            Post(VUCID=self.students[1], Content='Tied', Date=date.today(), Upvotes=0) for _ in range(1300)
+        ])
+        self.vote(self.users[1], self.posts[1])
+        self.client.force_authenticate(None)
+
+        pages, url, params = [], '/api/posts/', {'sort': 'top', 'page_size': 200}
+        while url:
+            response = self.client.get(url, params)
+            pages.append([post['PostID'] for post in response.data['results']])
+            url, params = response.data['next'], None
+        post_ids = [post_id for page in pages for post_id in page]
+        self.assertEqual(len(pages), 7)
+        self.assertEqual(post_ids[0], self.posts[1].pk)
+        self.assertEqual(post_ids[1:], sorted(post_ids[1:], reverse=True))
+        self.assertEqual(len(set(post_ids)), Post.objects.count())
+
+        # And back from the last page
+        previous = self.client.get(response.data['previous']).data
+        self.assertEqual([post['PostID'] for post in previous['results']], pages[-2])
+
+    def test_author_stats(self):
+        self.vote(self.users[1], self.posts[0])
+        self.vote(self.users[2], self.posts[0])
+        self.vote(self.users[2], self.posts[2])
+        self.client.force_authenticate(None)
+
+        response = self.assertWithinQueryBudget('GET', f'/api/students/{self.students[0].pk}/post-stats/')
+        stats = response.data
+        self.assertEqual(
+            (stats['post_count'], stats['upvotes_received'], stats['votes_cast'], stats['score']), (3, 3, 0, 6),
+        )
+        self.assertEqual([post['Content'] for post in stats['recent_posts']], ['Post 2', 'Post 1', 'Post 0'])
+        stats = self.client.get(f'/api/students/{self.students[2].pk}/post-stats/').data
+        self.assertEqual((stats['post_count'], stats['votes_cast'], stats['last_post']), (0, 2, None))
+        self.assertEqual(self.client.get('/api/students/39999999/post-stats/').status_code, 404)
+
+    def test_counters_follow_deleted_voters(self):
+        self.vote(self.users[1], self.posts[0])
+        self.vote(self.users[2], self.posts[0])
+        self.students[2].delete()
+        self.posts[0].refresh_from_db()
+        self.assertEqual(self.posts[0].Upvotes, 1)
+
+        Post.objects.filter(pk=self.posts[0].pk).update(Upvotes=7, HotScore=0)
+        call_command('recount_post_votes', stdout=StringIO())
+        self.posts[0].refresh_from_db()
+        self.assertEqual(self.posts[0].Upvotes, 1)
+        self.assertAlmostEqual(self.posts[0].HotScore, forum.hot_score(1, self.posts[0].CreatedAt))
+
+
+class FieldsetTests(QueryBudgetMixin, APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        today = date.today()
+        cls.student = Student.objects.create(UCID=30000001, FName='Jane', LName='Doe', Email='jane.doe@ucalgary.ca')
+        cls.employer = Employer.objects.create(CompanyName='Acme', Email='hr@acme.com', VerificationStatus='Approved')
+        cls.jobs = [
+            JobOpening.objects.create(
+                Employer=cls.employer, JobTitle=f'Developer {i}', Description='A long description ' * 50,
+                Salary=Decimal('70000'), Location='Calgary', Deadline=today, Status=JobOpening.STATUS_ACTIVE,
+            )
+            for i in range(3)
+        ]
+        for job in cls.jobs:
+            JobApplication.objects.create(
+                ApplicantUCID=cls.student, JobID=job, EmployerID=cls.employer, Status='Submitted', DateApplied=today,
+            )
+
+    def setUp(self):
+        get_job_cache().clear()
+
+    def get(self, path):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.assertWithinQueryBudget('GET', path)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data, ' '.join(query['sql'] for query in queries.captured_queries)
+
+    def test_fields_are_loaded_and_rendered_alone(self):
+        data, sql = self.get('/api/job-opening/?fields=JobID,JobTitle&page_size=2')
+        self.assertEqual([set(row) for row in data['results']], [{'JobID', 'JobTitle'}] * 2)
+        self.assertNotIn('"Description"', sql)
+
+        data, sql = self.get(f'/api/job-opening/{self.jobs[0].pk}/?fields=JobTitle')
+        self.assertEqual(data, {'JobTitle': 'Developer 0'})
+        # Not served from, nor stored as, the full cached detail
+        data, _ = self.get(f'/api/job-opening/{self.jobs[0].pk}/')
+        self.assertIn('Description', data)
+        data, _ = self.get(f'/api/job-opening/{self.jobs[0].pk}/?fields=JobTitle')
+        self.assertEqual(data, {'JobTitle': 'Developer 0'})
+
+        response = self.client.get('/api/job-opening/?fields=JobTitle,Nope')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Nope', response.data['fields'])
+
+    def test_expand(self):
+        data, sql = self.get('/api/job-opening/?expand=Employer&fields=JobTitle,Employer.CompanyName')
+        self.assertEqual(data['results'][0], {'JobTitle': 'Developer 0', 'Employer': {'CompanyName': 'Acme'}})
+        self.assertIn('JOIN', sql)
+        self.assertNotIn('"Description"', sql)
+
+        # Nested, within the list budget: joined rather than one query per row
+        data, _ = self.get('/api/job-applications/?expand=JobID.Employer,ApplicantUCID')
+        application = data['results'][0]
+        self.assertEqual(application['JobID']['Employer']['CompanyName'], 'Acme')
+        self.assertEqual(application['ApplicantUCID']['FName'], 'Jane')
+
+        # Reverse relations are prefetched
+        data, _ = self.get(f'/api/employers/{self.employer.pk}/?expand=jobs&fields=CompanyName,jobs.JobTitle')
+        self.assertEqual(data['jobs'], [{'JobTitle': f'Developer {i}'} for i in range(3)])
+
+        self.assertEqual(self.client.get('/api/job-opening/?expand=Description').status_code, 400)
+        self.assertEqual(self.client.get('/api/job-opening/?fields=Employer.CompanyName').status_code, 400)
+
+    def test_ids(self):
+        ids = [self.jobs[2].pk, self.jobs[0].pk]
+        data, _ = self.get(f'/api/job-opening/?ids={ids[0]},{ids[1]},999&fields=JobID')
+        self.assertEqual(data, [{'JobID': self.jobs[0].pk}, {'JobID': self.jobs[2].pk}])
+        self.assertEqual(self.client.get('/api/job-opening/?ids=1,x').status_code, 400)
+        self.assertEqual(self.client.get('/api/job-opening/?ids=' + ','.join(['1'] * 201)).status_code, 400)
+
+
+class RenderingTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = Employer.objects.create(CompanyName='Acme', Email='hr@acme.com', VerificationStatus='Approved')
+        JobOpening.objects.bulk_create([
+            JobOpening(
+                Employer=cls.employer, JobTitle=f'Developer {i}', Description='Build things ' * 20,
+                Salary=Decimal('70000.50'), Location='Calgary', Deadline=date.today(), Status=JobOpening.STATUS_ACTIVE,
+            )
+            for i in range(20)
+        ])
+
+    def setUp(self):
+        get_job_cache().clear()
+
+    @skipUnless(orjson_available(), 'needs orjson')
+    def test_same_output_as_drf(self):
+        payload = {
+            'salary': Decimal('70000.50'),
+            'created': datetime(2025, 1, 2, 3, 4, 5, 123456, tzinfo=dt_timezone.utc),
+            'naive': datetime(2025, 1, 2, 3, 4, 5),
+            'day': date(2025, 1, 2),
+            'at': time(9, 30),
+            'took': timedelta(seconds=90),
+            'id': uuid.UUID(int=1),
+            'lazy': gettext_lazy('This field is required.'),
+            1: ['line\u2028break', (1, 2), b'raw', None, 1.5, True],
+        }
+        self.assertEqual(ORJSONRenderer().render(payload), JSONRenderer().render(payload))
+        self.assertEqual(ORJSONRenderer().render({'big': 2 ** 70}), JSONRenderer().render({'big': 2 ** 70}))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+        self.assertEqual(ORJSONParser().parse(BytesIO(b'{"a": [1, "b"]}')), {'a': [1, 'b']})
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{"a": '))
+
+    def test_compression(self):
+        url = '/api/job-opening/?page_size=20'
+        plain = self.client.get(url)
+        self.assertNotIn('Content-Encoding', plain)
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(response.content)), json.loads(plain.content))
+
+        if compression.brotli is not None:
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0.8, br')
+            self.assertEqual(response['Content-Encoding'], 'br')
+            self.assertEqual(json.loads(compression.brotli.decompress(response.content)), json.loads(plain.content))
+        self.assertNotIn('Content-Encoding', self.client.get(url, HTTP_ACCEPT_ENCODING='br;q=0, gzip;q=0'))
+
+        # Too small to be worth it
+        response = self.client.get(url.replace('20', '1'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+        with override_settings(COMPRESSION_MIN_SIZE=0):
+            self.assertNotIn('Content-Encoding', self.client.get(url, HTTP_ACCEPT_ENCODING='gzip'))
+
+    def test_negotiation(self):
+        self.assertEqual(compression.negotiate_encoding('gzip'), 'gzip')
+        self.assertEqual(compression.negotiate_encoding('identity'), None)
+        self.assertEqual(compression.negotiate_encoding(''), None)
+        self.assertEqual(compression.negotiate_encoding('*;q=0.5, gzip;q=0.1'), 'br' if compression.brotli else 'gzip')
+        self.assertEqual(compression.negotiate_encoding('br;q=0.5, gzip;q=0.9'), 'gzip')
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_rendering', rows=5, repeat=1, json=True, stdout=out, stderr=StringIO())
+        results = json.loads(out.getvalue())
+        self.assertEqual({row['payload'] for row in results}, {'job-openings', 'job-applications'})
+        # Every renderer produces the same bytes
+        for payload in ('job-openings', 'job-applications'):
+            self.assertEqual(len({row['bytes'] for row in results if row['payload'] == payload}), 1)
+
+
+class MirrorReplicaMixin:
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # A replica of the test database, the way TEST["MIRROR"] sets one up
+        # (after the test case has set up its allowed databases)
+        connections.settings['replica'] = {**connection.settings_dict, 'TEST': {'MIRROR': 'default'}}
+        connections['replica'] = connections['default']
+
+    @classmethod
+    def tearDownClass(cls):
+        del connections['replica']
+        del connections.settings['replica']
+        super().tearDownClass()
+
+    def reads(self, alias):
+        return db_router.get_stats()['databases'][alias]['reads']
+
+
+@override_settings(REPLICA_DATABASES=['replica'])
+class ReplicaRoutingTests(MirrorReplicaMixin, APITestCase):
+    password = 'NextStep!2025'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='jane.doe@ucalgary.ca', email='jane.doe@ucalgary.ca', password=cls.password, user_type='student',
+        )
+        cls.student = Student.objects.create(UCID=30000001, FName='Jane', LName='Doe', Email='jane.doe@ucalgary.ca')
+        cls.post = Post.objects.create(VUCID=cls.student, Content='Hello', Date=date.today())
+
+    def setUp(self):
+        default_cache.clear()
+        db_router._down_until.clear()
+
+    def authenticate(self):
+        token = self.client.post('/api/login/', {'email': self.user.email, 'password': self.password}, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token.data['token']}")
+
+    def test_reads_go_to_the_replica_until_the_client_writes(self):
+        self.assertIsNone(db_router.ReplicaRouter().db_for_read(Post))  # outside requests
+
+        replica_reads = self.reads('replica')
+        self.assertEqual(self.client.get('/api/posts/').status_code, 200)
+        self.assertGreater(self.reads('replica'), replica_reads)
+
+        self.authenticate()
+        replica_reads = self.reads('replica')
+        response = self.client.post('/api/posts/', {'VUCID': self.student.pk, 'Content': 'Hi', 'Date': date.today()})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.reads('replica'), replica_reads)
+
+        # The writer reads its writes from the primary for a while; others don't
+        pinned = db_router.get_stats()['pinned_requests']
+        self.assertEqual(len(self.client.get('/api/posts/').data['results']), 2)
+        self.assertEqual(self.reads('replica'), replica_reads)
+        self.assertEqual(db_router.get_stats()['pinned_requests'], pinned + 1)
+        self.client.credentials()
+        self.client.get('/api/posts/')
+        self.assertGreater(self.reads('replica'), replica_reads)
+
+    def test_queries_are_counted_once(self):
+        # The replica alias shares the primary's connection here
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                '/api/login/', {'email': self.user.email, 'password': self.password}, format='json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'desc="{len(queries)} queries, 0 duplicate"', response['Server-Timing'])
+        self.assertNotIn('X-Query-Budget-Exceeded', response)
+
+    def test_failing_replica_is_skipped(self):
+        # A replica that can't be reached
+        primary = connections['default']
+        connections['replica'] = primary.__class__(
+            {**primary.settings_dict, 'NAME': '/nonexistent/replica.sqlite3'}, alias='unreachable',
+        )
+        try:
+            self.assertEqual(self.client.get(f'/api/posts/{self.post.pk}/').status_code, 200)
+            self.assertTrue(db_router.is_down('replica'))
+        finally:
+            connections['replica'] = primary
+        stats = db_router.get_stats()
+        self.assertEqual(stats['databases']['replica']['failures'], 1)
+        self.assertGreaterEqual(stats['replica_fallbacks'], 1)
+
+        # Left alone until REPLICA_RETRY_SECONDS pass
+        replica_reads = self.reads('replica')
+        self.client.get('/api/posts/')
+        self.assertEqual(self.reads('replica'), replica_reads)
+
+    def test_stats_endpoint(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get('/api/db-stats/').status_code, 403)
+        self.user.is_staff = True
+        response = self.client.get('/api/db-stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['replicas'], ['replica'])
+        self.assertEqual(set(response.data['databases']), {'default', 'replica'})
+
+
+class BulkLoadTests(TestCase):
+    def test_generated_data_is_consistent(self):
+        call_command(
+            'generate_data', students=40, employers=3, jobs=10, applications=60, posts=8, verifications=5,
+            batch_size=7, stdout=StringIO(),
+        )
+        self.assertEqual(Student.objects.count(), 40)
+        self.assertEqual(Moderator.objects.count(), 1)
+        self.assertEqual(JobOpening.objects.count(), 10)
+        self.assertEqual(Post.objects.count(), 8)
+        self.assertEqual(VerifyApplicant.objects.count(), 5)
+        self.assertEqual(VerifyEmployer.objects.count(), 3)
+        applications = JobApplication.objects.select_related('JobID')
+        self.assertEqual(len(applications), 60)
+        for application in applications:
+            self.assertEqual(application.EmployerID_id, application.JobID.Employer_id)
+        self.assertFalse(Student.objects.filter(Email='').exists())
+
+        # Runs again on top, and the sequences moved past the loaded ids
+        call_command('generate_data', students=10, stdout=StringIO())
+        self.assertEqual(Student.objects.count(), 50)
+        Employer.objects.create(CompanyName='After', Email='after@example.com', VerificationStatus='Pending')
+
+    def write_file(self, content, suffix='.csv'):
+        fd, name = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w') as file:
+            file.write(content)
+        self.addCleanup(os.remove, name)
+        return name
+
+    def test_import_csv(self):
+        roster = self.write_file(
+            'UCID,FName,LName,Email,Major\n'
+            '30000001,Jane,Doe,jane.doe@ucalgary.ca,Geology\n'
+            '30000002,"Smith, Jr",John,john@ucalgary.ca,\n'
+        )
+        call_command('import_csv', 'Student', roster, stdout=StringIO())
+        john = Student.objects.get(UCID=30000002)
+        self.assertEqual((john.FName, john.Major), ('Smith, Jr', None))
+        self.assertIsNotNone(john.UpdatedAt)
+
+        # By database column, leaving defaulted ones out
+        jobs = self.write_file(
+            'EmployerID,JobTitle,Description,Salary,Location,Deadline,Status\n'
+            f'{Employer.objects.create(CompanyName="Acme", Email="hr@acme.com").pk},Developer,"Line one\n'
+            'Line two",55000.50,Calgary,2030-01-31,Active\n'
+        )
+        call_command('import_csv', 'JobOpening', jobs, stdout=StringIO())
+        job = JobOpening.objects.get()
+        self.assertEqual((job.Description, job.Salary), ('Line one\nLine two', Decimal('55000.50')))
+
+    def test_import_csv_is_all_or_nothing(self):
+        bad_row = self.write_file(
+            'UCID,FName,LName,Email\n30000001,Jane,Doe,a@ucalgary.ca\nabc,John,Doe,b@ucalgary.ca\n'
+        )
+        with self.assertRaisesMessage(CommandError, 'Line 3: UCID'):
+            call_command('import_csv', 'Student', bad_row, stdout=StringIO())
+        self.assertFalse(Student.objects.exists())
+
+        missing = self.write_file('UCID,FName\n30000001,Jane\n')
+        with self.assertRaisesMessage(CommandError, 'Missing required columns: LName, Email.'):
+            call_command('import_csv', 'Student', missing, stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, 'No model named Nope'):
+            call_command('import_csv', 'Nope', missing, stdout=StringIO())
+
+    def test_load_benchmark(self):
+        call_command('generate_data', students=30, stdout=StringIO())
+        output = self.write_file('', suffix='.json')
+        call_command(
+            'benchmark_api', requests=60, concurrency=1, scratch_database=True, output=output, stdout=StringIO(),
+        )
+        with open(output) as file:
+            results = json.load(file)
+        self.assertFalse(CustomUser.objects.filter(bio=benchmark_api.BENCHMARK_BIO).exists())
+        self.assertEqual(results['total']['requests'], 60)
+        self.assertEqual(results['total']['errors'], 0)
+        self.assertIn('jobs.browse', results['scenarios'])
+        self.assertGreater(results['scenarios']['jobs.browse']['queries_per_request'], 0)
+
+        # A baseline nothing can match
+        for row in results['scenarios'].values():
+            row['p95_ms'], row['queries_per_request'] = 0.001, 0
+        with open(output, 'w') as file:
+            json.dump(results, file)
+        with self.assertRaisesMessage(CommandError, 'jobs.browse: p95'):
+            call_command(
+                'benchmark_api', requests=60, concurrency=1, scratch_database=True, baseline=output, stdout=StringIO(),
+            )
+
+    def test_load_benchmark_uses_a_throwaway_database(self):
+        with mock.patch.object(benchmark_api, 'setup_databases', return_value='old config') as setup_databases, \
+                mock.patch.object(benchmark_api, 'teardown_databases') as teardown_databases:
+            with self.assertRaisesMessage(CommandError, 'Nothing to request'):
+                call_command('benchmark_api', seed=0, requests=10, stdout=StringIO())
+        setup_databases.assert_called_once()
+        teardown_databases.assert_called_once_with('old config', verbosity=0)
+
+    def test_benchmark_comparison(self):
+        options = {'max_throughput_drop': 0.2, 'max_latency_regression': 0.25}
+        row = {'requests': 100, 'errors': 0, 'throughput': 500.0, 'p95_ms': 10.0, 'queries_per_request': 3.0}
+        baseline = {'total': row, 'scenarios': {'jobs.browse': row, 'login': row}}
+        compare = benchmark_api.Command().compare
+
+        # Within the tolerances, and scenarios the baseline didn't run
+        results = {
+            'total': {**row, 'throughput': 401.0},
+            'scenarios': {
+                'jobs.browse': {**row, 'p95_ms': 12.5, 'queries_per_request': 3.05},
+                'apply': {**row, 'errors': 100},
+            },
+        }
+        self.assertEqual(compare(baseline, results, options), [])
+
+        results = {
+            'total': {**row, 'throughput': 399.0},
+            'scenarios': {
+                'jobs.browse': {**row, 'p95_ms': 12.6, 'queries_per_request': 4.0},
+                'login': {**row, 'errors': 2},
+            },
+        }
+        self.assertEqual(compare(baseline, results, options), [
+            'throughput 500.0 -> 399.0 req/s',
+            'jobs.browse: p95 10.0 -> 12.6 ms',
+            'jobs.browse: 3.0 -> 4.0 queries per request',
+            'login: 0 -> 2 errors',
+        ])
+
+
+class JobExpiryTests(QueryBudgetMixin, APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = Employer.objects.create(CompanyName='Acme', Email='hr@acme.com', VerificationStatus='Approved')
+        today = date.today()
+        cls.jobs = [
+            JobOpening.objects.create(
+                Employer=cls.employer, JobTitle=f'Job {days}', Description='', Salary=Decimal('50000'),
+                Location='Calgary', Deadline=today + timedelta(days=days), Status=status,
+            )
+            for days, status in [(-30, 'Active'), (-20, 'Active'), (-10, 'Active'), (-1, 'Active'),
+                                 (-5, JobOpening.STATUS_CLOSED), (0, 'Active'), (10, 'Active')]
+        ]
+
+    def setUp(self):
+        get_job_cache().clear()
+
+    def test_expired_jobs_are_closed_in_batches(self):
+        expired = self.jobs[:4]
+        self.client.get(f'/api/job-opening/{expired[0].pk}/')
+        before = JobOpening.objects.get(pk=expired[0].pk).UpdatedAt
+
+        self.assertEqual(expiry.expire_job_openings(batch_size=3), 4)
+        statuses = dict(JobOpening.objects.values_list('pk', 'Status'))
+        self.assertEqual([statuses[job.pk] for job in self.jobs], ['Closed'] * 5 + ['Active'] * 2)
+        self.assertGreater(JobOpening.objects.get(pk=expired[0].pk).UpdatedAt, before)
+        # The cached detail went with it
+        response = self.client.get(f'/api/job-opening/{expired[0].pk}/')
+        self.assertEqual((response['X-Cache'], response.data['Status']), ('MISS', 'Closed'))
+
+        stats = expiry.get_stats()
+        self.assertEqual((stats['runs'], stats['closed'], stats['last_batches'], stats['pending']), (1, 4, 2, 0))
+        self.assertEqual(expiry.expire_job_openings(), 0)
+        self.assertEqual(expiry.get_stats()['runs'], 2)
+
+    def test_open_filter(self):
+        response = self.client.get('/api/job-opening/', {'open': 'true'})
+        self.assertEqual({job['JobTitle'] for job in response.data['results']}, {'Job 0', 'Job 10'})
+        response = self.client.get('/api/job-opening/', {'open': 'false', 'page_size': 10})
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_applications_need_an_open_job(self):
+        student = Student.objects.create(UCID=30000001, FName='Jane', LName='Doe', Email='jane.doe@ucalgary.ca')
+        self.client.force_authenticate(CustomUser.objects.create_user(
+            username='jane.doe@ucalgary.ca', email='jane.doe@ucalgary.ca', password='NextStep!2025',
+        ))
+
+        def apply(job):
+            return self.client.post('/api/job-applications/', {
+                'ApplicantUCID': student.pk, 'JobID': job.pk, 'EmployerID': self.employer.pk,
+                'Status': 'Submitted', 'DateApplied': str(date.today()),
+            }, format='json')
+
+        # Past its Deadline but not closed yet, and closed
+        for job in (self.jobs[3], self.jobs[4]):
+            response = apply(job)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data['JobID'], ['This job opening is no longer taking applications.'])
+        response = apply(self.jobs[5])  # the Deadline is today
+        self.assertEqual(response.status_code, 201)
+
+        # Applications already made keep moving once the job closes
+        JobOpening.objects.filter(pk=self.jobs[5].pk).update(Status=JobOpening.STATUS_CLOSED)
+        response = self.client.patch(
+            f'/api/job-applications/{response.data["ApplicationID"]}/', {'Status': 'Interview'}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_scheduler_runs_once_per_interval(self):
+        scheduler = expiry.ExpiryScheduler(interval=60)
+        self.assertTrue(scheduler.tick())
+        self.assertFalse(scheduler.tick())  # as another process would
+        self.assertEqual(expiry.get_stats()['closed'], 4)
+
+        # Another process is running (holds the database lock)
+        get_job_cache().delete(expiry.RUN_KEY)
+        with mock.patch.object(expiry, 'run_lock') as run_lock:
+            run_lock.return_value.__enter__.return_value = False
+            self.assertFalse(scheduler.tick())
+        self.assertEqual(expiry.get_stats()['runs'], 1)
+
+        command_output = StringIO()
+        call_command('expire_job_openings', dry_run=True, stdout=command_output)
+        self.assertIn('0 job openings', command_output.getvalue())
+
+    def test_stats_endpoint(self):
+        admin = CustomUser.objects.create_user(
+            username='admin@ucalgary.ca', email='admin@ucalgary.ca', password='NextStep!2025', is_staff=True,
+        )
+        self.client.force_authenticate(admin)
+        response = self.assertWithinQueryBudget('GET', '/api/job-opening/expiry-stats/')
+        self.assertEqual(response.data['pending'], 4)
+
+
+class FacetTests(QueryBudgetMixin, APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        energy = Employer.objects.create(CompanyName='Bow Energy', Email='hr@bow.com', Industry='Energy')
+        tech = Employer.objects.create(CompanyName='Acme', Email='hr@acme.com', Industry='Technology')
+        today = date.today()
+        for employer, location, salary, days in [
+            (energy, 'Calgary, AB', 45000, 3), (energy, ' calgary', 72000, 20), (tech, 'Calgary', 120000, 90),
+            (tech, 'Edmonton', 30000, -2), (tech, 'Remote', 61000, 5),
+        ]:
+            JobOpening.objects.create(
+                Employer=employer, JobTitle='Developer', Description='', Salary=Decimal(salary), Location=location,
+                Deadline=today + timedelta(days=days), Status=JobOpening.STATUS_ACTIVE,
+            )
+
+    def setUp(self):
+        get_job_cache().clear()
+
+    def counts(self, facet):
+        return {row.get('value', row.get('key')): row['count'] for row in facet}
+
+    def test_facets_of_the_filtered_rows(self):
+        response = self.assertWithinQueryBudget('GET', '/api/job-opening/?facets=true&page_size=2')
+        self.assertEqual(len(response.data['results']), 2)
+        facets = response.data['facets']
+        self.assertEqual(self.counts(facets['location']), {'calgary': 3, 'edmonton': 1, 'remote': 1})
+        self.assertEqual(facets['location'][0]['label'], 'Calgary')
+        self.assertEqual(self.counts(facets['industry']), {'Technology': 3, 'Energy': 2})
+        self.assertEqual(self.counts(facets['salary']), {
+            'under-40k': 1, '40k-60k': 1, '60k-80k': 2, '80k-100k': 0, '100k-plus': 1,
+        })
+        self.assertEqual(self.counts(facets['deadline']), {'expired': 1, 'week': 2, 'month': 1, 'later': 1})
+
+        # Counted over the current search, in one query
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/job-opening/', {'facets': 'true', 'location': 'calgary', 'minSalary': 50000})
+        self.assertEqual(self.counts(response.data['facets']['location']), {'calgary': 2})
+        self.assertEqual(self.counts(response.data['facets']['industry']), {'Technology': 1, 'Energy': 1})
+        self.assertEqual(sum('GROUP BY' in query['sql'] for query in queries.captured_queries), 1)
+
+    def test_facets_are_optional_and_cached(self):
+        self.assertNotIn('facets', self.client.get('/api/job-opening/').data)
+        self.assertIsInstance(self.client.get('/api/job-opening/?paginate=false').data, list)
+        self.client.get('/api/job-opening/?facets=true')
+        response = self.client.get('/api/job-opening/?facets=true')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertIn('facets', response.data)
+
+    def test_salary_bucket_bounds_filter_what_they_count(self):
+        JobOpening.objects.filter(Salary=Decimal(61000)).update(Salary=Decimal(60000))
+        facets = self.client.get('/api/job-opening/?facets=true').data['facets']
+        for bucket in facets['salary']:
+            params = {'minSalary': bucket['min'], 'salaryBelow': bucket['max'], 'paginate': 'false'}
+            response = self.client.get('/api/job-opening/', {k: v for k, v in params.items() if v is not None})
+            self.assertEqual(len(response.data), bucket['count'], bucket['key'])
+
+    def test_facets_of_a_bare_list(self):
+        response = self.client.get('/api/job-opening/?paginate=false&facets=true')
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertEqual(self.counts(response.data['facets']['industry']), {'Technology': 3, 'Energy': 2})
+
+    def test_location_facet_values_filter_what_they_count(self):
+        facets = self.client.get('/api/job-opening/?facets=true').data['facets']
+        for facet in facets['location']:
+            response = self.client.get('/api/job-opening/', {'location': facet['value'], 'paginate': 'false'})
+            self.assertEqual(len(response.data), facet['count'])
+        # Matched like the facet: case, spaces and a province don't matter, and part of a name won't do
+        response = self.client.get('/api/job-opening/', {'location': ' CALGARY, Alberta', 'paginate': 'false'})
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(self.client.get('/api/job-opening/', {'location': 'cal', 'paginate': 'false'}).data, [])
+
+
+class StatusEventTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = Student.objects.create(UCID=30000001, FName='Jane', LName='Doe', Email='jane.doe@ucalgary.ca')
+        cls.moderator = Moderator.objects.create(ModeratorID=cls.student)
+        cls.employer = Employer.objects.create(CompanyName='Acme', Email='hr@acme.com', VerificationStatus='Pending')
+        cls.job = JobOpening.objects.create(
+            Employer=cls.employer, JobTitle='Developer', Description='', Salary=Decimal('70000'),
+            Location='Calgary', Deadline=date.today(), Status=JobOpening.STATUS_ACTIVE,
+        )
+
+    def setUp(self):
+        events.reset_broker()
+        self.addCleanup(events.reset_broker)
+        events.connect_event_signals()
+        self.addCleanup(events.disconnect_event_signals)
+
+    def published(self):
+        return [(event.type, event.data, sorted(event.topics)) for event in events.get_broker().events]
+
+    def test_status_changes_are_published_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            application = JobApplication.objects.create(
+                ApplicantUCID=self.student, JobID=self.job, EmployerID=self.employer,
+                Status='Applied', DateApplied=date.today(),
+            )
+            # Nothing before the commit
+            self.assertEqual(self.published(), [])
+        data = {
+            'ApplicationID': application.pk, 'JobID': self.job.pk, 'EmployerID': self.employer.pk,
+            'ApplicantUCID': self.student.pk, 'Status': 'Applied', 'PreviousStatus': None,
+        }
+        self.assertEqual(self.published(), [
+            ('application.status', data, [f'employer:{self.employer.pk}', 'student:30000001']),
+        ])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            application = JobApplication.objects.get(pk=application.pk)
+            application.save()  # unchanged
+            application.Status = 'Interview'
+            application.save(update_fields=['UpdatedAt'])  # status not written
+            application.save()
+            application.save()
+        self.assertEqual(len(self.published()), 2)
+        self.assertEqual(self.published()[1][1]['Status'], 'Interview')
+        self.assertEqual(self.published()[1][1]['PreviousStatus'], 'Applied')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            VerifyApplicant.objects.create(
+                ModeratorID=self.moderator, ApplicantUCID=self.student, VerificationStatus='Approved',
+                VerificationDate=date.today(),
+            )
+            verification = VerifyEmployer.objects.create(
+                ModeratorID=self.moderator, EmployerID=self.employer, VerificationStatus='Pending',
+                VerificationDate=date.today(),
+            )
+            verification.VerificationStatus = 'Rejected'
+            verification.save()
+        self.assertEqual([(event[0], event[2]) for event in self.published()[2:]], [
+            ('applicant.verification', ['student:30000001']),
+            ('employer.verification', [f'employer:{self.employer.pk}']),
+            ('employer.verification', [f'employer:{self.employer.pk}']),
+        ])
+        self.assertEqual(self.published()[-1][1]['PreviousStatus'], 'Pending')
+
+    @override_settings(EVENT_STREAM=True)
+    def test_bulk_writes_are_published(self):
+        self.client.force_authenticate(CustomUser(username='admin', is_staff=True))
+        rows = [
+            {'ApplicantUCID': self.student.pk, 'JobID': self.job.pk, 'EmployerID': self.employer.pk,
+             'Status': 'Applied', 'DateApplied': str(date.today())},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/job-applications/bulk/', rows, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        application_id = self.published()[0][1]['ApplicationID']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch('/api/job-applications/bulk/', [
+                {'ApplicationID': application_id, 'Status': 'Offer'},
+            ], format='json')
+        self.assertEqual([event[1]['Status'] for event in self.published()], ['Applied', 'Offer'])
+
+    def test_replay_after_last_event_id(self):
+        broker = events.EventBroker(size=3)
+        first = broker.publish('application.status', {'ApplicationID': 1}, ['student:1'])
+        broker.publish('application.status', {'ApplicationID': 2}, ['student:2'])
+        third = broker.publish('employer.verification', {'VID': 3}, ['employer:1', 'student:1'])
+
+        async def subscribe(last_id, broker=broker):
+            subscription, backlog = broker.subscribe(['student:1'], last_id)
+            subscription.close()
+            return [(event.id, event.type) for event in backlog]
+
+        self.assertEqual(async_to_sync(subscribe)(None), [])
+        self.assertEqual(async_to_sync(subscribe)(first.id), [(third.id, 'employer.verification')])
+        self.assertEqual(async_to_sync(subscribe)(first.id - 1), [
+            (first.id, 'application.status'), (third.id, 'employer.verification'),
+        ])
+
+        # The first event drops out of the buffer
+        fourth = broker.publish('application.status', {'ApplicationID': 4}, ['student:3'])
+        self.assertEqual(async_to_sync(subscribe)(first.id - 1), [(fourth.id, 'reset')])
+        self.assertEqual(async_to_sync(subscribe)(first.id), [(third.id, 'employer.verification')])
+        # A restarted process has none of the old events
+        restarted = events.EventBroker(size=3)
+        self.assertEqual(async_to_sync(subscribe)(fourth.id, restarted), [(restarted.last_id, 'reset')])
+        self.assertEqual(broker.subscriptions, set())
+
+
+# URLconf as nextstep/asgi.py sets it up, regardless of ASYNC_READ_VIEWS here
+class AsyncURLConf:
+    urlpatterns = [
+        path('api/events/', events_view),
+        path('api/events/ticket/', events.EventTicketView.as_view()),
+        path('api/', include(with_async_reads(router.urls, ASYNC_READ_VIEWSETS))),
+    ]
+
+
+@override_settings(ROOT_URLCONF=AsyncURLConf)
+class AsyncReadViewTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = Employer.objects.create(CompanyName='Acme', Email='hr@acme.com', VerificationStatus='Approved')
+        cls.job = JobOpening.objects.create(
+            Employer=cls.employer, JobTitle='Developer', Description='Build things', Salary=Decimal('70000'),
+            Location='Calgary', Deadline=date.today(), Status=JobOpening.STATUS_ACTIVE,
+        )
+        cls.student = Student.objects.create(UCID=30000001, FName='Jane', LName='Doe', Email='jane.doe@ucalgary.ca')
+        cls.post = Post.objects.create(VUCID=cls.student, Content='Hello', Date=date.today())
+        cls.user = CustomUser.objects.create_user(
+            username='jane', email='jane.doe@ucalgary.ca', password='secret-pass-1', user_type='student',
+        )
+        # Issued before any revocation in the tests (iat has one-second resolution)
+        token = CustomTokenObtainPairSerializer.get_token(cls.user).access_token
+        token['iat'] -= 5
+        cls.token = str(token)
+
+    def setUp(self):
+        get_job_cache().clear()
+        default_cache.clear()
+
+    async def test_list_and_detail_match_the_sync_views(self):
+        response = await self.async_client.get('/api/job-opening/?location=calgary')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['JobTitle'], 'Developer')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual((await self.async_client.get('/api/job-opening/?location=calgary'))['X-Cache'], 'HIT')
+        response = await self.async_client.get('/api/job-opening/?facets=true')
+        self.assertEqual(response.json()['facets']['location'], [{'value': 'calgary', 'label': 'Calgary', 'count': 1}])
+
+        response = await self.async_client.get(f'/api/posts/{self.post.pk}/')
+        self.assertEqual(response.json()['Content'], 'Hello')
+        response = await self.async_client.get(f'/api/posts/{self.post.pk}/', headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+        response = await self.async_client.get(f'/api/posts/{self.post.pk}/?expand=VUCID&fields=VUCID.FName')
+        self.assertEqual(response.json(), {'VUCID': {'FName': 'Jane'}})
+
+        self.assertEqual((await self.async_client.get('/api/posts/999/')).status_code, 404)
+        self.assertEqual((await self.async_client.get('/api/posts/abc/')).status_code, 404)
+
+    async def test_bad_token_and_writes_use_the_drf_view(self):
+        response = await self.async_client.get('/api/posts/', headers={'Authorization': 'Bearer nope'})
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.post('/api/posts/', {'Content': 'Hi'}, content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_revoked_tokens_are_rejected(self):
+        headers = {'Authorization': f'Bearer {self.token}'}
+        self.assertEqual((await self.async_client.get('/api/posts/', headers=headers)).status_code, 200)
+
+        await sync_to_async(revoke_user_tokens)([self.user.pk])
+        self.assertEqual((await self.async_client.get('/api/posts/', headers=headers)).status_code, 401)
+        response = await self.async_client.get(f'/api/posts/{self.post.pk}/', headers=headers)
+        self.assertEqual(response.status_code, 401)
+
+    async def test_filters_run_off_the_event_loop(self):
+        on_loop = []
+        filter_queryset = JobOpeningViewSet.filter_queryset
+
+        def recording_filter_queryset(viewset, queryset):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return filter_queryset(viewset, queryset)
+
+        with mock.patch.object(JobOpeningViewSet, 'filter_queryset', recording_filter_queryset):
+            self.assertEqual((await self.async_client.get('/api/job-opening/?search=dev')).status_code, 200)
+            self.assertEqual((await self.async_client.get(f'/api/job-opening/{self.job.pk}/')).status_code, 200)
+        self.assertEqual(on_loop, [False, False])
+
+
+@override_settings(ROOT_URLCONF=AsyncURLConf, REPLICA_DATABASES=['replica'])
+class AsyncReplicaReadViewTests(MirrorReplicaMixin, AsyncReadViewTests):
+    # The async read views again, with their reads routed to a replica
+
+    def setUp(self):
+        super().setUp()
+        db_router._down_until.clear()
+
+    async def test_reads_go_to_the_replica(self):
+        replica_reads = self.reads('replica')
+        self.assertEqual((await self.async_client.get('/api/job-opening/?search=dev')).status_code, 200)
+        self.assertEqual((await self.async_client.get(f'/api/posts/{self.post.pk}/')).status_code, 200)
+        self.assertGreater(self.reads('replica'), replica_reads)
+        self.assertFalse(db_router.is_down('replica'))
+
+
+@override_settings(ROOT_URLCONF=AsyncURLConf)
+class EventStreamTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = Student.objects.create(UCID=30000001, FName='Jane', LName='Doe', Email='jane.doe@ucalgary.ca')
+        cls.user = CustomUser.objects.create_user(
+            username='jane', email='jane.doe@ucalgary.ca', password='secret-pass-1', user_type='student',
+        )
+        # Issued before the revocation in the tests (iat has one-second resolution)
+        token = CustomTokenObtainPairSerializer.get_token(cls.user).access_token
+        token['iat'] -= 5
+        cls.token = str(token)
+
+    def setUp(self):
+        events.reset_broker()
+        self.addCleanup(events.reset_broker)
+        default_cache.clear()
+
+    async def get_ticket(self):
+        response = await self.async_client.post(
+            '/api/events/ticket/', headers={'Authorization': f'Bearer {self.token}'},
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()['ticket']
+
+    async def test_stream_pushes_the_users_events(self):
+        broker = events.get_broker()
+        missed = broker.publish('application.status', {'ApplicationID': 1}, ['student:30000001'])
+
+        response = await self.async_client.get('/api/events/', {'ticket': await self.get_ticket()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+
+        broker.publish('application.status', {'ApplicationID': 2}, ['student:30000002'])
+        event = broker.publish('application.status', {'ApplicationID': 3}, ['student:30000001'])
+        self.assertEqual(
+            await anext(stream),
+            f'id: {event.id}\nevent: application.status\ndata: {{"ApplicationID": 3}}\n\n'.encode(),
+        )
+        # ASGIHandler cancels the response when the client disconnects
+        reading = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        reading.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await reading
+        self.assertEqual(broker.subscriptions, set())
+
+        # Reconnecting replays what came after the last event seen
+        response = await self.async_client.get(
+            '/api/events/', headers={'Authorization': f'Bearer {self.token}', 'Last-Event-ID': str(missed.id)},
+        )
+        stream = aiter(response.streaming_content)
+        await anext(stream)
+        self.assertTrue((await anext(stream)).startswith(f'id: {event.id}\n'.encode()))
+        await stream.aclose()
+
+    @override_settings(EVENT_STREAM_HEARTBEAT=0.01)
+    async def test_idle_stream_sends_keep_alives(self):
+        response = await self.async_client.get('/api/events/', {'ticket': await self.get_ticket()})
+        stream = aiter(response.streaming_content)
+        await anext(stream)
+        self.assertEqual(await anext(stream), b': keep-alive\n\n')
+        await stream.aclose()
+
+    async def test_stream_needs_a_student_or_employer_token(self):
+        self.assertEqual((await self.async_client.get('/api/events/')).status_code, 401)
+        self.assertEqual((await self.async_client.get('/api/events/', {'ticket': 'nope'})).status_code, 401)
+        self.assertEqual((await self.async_client.post('/api/events/', {'ticket': 'nope'})).status_code, 405)
+        self.assertEqual((await self.async_client.post('/api/events/ticket/')).status_code, 401)
+
+    async def test_tickets_instead_of_tokens_in_the_url(self):
+        # Access tokens aren't taken from the URL
+        self.assertEqual((await self.async_client.get('/api/events/', {'token': self.token})).status_code, 401)
+        # Nor is a ticket taken as an access token, or for longer than it lasts
+        ticket = await self.get_ticket()
+        response = await self.async_client.get('/api/events/', headers={'Authorization': f'Bearer {ticket}'})
+        self.assertEqual(response.status_code, 401)
+        with override_settings(EVENT_TICKET_MAX_AGE=-1):
+            self.assertEqual((await self.async_client.get('/api/events/', {'ticket': ticket})).status_code, 401)
+        # Nor once the account's tokens are revoked
+        await sync_to_async(revoke_user_tokens)([self.user.pk])
+        self.assertEqual((await self.async_client.get('/api/events/', {'ticket': ticket})).status_code, 401)
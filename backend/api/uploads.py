@@ -0,0 +1,174 @@
+import fcntl
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+
+from .models import Applicant, CustomUser, ResumeText, ResumeUpload
+from .storage import CHUNK_SIZE, resume_storage
+
+# Chunked, resumable resume uploads.
+#
+# A client opens an upload with the file's size (and optionally its
+# SHA-256), then sends the bytes in order as PATCH requests, each with an
+# Upload-Offset header saying where the chunk starts (the core of the tus
+# protocol). Chunks are appended to a part file under MEDIA_ROOT/uploads,
+# copied from the request in small pieces rather than read into memory. A
+# dropped connection only loses the chunk in flight: GET/HEAD on the upload
+# tells the client where to resume. Concurrent chunks for one upload are
+# refused with an flock on the part file, so no database transaction is held
+# open while a slow client sends its bytes.
+#
+# When the last byte is in, the file is checked (hash, PDF header), moved
+# into the content-addressed store without a copy (api/storage.py) and set
+# on the user's account or applicant profile, which queues its text for
+# extraction (api/resumes.py).
+
+UPLOAD_DIR = 'uploads'
+TARGETS = (ResumeText.SOURCE_ACCOUNT, ResumeText.SOURCE_APPLICANT)
+
+
+class OffsetMismatch(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Upload-Offset does not match the bytes received so far.'
+    default_code = 'offset_mismatch'
+
+
+def get_max_size():
+    return getattr(settings, 'RESUME_UPLOAD_MAX_SIZE', 10 * 1024 * 1024)
+
+
+def get_max_chunk_size():
+    return getattr(settings, 'RESUME_UPLOAD_MAX_CHUNK', 2 * 1024 * 1024)
+
+
+def part_path(upload):
+    return resume_storage.path(f'{UPLOAD_DIR}/{upload.pk}.part')
+
+
+def discard(upload):
+    try:
+        os.unlink(part_path(upload))
+    except FileNotFoundError:
+        pass
+    upload.delete()
+
+
+def purge_stale_uploads(user_id):
+    # Uploads a user started and never finished
+    expiry = timedelta(hours=getattr(settings, 'RESUME_UPLOAD_EXPIRY_HOURS', 24))
+    for upload in ResumeUpload.objects.filter(User_id=user_id, UpdatedAt__lt=timezone.now() - expiry):
+        discard(upload)
+
+
+def applicant_of(user_id):
+    return Applicant.objects.filter(SUCID__Email__in=CustomUser.objects.filter(pk=user_id).values('email')).first()
+
+
+def start_upload(user_id, target, file_name, size, sha256=''):
+    if target not in TARGETS:
+        raise ValidationError({'target': f'Must be one of {", ".join(TARGETS)}.'})
+    if not file_name.lower().endswith('.pdf'):
+        raise ValidationError({'file_name': 'Resumes must be PDF files.'})
+    if not 0 < size <= get_max_size():
+        raise ValidationError({'size': f'Must be between 1 and {get_max_size()} bytes.'})
+    if sha256 and (len(sha256) != 64 or not all(c in '0123456789abcdef' for c in sha256.lower())):
+        raise ValidationError({'sha256': 'Must be a hex SHA-256 digest.'})
+    if target == ResumeText.SOURCE_APPLICANT and applicant_of(user_id) is None:
+        raise ValidationError({'target': 'No applicant profile to attach the resume to.'})
+
+    purge_stale_uploads(user_id)
+    upload = ResumeUpload.objects.create(
+        User_id=user_id, Target=target, FileName=file_name[:255], Size=size, Sha256=sha256.lower(),
+    )
+    os.makedirs(os.path.dirname(part_path(upload)), exist_ok=True)
+    open(part_path(upload), 'wb').close()
+    return upload
+
+
+def get_upload(upload_id, user_id):
+    try:
+        return ResumeUpload.objects.get(pk=upload_id, User_id=user_id)
+    except (ResumeUpload.DoesNotExist, ValueError, ValidationError):
+        raise NotFound('No such upload.')
+
+
+def write_chunk(upload, offset, length, stream):
+    """
+    Append `length` bytes read from `stream` at `offset`. Returns the stored
+    file name once the upload is complete, else None.
+    """
+    if offset != upload.Offset:
+        raise OffsetMismatch()
+    if length > get_max_chunk_size():
+        raise ValidationError({'detail': f'Chunks can be at most {get_max_chunk_size()} bytes.'})
+    if offset + length > upload.Size:
+        raise ValidationError({'detail': 'The chunk runs past the declared size.'})
+
+    with open(part_path(upload), 'r+b') as part:
+        try:
+            fcntl.flock(part, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise OffsetMismatch('Another chunk of this upload is being written.')
+        # Drop whatever an interrupted chunk left past the recorded offset
+        part.truncate(offset)
+        part.seek(offset)
+        remaining = length
+        while remaining:
+            data = stream.read(min(CHUNK_SIZE, remaining))
+            if not data:
+                break
+            part.write(data)
+            remaining -= len(data)
+        if remaining:
+            part.truncate(offset)
+            raise ValidationError({'detail': 'The chunk is shorter than its Content-Length.'})
+        part.flush()
+        # Only if no other request moved the offset meanwhile
+        if not ResumeUpload.objects.filter(pk=upload.pk, Offset=offset).update(
+            Offset=offset + length, UpdatedAt=timezone.now(),
+        ):
+            raise OffsetMismatch()
+    upload.Offset = offset + length
+
+    if upload.Offset == upload.Size:
+        return finish_upload(upload)
+    return None
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def finish_upload(upload):
+    path = part_path(upload)
+    digest = file_sha256(path)
+    with open(path, 'rb') as file:
+        is_pdf = file.read(5) == b'%PDF-'
+    if (upload.Sha256 and digest != upload.Sha256) or not is_pdf:
+        discard(upload)
+        raise ValidationError({
+            'detail': 'The file does not match its SHA-256.' if is_pdf else 'The file is not a PDF.',
+        })
+
+    if upload.Target == ResumeText.SOURCE_ACCOUNT:
+        owner, fields = CustomUser.objects.get(pk=upload.User_id), ['pdf_file']
+    else:
+        owner, fields = applicant_of(upload.User_id), ['Resume', 'UpdatedAt']
+        if owner is None:
+            discard(upload)
+            raise ValidationError({'target': 'No applicant profile to attach the resume to.'})
+
+    field = fields[0]
+    getattr(owner, field).name = resume_storage.adopt(path, upload.FileName, digest)
+    owner.save(update_fields=fields)
+    upload.delete()
+    return getattr(owner, field).name
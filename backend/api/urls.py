@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
@@ -17,10 +18,31 @@ router.register(r'applicant-verifications', views.VerifyApplicantViewSet)
 router.register(r'employer-verification', views.VerifyEmployerViewSet)
 router.register(r'reviews', views.ReviewsViewSet)
 
+# Views whose public GET list/retrieve are served natively async under ASGI
+ASYNC_READ_VIEWSETS = [views.JobOpeningViewSet, views.PostViewSet]
+
+router_urls = router.urls
+if settings.ASYNC_READ_VIEWS:
+    from .async_views import with_async_reads
+    router_urls = with_async_reads(router_urls, ASYNC_READ_VIEWSETS)
+
 urlpatterns = [
-    path('', include(router.urls)),
+    path('', include(router_urls)),
     path('login/', LoginView.as_view(), name='login'),
     path('register/', RegistrationAPIView.as_view(), name='register'),
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('resume-uploads/', views.ResumeUploadViewSet.as_view({'post': 'create'}), name='resume-upload-list'),
+    path('resume-uploads/<str:pk>/', views.ResumeUploadViewSet.as_view({
+        'get': 'retrieve', 'patch': 'partial_update', 'delete': 'destroy',
+    }), name='resume-upload-detail'),
+    path('db-stats/', views.DatabaseStatsView.as_view(), name='db-stats'),
 ]
+
+# Status events, see api/events.py
+if settings.EVENT_STREAM:
+    from .events import EventTicketView, events_view
+    urlpatterns += [
+        path('events/', events_view, name='events'),
+        path('events/ticket/', EventTicketView.as_view(), name='event-ticket'),
+    ]
@@ -1,5 +1,7 @@
 from rest_framework import viewsets, generics, status
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny, IsAuthenticated
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, PermissionDenied
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
@@ -7,19 +9,43 @@ from rest_framework import filters
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import *
 from .serializers import *
-from .permissions import IsModerator
+from .permissions import IsEmployerSelfOrModerator, IsModerator
+from .authentication import get_employer_id, get_profile
 from rest_framework.views import APIView
-from .filters import JobOpeningFilter
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from .filters import JobOpeningFilter, JobOpeningSearchFilter, PostFeedFilter, PostFilter, StudentResumeFilter
+from .conditional import ConditionalGetMixin
+from .fieldsets import FieldsetViewMixin
+from .cache import CachedJobOpeningMixin, invalidate_job_openings, get_stats as get_job_cache_stats
+from .facets import FacetedListMixin
+from .export import APPLICATION_EXPORT_FIELDS, CSVExportRenderer, NDJSONExportRenderer, stream_export
+from . import events, expiry, forum, moderation, uploads
+from .recommendations import is_available as recommendations_available, recommend_jobs
+from .db_router import get_stats as get_database_stats
+from .storage import serve_file
+from .stats import (
+    deferred_summary_refresh, employer_stats, is_summary_enabled, refresh_application_summary, touched_job_ids,
+)
 from decimal import Decimal, InvalidOperation
-class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
-    def validate(self, attrs):
-        attrs['username'] = attrs.get('email', attrs.get('username', ''))
-        return super().validate(attrs)
-    
+from django.db import transaction
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.handlers.asgi import ASGIRequest
+
+# Maximum number of SQL queries per viewset action, counting authentication.
+# Checked by api.middleware.QueryMetricsMiddleware and the query budget tests;
+# viewsets with heavier actions (e.g. cascading deletes) extend this.
+DEFAULT_QUERY_BUDGET = {
+    'list': 4,            # auth, ETag validators, optional ?count=true, page
+    'retrieve': 3,        # auth, ETag validator, row
+    'create': 5,          # auth, FK/unique validation, insert
+    'update': 5,
+    'partial_update': 5,
+    'destroy': 4,         # auth, row, delete
+}
+
 class LoginView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
     permission_classes = [AllowAny]
+    query_budget = {'post': 2}  # user, profile
 
     def post(self, request, *args, **kwargs):
         request.data['username'] = request.data.get('email', '')
@@ -45,8 +71,10 @@ class LoginView(TokenObtainPairView):
         
         
         try:
+            # Loaded once while building the token claims
+            profile = get_profile(user)
             if user.user_type == 'student':
-                student = Student.objects.filter(Email=user.email).first()
+                student = profile
                 if student:
                     user_data.update({
                         'ucid': student.UCID,
@@ -55,7 +83,7 @@ class LoginView(TokenObtainPairView):
                     })
                     
             elif user.user_type == 'employer':
-                employer = Employer.objects.filter(Email=user.email).first()
+                employer = profile
                 if employer:
                     user_data.update({
                         'company_name': employer.CompanyName,
@@ -77,6 +105,7 @@ class LoginView(TokenObtainPairView):
 class RegistrationAPIView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
     permission_classes = [AllowAny]
+    query_budget = {'post': 6}  # unique email check, user, profile, verification queue
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -92,49 +121,268 @@ class RegistrationAPIView(generics.CreateAPIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
 
-class StudentViewSet(viewsets.ModelViewSet):
+class BulkWriteMixin:
+    """
+    Adds /<endpoint>/bulk/ for writing many rows in one request:
+
+        POST    [{...}, ...]              create rows (bulk_create)
+        PATCH   [{"<pk>": 1, ...}, ...]   partially update rows (bulk_update)
+        DELETE  {"ids": [1, 2, ...]}      delete rows
+
+    Every row is validated first. If any row is invalid nothing is written
+    and the response lists the errors by row index. With ?dry_run=true the
+    request is only validated.
+
+    Employers write only their own rows (by `bulk_employer_field`): other
+    rows are not found, and rows can't be created for or moved to another
+    employer. Moderators and staff write any rows; nobody else writes in bulk.
+    """
+    bulk_max_items = 1000
+    bulk_employer_field = None
+
+    def get_bulk_employer_id(self):
+        # None when the user may write any rows
+        user = self.request.user
+        if user.is_staff or IsModerator().has_permission(self.request, self):
+            return None
+        employer_id = get_employer_id(user)
+        if employer_id is None:
+            raise PermissionDenied('Only employers, moderators and staff can write in bulk.')
+        return employer_id
+
+    def get_bulk_queryset(self, employer_id):
+        queryset = self.get_queryset()
+        if employer_id is not None:
+            queryset = queryset.filter(**{self.bulk_employer_field: employer_id})
+        return queryset
+
+    def check_bulk_employer(self, serializer, employer_id):
+        # Row errors for rows that would belong to another employer, or None
+        if employer_id is None:
+            return None
+        field = self.bulk_employer_field
+        errors = [
+            {field: ['Must be your own employer.']} if field in row and row[field].pk != employer_id else {}
+            for row in serializer.validated_data
+        ]
+        return errors if any(errors) else None
+
+    def is_dry_run(self):
+        return self.request.query_params.get('dry_run', '').lower() in ('true', '1', 'yes')
+
+    def bulk_error_response(self, errors):
+        if isinstance(errors, dict):
+            # The payload as a whole is invalid, e.g. not a list or too long
+            return Response({'status': 'error', 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'status': 'error',
+            'errors': [{'index': index, 'errors': error} for index, error in enumerate(errors) if error],
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    def get_bulk_serializer(self, data, instance=None):
+        serializer = self.get_serializer(
+            instance, data=data, many=True, partial=instance is not None, max_length=self.bulk_max_items,
+        )
+        if not serializer.is_valid():
+            return serializer, serializer.errors
+        return serializer, None
+
+    def perform_bulk_create(self, serializer):
+        serializer.save()
+
+    def perform_bulk_update(self, serializer):
+        serializer.save()
+
+    def perform_bulk_destroy(self, queryset):
+        return queryset.delete()[1].get(queryset.model._meta.label, 0)
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request):
+        if request.method == 'DELETE':
+            return self.bulk_destroy(request)
+        if request.method == 'PATCH':
+            return self.bulk_update(request)
+        return self.bulk_create(request)
+
+    def bulk_create(self, request):
+        employer_id = self.get_bulk_employer_id()
+        serializer, errors = self.get_bulk_serializer(request.data)
+        errors = errors or self.check_bulk_employer(serializer, employer_id)
+        if errors:
+            return self.bulk_error_response(errors)
+        if self.is_dry_run():
+            return Response({'status': 'success', 'dry_run': True, 'count': len(serializer.validated_data)})
+
+        with transaction.atomic():
+            self.perform_bulk_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, request):
+        employer_id = self.get_bulk_employer_id()
+        queryset = self.get_bulk_queryset(employer_id)
+        pk_name = queryset.model._meta.pk.name
+        ids = [row.get(pk_name) for row in request.data if isinstance(row, dict)] if isinstance(request.data, list) else []
+        try:
+            instances = queryset.in_bulk([pk for pk in ids if pk is not None])
+        except (TypeError, ValueError):
+            instances = {}
+
+        serializer, errors = self.get_bulk_serializer(request.data, instance=instances)
+        errors = errors or self.check_bulk_employer(serializer, employer_id)
+        if errors:
+            return self.bulk_error_response(errors)
+        if self.is_dry_run():
+            return Response({'status': 'success', 'dry_run': True, 'count': len(serializer.validated_data)})
+
+        with transaction.atomic():
+            self.perform_bulk_update(serializer)
+        return Response(serializer.data)
+
+    def bulk_destroy(self, request):
+        employer_id = self.get_bulk_employer_id()
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or len(ids) > self.bulk_max_items:
+            return Response({
+                'status': 'error',
+                'message': f'Expected "ids": a list of at most {self.bulk_max_items} ids',
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        pk_field = self.get_queryset().model._meta.pk
+        try:
+            ids = [pk_field.to_python(pk) for pk in ids]
+        except DjangoValidationError:
+            return Response({'status': 'error', 'message': 'Invalid ids'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_bulk_queryset(employer_id).filter(pk__in=ids)
+        found = set(queryset.values_list('pk', flat=True))
+        not_found = [pk for pk in ids if pk not in found]
+
+        if self.is_dry_run():
+            return Response({'status': 'success', 'dry_run': True, 'count': len(found), 'not_found': not_found})
+
+        with transaction.atomic():
+            deleted = self.perform_bulk_destroy(queryset)
+        return Response({'status': 'success', 'count': deleted, 'not_found': not_found})
+
+
+class StudentViewSet(FieldsetViewMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    filter_backends = [DjangoFilterBackend, StudentResumeFilter]
+    # destroy cascades through the student's applicant, moderator, post and application rows;
+    # recommendations: auth, student, bio, resumes, job table state, changed jobs (only after job writes),
+    # matched jobs
+    query_budget = {**DEFAULT_QUERY_BUDGET, 'destroy': 15, 'recommendations': 7, 'post_stats': 3}
 
+    @action(detail=True, methods=['get'], url_path='post-stats')
+    def post_stats(self, request, pk=None):
+        # Forum activity of the student: posts, upvotes received and cast,
+        # latest posts (see api/forum.py)
+        try:
+            stats = forum.author_stats(int(pk))
+        except ValueError:
+            stats = None
+        if stats is None:
+            return Response({'status': 'error', 'message': 'Student not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(stats)
 
-class PostViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
+    def recommendations(self, request, pk=None):
+        # Best matching open job openings, ?k= of them (see api/recommendations.py)
+        if not recommendations_available():
+            return Response({
+                'status': 'error',
+                'message': 'Job recommendations need numpy and scipy installed',
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        try:
+            k = min(max(int(request.query_params.get('k', 10)), 1), 50)
+        except ValueError:
+            k = 10
+
+        matches, took_ms = recommend_jobs(self.get_object(), k)
+        return Response({
+            'took_ms': round(took_ms, 2),
+            'results': [
+                {'score': round(score, 4), 'job': JobOpeningSerializer(job).data}
+                for job, score in matches
+            ],
+        })
+
+
+class PostViewSet(FieldsetViewMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    filter_backends = [DjangoFilterBackend, PostFeedFilter]
+    filterset_class = PostFilter
+    # destroy also deletes the post's votes; upvote: auth, post, savepoints, vote, counter, count
+    query_budget = {**DEFAULT_QUERY_BUDGET, 'destroy': 5, 'upvote': 9}
+
+    @action(detail=True, methods=['post', 'delete'], permission_classes=[IsAuthenticated])
+    def upvote(self, request, pk=None):
+        # POST upvotes the post as the logged in student, DELETE takes the
+        # vote back; both can be repeated safely (see api/forum.py)
+        post = self.get_object()
+        voter_id = forum.get_student_id(request.user)
+        if voter_id is None:
+            return Response({
+                'status': 'error',
+                'message': 'Only students can vote on posts',
+            }, status=status.HTTP_403_FORBIDDEN)
+        voted = request.method == 'POST'
+        upvotes = forum.set_vote(post.pk, voter_id, voted)
+        return Response({'status': 'success', 'PostID': post.pk, 'Upvotes': upvotes, 'voted': voted})
 
 
-class VolunteerViewSet(viewsets.ModelViewSet):
+class VolunteerViewSet(FieldsetViewMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Volunteer.objects.all()
     serializer_class = VolunteerSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    query_budget = DEFAULT_QUERY_BUDGET
 
 
-class ApplicantViewSet(viewsets.ModelViewSet):
+class ApplicantViewSet(FieldsetViewMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Applicant.objects.all()
     serializer_class = ApplicantSerializer
     permission_classes = [AllowAny]
+    query_budget = DEFAULT_QUERY_BUDGET
 
 
-class ModeratorViewSet(viewsets.ModelViewSet):
+class ModeratorViewSet(FieldsetViewMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Moderator.objects.all()
     serializer_class = ModeratorSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    query_budget = {**DEFAULT_QUERY_BUDGET, 'destroy': 7}  # cascades to verifications, reviews
 
 
-class EmployerViewSet(viewsets.ModelViewSet):
+class EmployerViewSet(FieldsetViewMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Employer.objects.all()
     serializer_class = EmployerSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    # destroy cascades through job openings, applications, verifications and reviews
+    query_budget = {**DEFAULT_QUERY_BUDGET, 'destroy': 12, 'stats': 4}
+
+    @action(detail=True, methods=['get'], permission_classes=[IsEmployerSelfOrModerator])
+    def stats(self, request, pk=None):
+        # Dashboard aggregates computed in SQL (see api/stats.py)
+        return Response(employer_stats(self.get_object()))
 
 
-class JobOpeningViewSet(viewsets.ModelViewSet):
+class JobOpeningViewSet(
+    FieldsetViewMixin, ConditionalGetMixin, CachedJobOpeningMixin, FacetedListMixin, BulkWriteMixin,
+    viewsets.ModelViewSet,
+):
     queryset = JobOpening.objects.all()
     serializer_class = JobOpeningSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    # list may count ?facets=true; destroy cascades to applications, their summary and reviews;
+    # bulk is auth, FK preload, rows, write
+    query_budget = {**DEFAULT_QUERY_BUDGET, 'list': 5, 'destroy': 6, 'cache_stats': 1, 'expiry_stats': 2, 'bulk': 8}
+    filter_backends = [DjangoFilterBackend, JobOpeningSearchFilter]
     filterset_class = JobOpeningFilter
-    search_fields = ['JobTitle', 'Description']
+    search_fields = ['JobTitle', 'Description', 'Location']
+    bulk_employer_field = 'Employer'
     def get_queryset(self):
         queryset = super().get_queryset()
         min_salary = self.request.query_params.get('minSalary')
@@ -147,25 +395,286 @@ class JobOpeningViewSet(viewsets.ModelViewSet):
 
         return queryset
 
-class JobApplicationViewSet(viewsets.ModelViewSet):
+    def get_list_validators(self, queryset):
+        compute = super().get_list_validators
+        return self.cached_list_validators(lambda: compute(queryset))
+
+    def perform_bulk_create(self, serializer):
+        super().perform_bulk_create(serializer)
+        # bulk_create skips the post_save signal that keeps the cache fresh
+        invalidate_job_openings(obj.pk for obj in serializer.instance)
+
+    def perform_bulk_update(self, serializer):
+        super().perform_bulk_update(serializer)
+        invalidate_job_openings(obj.pk for obj in serializer.instance)
+
+    @action(detail=False, methods=['get'], url_path='cache-stats', permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        # Hit/miss counters for the job listing cache (see api/cache.py)
+        return Response(get_job_cache_stats())
+
+    @action(detail=False, methods=['get'], url_path='expiry-stats', permission_classes=[IsAdminUser])
+    def expiry_stats(self, request):
+        # Runs of the expired job closer and what it has left (see api/expiry.py)
+        return Response(expiry.get_stats())
+
+class JobApplicationViewSet(FieldsetViewMixin, ConditionalGetMixin, BulkWriteMixin, viewsets.ModelViewSet):
     queryset = JobApplication.objects.all()
     serializer_class = JobApplicationSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    # bulk: auth, FK preload, rows, write; export: auth, the employer (the rows are read while streaming)
+    query_budget = {**DEFAULT_QUERY_BUDGET, 'bulk': 8, 'export': 2}
+    filterset_fields = ['ApplicantUCID', 'JobID', 'EmployerID', 'Status']
+    bulk_employer_field = 'EmployerID'
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated],
+            renderer_classes=[CSVExportRenderer, NDJSONExportRenderer])
+    def export(self, request):
+        # The signed-in employer's applications as ?format=csv (default) or
+        # ?format=ndjson, with the list filters (e.g. ?JobID=3); streamed,
+        # see api/export.py
+        employer_id = get_employer_id(request.user)
+        if employer_id is None:
+            raise PermissionDenied('Only employers can export their applications.')
+        queryset = self.filter_queryset(self.get_queryset()).filter(EmployerID=employer_id).order_by('ApplicationID')
+        return stream_export(
+            queryset, APPLICATION_EXPORT_FIELDS, request.accepted_renderer.format, 'job-applications',
+            asynchronous=isinstance(request._request, ASGIRequest),
+        )
+
+    # bulk_create/bulk_update send no signals, so refresh the dashboard
+    # summary of the jobs they touched and publish their status events
+    def perform_bulk_create(self, serializer):
+        super().perform_bulk_create(serializer)
+        if is_summary_enabled():
+            refresh_application_summary(touched_job_ids(serializer.instance))
+        if events.is_enabled():
+            events.publish_saved(serializer.instance, created=True)
+
+    def perform_bulk_update(self, serializer):
+        super().perform_bulk_update(serializer)
+        if is_summary_enabled():
+            refresh_application_summary(touched_job_ids(serializer.instance))
+        if events.is_enabled():
+            events.publish_saved(serializer.instance)
+
+    def perform_bulk_destroy(self, queryset):
+        with deferred_summary_refresh():
+            return super().perform_bulk_destroy(queryset)
+
+
+class LeaseHeld(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'This verification is claimed by another moderator.'
+    default_code = 'lease_held'
+
+
+class VerificationQueueMixin:
+    """
+    Adds GET <endpoint>/queue/?status=Pending: the verification rows with the
+    given status (filtered in SQL) and the profile they refer to embedded, in
+    one paginated response. Pass an empty ?status= to get every status.
+
+    Moderators claim work with POST <endpoint>/claim/ {"limit": n}, which
+    leases up to n pending rows to them, and hand back what they didn't
+    finish with POST <endpoint>/release/ (see api/moderation.py). A row
+    leased to one moderator can't be updated by another.
+    """
+    queue_serializer_class = None
+    queue_related_field = None
+    claim_max_items = 50
+
+    @action(detail=False, methods=['get'])
+    def queue(self, request):
+        queryset = self.get_queryset().select_related(self.queue_related_field)
+
+        verification_status = request.query_params.get('status', 'Pending')
+        if verification_status:
+            queryset = queryset.filter(VerificationStatus=verification_status)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.queue_serializer_class(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.queue_serializer_class(queryset, many=True)
+        return Response(serializer.data)
+
+    def get_moderator_id(self):
+        moderator_id = moderation.get_moderator_id(self.request.user)
+        if moderator_id is None:
+            raise PermissionDenied('Only moderators can claim verifications.')
+        return moderator_id
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def claim(self, request):
+        try:
+            limit = int(request.data.get('limit', 10))
+        except (TypeError, ValueError):
+            limit = 0
+        if not 1 <= limit <= self.claim_max_items:
+            return Response({
+                'status': 'error',
+                'message': f'limit must be between 1 and {self.claim_max_items}',
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        pks = moderation.claim(self.get_queryset(), self.get_moderator_id(), limit)
+        claimed = self.get_queryset().select_related(self.queue_related_field).filter(pk__in=pks).order_by('pk')
+        return Response({
+            'status': 'success',
+            'count': len(pks),
+            'results': self.queue_serializer_class(claimed, many=True).data,
+        })
 
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def release(self, request):
+        released = moderation.release(self.get_queryset(), self.get_moderator_id())
+        return Response({'status': 'success', 'count': released})
 
-class VerifyApplicantViewSet(viewsets.ModelViewSet):
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        if moderation.is_leased(instance) and instance.ModeratorID_id != moderation.get_moderator_id(self.request.user):
+            raise LeaseHeld()
+        # A decided row no longer needs its lease
+        if serializer.validated_data.get('VerificationStatus', instance.VerificationStatus) != moderation.PENDING:
+            serializer.save(LeaseExpiresAt=None)
+        else:
+            serializer.save()
+
+
+class VerifyApplicantViewSet(FieldsetViewMixin, VerificationQueueMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = VerifyApplicant.objects.all()
     serializer_class = VerifyApplicantSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    # claim: moderator lookup (old tokens only), lock, lease, fetch, savepoint pair in tests
+    query_budget = {**DEFAULT_QUERY_BUDGET, 'queue': 3, 'claim': 6, 'release': 3}
+    queue_serializer_class = VerifyApplicantQueueSerializer
+    queue_related_field = 'ApplicantUCID'
 
 
-class VerifyEmployerViewSet(viewsets.ModelViewSet):
+class VerifyEmployerViewSet(FieldsetViewMixin, VerificationQueueMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = VerifyEmployer.objects.all()
     serializer_class = VerifyEmployerSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    query_budget = {**DEFAULT_QUERY_BUDGET, 'queue': 3, 'claim': 6, 'release': 3}
+    queue_serializer_class = VerifyEmployerQueueSerializer
+    queue_related_field = 'EmployerID'
 
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+class ReviewsViewSet(FieldsetViewMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Reviews.objects.all()
     serializer_class = ReviewsSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    query_budget = DEFAULT_QUERY_BUDGET
+
+
+class ResumeUploadViewSet(viewsets.ViewSet):
+    """
+    Chunked, resumable resume uploads (see api/uploads.py):
+
+        POST    /resume-uploads/        {"file_name", "size", "target", "sha256"}
+        PATCH   /resume-uploads/<id>/   the next chunk as the raw body, with an Upload-Offset header
+        GET     /resume-uploads/<id>/   how many bytes are in, to resume from
+        DELETE  /resume-uploads/<id>/   give up
+
+    "target" is "account" (the default) or "applicant"; "sha256" is optional.
+    """
+    permission_classes = [IsAuthenticated]
+    # partial_update: the last chunk also attaches the file and queues its
+    # extraction (an update_or_create, with its savepoints in tests)
+    query_budget = {'create': 5, 'retrieve': 2, 'partial_update': 13, 'destroy': 3}
+
+    def upload_response(self, upload, file=None, status_code=status.HTTP_200_OK):
+        response = Response({
+            'upload_id': upload.pk,
+            'size': upload.Size,
+            'offset': upload.Offset,
+            'complete': file is not None,
+            'file': file,
+        }, status=status_code)
+        response['Upload-Offset'] = upload.Offset
+        return response
+
+    def create(self, request):
+        try:
+            size = int(request.data.get('size'))
+        except (TypeError, ValueError):
+            return Response({'status': 'error', 'message': 'size must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        upload = uploads.start_upload(
+            request.user.id,
+            request.data.get('target', ResumeText.SOURCE_ACCOUNT),
+            str(request.data.get('file_name', '')),
+            size,
+            str(request.data.get('sha256', '')),
+        )
+        response = self.upload_response(upload, status_code=status.HTTP_201_CREATED)
+        response['Location'] = request.build_absolute_uri(f'{upload.pk}/')
+        return response
+
+    def retrieve(self, request, pk=None):
+        return self.upload_response(uploads.get_upload(pk, request.user.id))
+
+    def partial_update(self, request, pk=None):
+        upload = uploads.get_upload(pk, request.user.id)
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (KeyError, ValueError):
+            return Response({
+                'status': 'error',
+                'message': 'Send the chunk with Upload-Offset and Content-Length headers',
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            file = uploads.write_chunk(upload, offset, length, request.stream)
+        except uploads.OffsetMismatch as e:
+            # Tell the client where to resume from
+            upload.refresh_from_db(fields=['Offset'])
+            response = Response({'status': 'error', 'message': str(e.detail), 'offset': upload.Offset},
+                                status=e.status_code)
+            response['Upload-Offset'] = upload.Offset
+            return response
+        return self.upload_response(upload, file)
+
+    def destroy(self, request, pk=None):
+        uploads.discard(uploads.get_upload(pk, request.user.id))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ResumeFileView(APIView):
+    """
+    Download of a stored resume (MEDIA_URL + name), for its owner, moderators
+    and employers the student has applied to. The bytes are sent by the web
+    server when it is set up for it (see api/storage.py).
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = {'get': 3}  # auth, owners, the employer's applications
+
+    def get(self, request, name):
+        owners = list(
+            CustomUser.objects.filter(pdf_file=name).values_list('email', flat=True)
+            .union(Applicant.objects.filter(Resume=name).values_list('SUCID__Email', flat=True))
+        )
+        if not owners:
+            return Response({'status': 'error', 'message': 'File not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        user = request.user
+        allowed = user.is_staff or user.email in owners or IsModerator().has_permission(request, self)
+        if not allowed and user.user_type == 'employer':
+            allowed = JobApplication.objects.filter(
+                EmployerID=get_employer_id(user), ApplicantUCID__Email__in=owners,
+            ).exists()
+        if not allowed:
+            raise PermissionDenied('You may not view this resume.')
+        return serve_file(request, name)
+
+
+class DatabaseStatsView(APIView):
+    """
+    Replica routing and connection counters of the serving process (see
+    api/db_router.py).
+    """
+    permission_classes = [IsAdminUser]
+    query_budget = {'get': 1}
+
+    def get(self, request):
+        return Response(get_database_stats())
@@ -12,6 +12,20 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nextstep.settings')
+# Read-only job and post endpoints get native async handlers under ASGI
+os.environ.setdefault('ASYNC_READ_VIEWS', '1')
+# Application and verification status events at /api/events/
+os.environ.setdefault('EVENT_STREAM', '1')
 
 
 application = get_asgi_application()
+
+# Closes expired job openings when JOB_EXPIRY_INTERVAL is set
+from api.expiry import start_scheduler  # noqa: E402 -- needs the app registry
+
+start_scheduler()
+
+# Builds the job recommendation index in the background when RECOMMENDATIONS_WARM is on
+from api.recommendations import warm_index  # noqa: E402 -- needs the app registry
+
+warm_index()
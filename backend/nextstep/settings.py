@@ -35,6 +35,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware should come early
+    'api.compression.CompressionMiddleware',  # gzip/brotli, see api/compression.py
+    'api.middleware.QueryMetricsMiddleware',  # Per-request query count/DB time, see api/middleware.py
+    'api.db_router.ReplicaRoutingMiddleware',  # GET/HEAD reads from the replicas, see api/db_router.py
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,8 +83,43 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),  
         'PORT': os.getenv('DB_PORT'),
+        # Keep each worker's connection open between requests, checking it
+        # is still usable before reusing it
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
+# A shared connection pool per process instead (needs psycopg 3 with
+# psycopg[pool] in place of psycopg2; Django then requires CONN_MAX_AGE = 0)
+if os.getenv('DB_POOL_MAX_SIZE'):
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {'pool': {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE')),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        }},
+    })
+
+# Read replicas of the default database, as comma separated host[:port];
+# GET/HEAD requests read from them (see api/db_router.py). To try it locally,
+# point one at the primary itself, e.g. DB_REPLICA_HOSTS=localhost.
+REPLICA_DATABASES = []
+for number, replica_host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), 1):
+    replica_host, _, replica_port = replica_host.strip().partition(':')
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'HOST': replica_host,
+        'PORT': replica_port or DATABASES['default']['PORT'],
+        # Tests read the test database through the replica aliases
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(f'replica{number}')
+DATABASE_ROUTERS = ['api.db_router.ReplicaRouter']
+# Seconds a client reads from the primary after a write (longer than the
+# replication lag), and seconds a failing replica is left alone
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
+REPLICA_RETRY_SECONDS = int(os.getenv('REPLICA_RETRY_SECONDS', 30))
 
 # Password validation (default settings)
 AUTH_PASSWORD_VALIDATORS = [
@@ -124,12 +162,131 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly'
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWT with profile claims; no user query per request
+        'api.authentication.ClaimsJWTAuthentication',
+    ],
+    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    # Keyset pagination on every list endpoint; see api/pagination.py for the
+    # ?page_size=, ?count=true and legacy ?paginate=false switches
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': 50,
+    # orjson when installed, same output as DRF's JSON (see api/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
-    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend']
+}
+
+# Response compression (api/compression.py): text responses of at least this
+# many bytes are sent brotli or gzip compressed, as the client prefers; 0
+# turns compression off. Brotli quality runs 0-11, higher is smaller but slower.
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+
+# Cache backend: local memory by default, Redis when REDIS_URL is set
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+if os.getenv('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL'),
+    }
+
+# Serve public job/post reads with native async views (api/async_views.py).
+# nextstep/asgi.py enables this; under WSGI the regular DRF views are used.
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', '') == '1'
+
+# Serve the employer dashboard stats from the job_application_summary table,
+# kept up to date on every JobApplication write. Run
+# `manage.py rebuild_application_summary` after turning it on.
+EMPLOYER_STATS_SUMMARY = os.getenv('EMPLOYER_STATS_SUMMARY', '') == '1'
+
+# How long a moderator's claim on a verification lasts (api/moderation.py)
+VERIFICATION_LEASE_SECONDS = int(os.getenv('VERIFICATION_LEASE_SECONDS', 900))
+
+# Resume text extraction worker (api/resumes.py, `manage.py process_resumes`):
+# how long a worker may hold a resume, how often a failing one is retried and
+# how much of each resume is read
+RESUME_LEASE_SECONDS = int(os.getenv('RESUME_LEASE_SECONDS', 300))
+RESUME_MAX_ATTEMPTS = int(os.getenv('RESUME_MAX_ATTEMPTS', 3))
+RESUME_MAX_PAGES = int(os.getenv('RESUME_MAX_PAGES', 20))
+RESUME_TEXT_MAX_CHARS = int(os.getenv('RESUME_TEXT_MAX_CHARS', 100_000))
+
+# Resume downloads (api/storage.py): hand the file to the web server instead
+# of streaming it from Django. MEDIA_ACCEL_REDIRECT is the nginx `internal`
+# location aliased to MEDIA_ROOT (e.g. /protected-media/); MEDIA_SENDFILE_HEADER
+# is the header for Apache mod_xsendfile or lighttpd (e.g. X-Sendfile).
+MEDIA_ACCEL_REDIRECT = os.getenv('MEDIA_ACCEL_REDIRECT', '')
+MEDIA_SENDFILE_HEADER = os.getenv('MEDIA_SENDFILE_HEADER', '')
+
+# Chunked resume uploads (api/uploads.py): largest file and chunk in bytes,
+# and how long an unfinished upload is kept
+RESUME_UPLOAD_MAX_SIZE = int(os.getenv('RESUME_UPLOAD_MAX_SIZE', 10 * 1024 * 1024))
+RESUME_UPLOAD_MAX_CHUNK = int(os.getenv('RESUME_UPLOAD_MAX_CHUNK', 2 * 1024 * 1024))
+RESUME_UPLOAD_EXPIRY_HOURS = int(os.getenv('RESUME_UPLOAD_EXPIRY_HOURS', 24))
+
+# Job listing read-through cache (api/cache.py). Entries are invalidated on
+# JobOpening save/delete; the timeout (seconds) only bounds staleness for
+# writes that skip model signals. Set to 0 to disable the cache.
+JOB_CACHE_ALIAS = 'default'
+JOB_CACHE_TIMEOUT = int(os.getenv('JOB_CACHE_TIMEOUT', 300))
+
+# Closing job openings past their Deadline (api/expiry.py): seconds between
+# runs of the scheduler thread in each web process (0 = no thread; run
+# `manage.py expire_job_openings` from cron instead), and rows per UPDATE
+JOB_EXPIRY_INTERVAL = int(os.getenv('JOB_EXPIRY_INTERVAL', 0))
+JOB_EXPIRY_BATCH_SIZE = int(os.getenv('JOB_EXPIRY_BATCH_SIZE', 1000))
+
+# Build the job recommendation index (api/recommendations.py) when a web
+# process starts rather than in its first recommendation request. Off by
+# default: wsgi.py is also imported by runserver (and its autoreloader) and
+# before migrate has run
+RECOMMENDATIONS_WARM = os.getenv('RECOMMENDATIONS_WARM', '') == '1'
+
+# Status events over Server-Sent Events at /api/events/ (api/events.py).
+# nextstep/asgi.py turns the stream on; a WSGI worker would be held by each
+# open stream. Events kept for replay on reconnect, seconds between
+# keep-alive comments on an idle stream, and seconds a stream ticket is good for
+EVENT_STREAM = os.getenv('EVENT_STREAM', '') == '1'
+EVENT_BUFFER_SIZE = int(os.getenv('EVENT_BUFFER_SIZE', 1000))
+EVENT_STREAM_HEARTBEAT = int(os.getenv('EVENT_STREAM_HEARTBEAT', 15))
+EVENT_TICKET_MAX_AGE = int(os.getenv('EVENT_TICKET_MAX_AGE', 30))
+
+# Per-request query metrics from api.middleware.QueryMetricsMiddleware.
+# Requests over their view's query budget are logged as warnings. The api
+# tests quiet it themselves: their budget checks are assertions
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.queries': {
+            'handlers': ['console'],
+            'level': os.getenv('API_QUERY_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
 }
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
+    'TOKEN_OBTAIN_SERIALIZER': 'api.serializers.CustomTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'api.serializers.ProfileTokenRefreshSerializer',
 }
+
+# How long token-authenticated requests trust a cached "account is active"
+# (see api/authentication.py)
+AUTH_CLAIMS_CACHE_TIMEOUT = int(os.getenv('AUTH_CLAIMS_CACHE_TIMEOUT', 60))
@@ -5,7 +5,7 @@ from rest_framework.routers import DefaultRouter
 
 # from .views import account_view  
 from django.conf import settings
-from django.conf.urls.static import static
+from api.views import ResumeFileView
 
 
 
@@ -22,4 +22,8 @@ urlpatterns = [
     path('api/', include('api.urls')),    
 ] 
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT) # Serve media files in development
\ No newline at end of file
+# Resumes, with permission checks; the bytes are sent by the web server when
+# MEDIA_ACCEL_REDIRECT or MEDIA_SENDFILE_HEADER is set (see api/storage.py)
+urlpatterns += [
+    path(f'{settings.MEDIA_URL.strip("/")}/<path:name>', ResumeFileView.as_view(), name='media'),
+]
@@ -1,10 +1,12 @@
 # Import decorators and response tools
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
 
 # GET and PUT account endpoint for authenticated users
 @api_view(['GET', 'PUT'])
+@authentication_classes([JWTAuthentication])  # needs the CustomUser row, not just token claims
 @permission_classes([IsAuthenticated])
 def account_view(request):
     user = request.user
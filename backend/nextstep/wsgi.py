@@ -15,3 +15,13 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nextstep.settings')
 
 
 application = get_wsgi_application()
+
+# Closes expired job openings when JOB_EXPIRY_INTERVAL is set
+from api.expiry import start_scheduler  # noqa: E402 -- needs the app registry
+
+start_scheduler()
+
+# Builds the job recommendation index in the background when RECOMMENDATIONS_WARM is on
+from api.recommendations import warm_index  # noqa: E402 -- needs the app registry
+
+warm_index()
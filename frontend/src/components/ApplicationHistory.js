@@ -2,11 +2,14 @@ import React, { useState, useEffect } from 'react';
 import { Container, Row, Col, Card, Button, Badge, ListGroup, Alert, Spinner, Tabs, Tab } from 'react-bootstrap';
 import { Link, useNavigate, useSearchParams } from 'react-router-dom';
 import api from '../services/api';
+import { useStatusEvents, APPLICATION_STATUS, RESET } from '../services/events';
 
 function ApplicationHistory() {
   const [applications, setApplications] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  // Bumped to re-fetch the applications when their status changes
+  const [applicationsVersion, setApplicationsVersion] = useState(0);
   
   const navigate = useNavigate();
   const ucid = localStorage.getItem('ucid');
@@ -24,6 +27,10 @@ function ApplicationHistory() {
     }
   }, [ucid, userRole, navigate]);
   
+  useStatusEvents(type => {
+    if (type === APPLICATION_STATUS || type === RESET) setApplicationsVersion(version => version + 1);
+  }, Boolean(ucid));
+  
   // Fetch applications
   useEffect(() => {
     const fetchApplications = async () => {
@@ -147,7 +154,7 @@ function ApplicationHistory() {
     if (ucid) {
       fetchApplications();
     }
-  }, [ucid]);
+  }, [ucid, applicationsVersion]);
   
   // Format date display
   const formatDate = (dateString) => {
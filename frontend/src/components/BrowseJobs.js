@@ -12,6 +12,7 @@ function BrowseJobs() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [activeFilters, setActiveFilters] = useState({});
+  const [facets, setFacets] = useState(null);
   
   // Get search params from URL
   const [searchParams, setSearchParams] = useSearchParams();
@@ -41,10 +42,12 @@ function BrowseJobs() {
         // Set active filters from URL params
         setActiveFilters(urlFilters);
         
-        const response = await api.getJobs(urlFilters);
+        const response = await api.getJobs({ ...urlFilters, facets: true });
+        const { results, facets } = response.data;
+        setFacets(facets);
         
         // Map backend job data to frontend expected format if needed
-        const formattedJobs = response.data.map(job => {
+        const formattedJobs = results.map(job => {
           // Check if this is backend data structure (has JobID instead of jobId)
           if (job.JobID) {
             // Get employer data (name) if available
@@ -121,7 +124,7 @@ function BrowseJobs() {
       <h2 className="mb-4">Browse Jobs</h2>
       
       {/* Job Search Filters */}
-      <JobSearchFilters onApplyFilters={handleApplyFilters} initialFilters={activeFilters} />
+      <JobSearchFilters onApplyFilters={handleApplyFilters} initialFilters={activeFilters} facets={facets} />
 
       {/* Display error message if something went wrong */}
       {error && <Alert variant="danger">{error}</Alert>}
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { Container, Row, Col, Card, Button, Badge, ListGroup, Alert, Spinner, Form, Modal, Accordion } from 'react-bootstrap';
 import { Link, useNavigate } from 'react-router-dom';
 import api from '../services/api';
+import { useStatusEvents, APPLICATION_STATUS, RESET } from '../services/events';
 
 function CompanyApplications() {
   const [applications, setApplications] = useState([]);
@@ -14,6 +15,8 @@ function CompanyApplications() {
   const [newStatus, setNewStatus] = useState('');
   const [updatingStatus, setUpdatingStatus] = useState(false);
   const [expandedJobId, setExpandedJobId] = useState(null);
+  // Bumped to re-fetch the applications when one is created or changes status
+  const [applicationsVersion, setApplicationsVersion] = useState(0);
   
   const navigate = useNavigate();
   const employerId = localStorage.getItem('employerId');
@@ -26,6 +29,10 @@ function CompanyApplications() {
     }
   }, [employerId, userRole, navigate]);
   
+  useStatusEvents(type => {
+    if (type === APPLICATION_STATUS || type === RESET) setApplicationsVersion(version => version + 1);
+  }, Boolean(employerId));
+  
   // Fetch applications
   useEffect(() => {
     const fetchData = async () => {
@@ -136,7 +143,7 @@ function CompanyApplications() {
     if (employerId) {
       fetchData();
     }
-  }, [employerId]);
+  }, [employerId, applicationsVersion]);
   
   // Get status badge variant
   const getStatusBadgeVariant = (status) => {
@@ -2,15 +2,19 @@ import React, { useState, useEffect } from 'react';
 import { Container, Row, Col, Card, Button, Badge, ListGroup, Alert, Spinner } from 'react-bootstrap';
 import { Link, useNavigate } from 'react-router-dom';
 import api from '../services/api';
+import { useStatusEvents, APPLICATION_STATUS, EMPLOYER_VERIFICATION, RESET } from '../services/events';
 
 function EmployerDashboard() {
   const [employer, setEmployer] = useState(null);
   const [jobs, setJobs] = useState([]);
-  const [applications, setApplications] = useState([]);
+  const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [verificationStatus, setVerificationStatus] = useState('');
   const [verificationFeedback, setVerificationFeedback] = useState('');
+  // Bumped to re-fetch the verification status and the dashboard when they change
+  const [verificationVersion, setVerificationVersion] = useState(0);
+  const [applicationsVersion, setApplicationsVersion] = useState(0);
 
   const navigate = useNavigate();
   const employerId = parseInt(localStorage.getItem('employerId'));
@@ -23,6 +27,11 @@ function EmployerDashboard() {
     }
   }, [employerId, userRole, navigate]);
 
+  useStatusEvents(type => {
+    if (type === EMPLOYER_VERIFICATION || type === RESET) setVerificationVersion(version => version + 1);
+    if (type === APPLICATION_STATUS || type === RESET) setApplicationsVersion(version => version + 1);
+  }, Boolean(employerId));
+
   // Check verification status
   useEffect(() => {
     const checkVerification = async () => {
@@ -38,7 +47,7 @@ function EmployerDashboard() {
     if (employerId) {
       checkVerification();
     }
-  }, [employerId]);
+  }, [employerId, verificationVersion]);
 
   useEffect(() => {
     const fetchDashboardData = async () => {
@@ -66,7 +75,7 @@ function EmployerDashboard() {
         setEmployer(employerData);
 
         // Fetch employer's job postings
-        const jobsResponse = await api.getJobs({ employerId });
+        const jobsResponse = await api.getJobs({ employerId, includeClosed: true });
         
         // Map backend field names to frontend field names with improved validation
         const formattedJobs = jobsResponse.data.map(job => {
@@ -123,27 +132,10 @@ function EmployerDashboard() {
         
         setJobs(formattedJobs);
 
-        // Fetch applications for employer's jobs
-        const applicationsResponse = await api.getApplications({ employerId });
-        
-        // Map backend field names to frontend field names
-        const formattedApplications = applicationsResponse.data.map(app => {
-          return {
-            applicationId: app.ApplicationID || app.applicationId,
-            applicantUcid: app.ApplicantUCID || app.applicantUcid,
-            jobId: app.JobID || app.jobId,
-            status: app.Status || app.status,
-            dateApplied: app.DateApplied || app.dateApplied,
-            student: app.student || null,
-            job: app.job ? {
-              jobId: app.job.JobID || app.job.jobId,
-              jobTitle: app.job.JobTitle || app.job.jobTitle,
-              companyName: app.job.CompanyName || employerData.companyName
-            } : null
-          };
-        });
-        
-        setApplications(formattedApplications);
+        // Application counts are aggregated by the backend instead of
+        // downloading every application
+        const statsResponse = await api.getEmployerStats(employerId);
+        setStats(statsResponse.data);
 
         setLoading(false);
       } catch (err) {
@@ -154,13 +146,13 @@ function EmployerDashboard() {
     };
 
     fetchDashboardData();
-  }, [employerId]);
+  }, [employerId, applicationsVersion]);
 
   // Group applications by job
   const getApplicationCountByJob = () => {
     const counts = {};
-    applications.forEach(app => {
-      counts[app.jobId] = (counts[app.jobId] || 0) + 1;
+    (stats ? stats.per_job : []).forEach(job => {
+      counts[job.JobID] = job.applications;
     });
     return counts;
   };
@@ -177,9 +169,9 @@ function EmployerDashboard() {
       'Rejected': 0
     };
     
-    applications.forEach(app => {
-      if (counts[app.status] !== undefined) {
-        counts[app.status]++;
+    Object.entries(stats ? stats.applications.by_status : {}).forEach(([status, count]) => {
+      if (counts[status] !== undefined) {
+        counts[status] = count;
       }
     });
     
@@ -20,7 +20,7 @@ function JobModerationPage() {
         setLoading(true);
         
         // Since we're using mock data, let's just get all jobs and pretend they need moderation
-        const response = await api.getJobs();
+        const response = await api.getJobs({ includeClosed: true });
         // Filter to only show jobs from pending verification employers
         const results = response.data.filter(job => 
           job.employerId === 3 // Alberta Healthcare Systems has 'Pending' verification in our mock data
@@ -1,7 +1,7 @@
 import React, { useState } from 'react';
 import { Card, Form, Button, Row, Col } from 'react-bootstrap';
 
-function JobSearchFilters({ onApplyFilters, initialFilters = {} }) {
+function JobSearchFilters({ onApplyFilters, initialFilters = {}, facets = null }) {
   const [filters, setFilters] = useState({
     keyword: initialFilters.keyword || '',
     location: initialFilters.location || '',
@@ -82,13 +82,22 @@ function JobSearchFilters({ onApplyFilters, initialFilters = {} }) {
             <Col md={4}>
               <Form.Group className="mb-3">
                 <Form.Label>Location</Form.Label>
-                <Form.Control
-                  type="text"
+                {/* The locations of the jobs found, with how many are in each */}
+                <Form.Select
                   name="location"
                   value={filters.location}
                   onChange={handleChange}
-                  placeholder="City, province, etc."
-                />
+                >
+                  <option value="">All Locations</option>
+                  {(facets?.location || []).map(facet => (
+                    <option key={facet.value} value={facet.value}>
+                      {facet.label} ({facet.count})
+                    </option>
+                  ))}
+                  {filters.location && !(facets?.location || []).some(facet => facet.value === filters.location) && (
+                    <option value={filters.location}>{filters.location}</option>
+                  )}
+                </Form.Select>
               </Form.Group>
             </Col>
             
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { Container, Row, Col, Card, Button, Badge, ListGroup, Alert, Spinner, Tab, Tabs, Modal, Form } from 'react-bootstrap';
 import { Link, useNavigate } from 'react-router-dom';
 import api from '../services/api';
+import { useStatusEvents, APPLICATION_STATUS, APPLICANT_VERIFICATION, RESET } from '../services/events';
 
 function StudentDashboard() {
   const [applications, setApplications] = useState([]);
@@ -13,6 +14,8 @@ function StudentDashboard() {
   const [verificationFeedback, setVerificationFeedback] = useState('');
   const [isModerator, setIsModerator] = useState(false);
   const [moderatorId, setModeratorId] = useState(null);
+  // Bumped to re-fetch the applications when their status changes
+  const [applicationsVersion, setApplicationsVersion] = useState(0);
   
   // Additional state for moderator functionality
   const [studentVerifications, setStudentVerifications] = useState([]);
@@ -61,6 +64,12 @@ function StudentDashboard() {
       }
     };
   
+  // Pushed by the backend instead of polling for changes
+  useStatusEvents(type => {
+    if (type === APPLICATION_STATUS || type === RESET) setApplicationsVersion(version => version + 1);
+    if (type === APPLICANT_VERIFICATION || type === RESET) refreshUserStatus();
+  }, Boolean(ucid));
+  
   // Fetch saved jobs and applications
   useEffect(() => {
     const fetchData = async () => {
@@ -186,7 +195,7 @@ function StudentDashboard() {
     if (ucid) {
       fetchData();
     }
-  }, [ucid]);
+  }, [ucid, applicationsVersion]);
   
   // Format currency
   const formatSalary = (salary) => {
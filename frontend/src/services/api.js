@@ -9,6 +9,12 @@ const api = axios.create({
   baseURL: API_BASE_URL,
   headers: {
     'Content-Type': 'application/json'
+  },
+  // List endpoints are cursor-paginated on the backend. Until a caller is
+  // migrated to read `results`/`next`, keep receiving the plain array.
+  // Migrate a call by passing { params: { paginate: 'true' } }.
+  params: {
+    paginate: 'false'
   }
 });
 
@@ -106,6 +112,11 @@ const apiService = {
     if (filters.employerId) params.append('employer', filters.employerId);
     if (filters.minSalary) params.append('minSalary', filters.minSalary);
     if (filters.maxSalary) params.append('maxSalary', filters.maxSalary);
+    // Only postings still taking applications, unless asked for all of them
+    if (!filters.includeClosed) params.append('open', 'true');
+    // Counts per location, industry, salary and deadline of the matching jobs:
+    // the response is then { results: [...jobs], facets: {...} }
+    if (filters.facets) params.append('facets', 'true');
   
     return api.get(`/job-opening/${params.toString() ? `?${params.toString()}` : ''}`);
   },
@@ -122,7 +133,7 @@ const apiService = {
     // Ensure employerId is properly formatted for the API
     const parsedEmployerId = parseInt(employerId);
     
-    return apiService.getJobs({ employerId: parsedEmployerId })
+    return apiService.getJobs({ employerId: parsedEmployerId, includeClosed: true })
       .then(response => {
         // Double check that all returned jobs belong to this employer
         // This is a safety measure in case the backend filter doesn't work properly
@@ -223,6 +234,27 @@ const apiService = {
   getCompanyApplications: (employerId) => {
     return apiService.getApplications({ employerId: employerId });
   },
+
+  // Status events (see services/events.js). EventSource can't send the
+  // Authorization header, so the stream is opened with a short-lived ticket
+  // instead of the access token, which must not end up in the URL
+  getEventTicket: () => {
+    return api.post('/events/ticket/');
+  },
+
+  eventStreamUrl: (ticket, lastEventId = null) => {
+    const params = new URLSearchParams({ ticket });
+    if (lastEventId) params.append('lastEventId', lastEventId);
+    return `${API_BASE_URL}/events/?${params.toString()}`;
+  },
+
+  // Download applications as a CSV or NDJSON file (streamed by the backend)
+  exportCompanyApplications: (employerId, format = 'csv') => {
+    return api.get('/job-applications/export/', {
+      params: { EmployerID: employerId, format },
+      responseType: 'blob'
+    });
+  },
   
   getApplicationDetail: (applicationId) => {
     return api.get(`/job-applications/${applicationId}/`);
@@ -264,6 +296,11 @@ const apiService = {
   getEmployer: (employerId) => {
     return api.get(`/employers/${employerId}/`);
   },
+
+  // Job and application counts for the employer dashboard, aggregated server-side
+  getEmployerStats: (employerId) => {
+    return api.get(`/employers/${employerId}/stats/`);
+  },
   
   updateEmployer: (employerId, data) => {
     // Need to get the current employer data first to preserve the VerificationStatus
@@ -325,73 +362,60 @@ const apiService = {
   
   // Moderator functions
   getVerifications: (userType, status = 'Pending') => {
+    // The queue endpoints filter by status on the server and embed the
+    // student/employer profile, so this is a single request per queue
+    const params = { status: status || '' };
+
     if (userType === 'student') {
-      return api.get('/applicant-verifications/')
-        .then(response => {
-          // Filter by status if specified
-          const filteredData = status 
-            ? response.data.filter(v => v.VerificationStatus === status)
-            : response.data;
-            
-          // Get student details for each verification
-          const studentPromises = filteredData.map(verification => 
-            api.getStudentProfile(verification.ApplicantUCID)
-              .then(studentResponse => ({
-                vid: verification.VID,
-                applicantUcid: verification.ApplicantUCID,
-                status: verification.VerificationStatus,
-                date: verification.VerificationDate,
-                student: {
-                  ucid: studentResponse.data.UCID,
-                  name: `${studentResponse.data.FName || ''} ${studentResponse.data.LName || ''}`.trim(),
-                  email: studentResponse.data.Email,
-                  major: studentResponse.data.Major,
-                  graduationYear: studentResponse.data.GraduationYear
-                }
-              }))
-              .catch(() => null) // Skip if student details can't be fetched
-          );
-          
-          return Promise.all(studentPromises)
-            .then(results => ({ 
-              data: results.filter(Boolean) // Remove nulls
-            }));
-        });
+      return api.get('/applicant-verifications/queue/', { params })
+        .then(response => ({
+          data: response.data.map(verification => ({
+            vid: verification.VID,
+            applicantUcid: verification.ApplicantUCID,
+            status: verification.VerificationStatus,
+            date: verification.VerificationDate,
+            student: {
+              ucid: verification.student.UCID,
+              name: `${verification.student.FName || ''} ${verification.student.LName || ''}`.trim(),
+              email: verification.student.Email,
+              major: verification.student.Major,
+              graduationYear: verification.student.GraduationYear
+            }
+          }))
+        }));
     } else if (userType === 'employer') {
-      return api.get('/employer-verification/')
-        .then(response => {
-          // Filter by status if specified
-          const filteredData = status 
-            ? response.data.filter(v => v.VerificationStatus === status)
-            : response.data;
-            
-          // Get employer details for each verification
-          const employerPromises = filteredData.map(verification => 
-            api.getEmployer(verification.EmployerID)
-              .then(employerResponse => ({
-                vid: verification.VID,
-                employerId: verification.EmployerID,
-                status: verification.VerificationStatus,
-                date: verification.VerificationDate,
-                employer: {
-                  employerId: employerResponse.data.EmployerID,
-                  companyName: employerResponse.data.CompanyName,
-                  email: employerResponse.data.Email,
-                  industry: employerResponse.data.Industry || 'Not specified'
-                }
-              }))
-              .catch(() => null) // Skip if employer details can't be fetched
-          );
-          
-          return Promise.all(employerPromises)
-            .then(results => ({ 
-              data: results.filter(Boolean) // Remove nulls
-            }));
-        });
+      return api.get('/employer-verification/queue/', { params })
+        .then(response => ({
+          data: response.data.map(verification => ({
+            vid: verification.VID,
+            employerId: verification.EmployerID,
+            status: verification.VerificationStatus,
+            date: verification.VerificationDate,
+            employer: {
+              employerId: verification.employer.EmployerID,
+              companyName: verification.employer.CompanyName,
+              email: verification.employer.Email,
+              industry: verification.employer.Industry || 'Not specified'
+            }
+          }))
+        }));
     }
     return Promise.resolve({ data: [] });
   },
 
+  // Claim up to `limit` pending verifications for the logged-in moderator.
+  // Claimed rows are hidden from other moderators' claims until they are
+  // decided, released or the lease runs out
+  claimVerifications: (userType, limit = 10) => {
+    const endpoint = userType === 'student' ? 'applicant-verifications' : 'employer-verification';
+    return api.post(`/${endpoint}/claim/`, { limit });
+  },
+
+  releaseVerifications: (userType) => {
+    const endpoint = userType === 'student' ? 'applicant-verifications' : 'employer-verification';
+    return api.post(`/${endpoint}/release/`);
+  },
+
   // Update verification status
   updateVerificationStatus: (userType, userId, status, feedback = '') => {
     const today = new Date().toISOString().split('T')[0]; // Format: YYYY-MM-DD
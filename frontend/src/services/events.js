@@ -0,0 +1,90 @@
+// Application and verification status events pushed by the backend over
+// Server-Sent Events (backend/api/events.py), instead of polling the lists.
+import { useEffect, useRef } from 'react';
+import api from './api';
+
+// Event types sent by the backend
+export const APPLICATION_STATUS = 'application.status';
+export const APPLICANT_VERIFICATION = 'applicant.verification';
+export const EMPLOYER_VERIFICATION = 'employer.verification';
+// Events were missed (e.g. the backend restarted): re-fetch everything once
+export const RESET = 'reset';
+
+const EVENT_TYPES = [APPLICATION_STATUS, APPLICANT_VERIFICATION, EMPLOYER_VERIFICATION, RESET];
+// Wait before asking for a new ticket after the stream closes, doubled up to the maximum
+const RETRY_DELAY_MS = 3000;
+const MAX_RETRY_DELAY_MS = 60000;
+
+// Opens the event stream and calls onEvent(type, data) for each event.
+// Returns a function that closes it.
+//
+// The stream is opened with a ticket that is only good for a few seconds,
+// so when the browser's own reconnect is refused (or the stream ends with
+// the access token) a fresh ticket is fetched and the stream reopened from
+// the last event received.
+export function subscribeToStatusEvents(onEvent) {
+  let source = null;
+  let timer = null;
+  let closed = false;
+  let lastEventId = null;
+  let delay = RETRY_DELAY_MS;
+
+  const reconnect = () => {
+    if (closed) return;
+    timer = setTimeout(open, delay);
+    delay = Math.min(delay * 2, MAX_RETRY_DELAY_MS);
+  };
+
+  const open = async () => {
+    let ticket;
+    try {
+      const response = await api.getEventTicket();
+      ticket = response.data.ticket;
+    } catch (err) {
+      // Not signed in, not a student or employer, or the backend runs without
+      // the stream (EVENT_STREAM is off under runserver and WSGI): give up
+      if (err.response && [401, 403, 404].includes(err.response.status)) return;
+      reconnect();
+      return;
+    }
+    if (closed) return;
+
+    source = new EventSource(api.eventStreamUrl(ticket, lastEventId));
+    source.onopen = () => {
+      delay = RETRY_DELAY_MS;
+    };
+    EVENT_TYPES.forEach(type => {
+      source.addEventListener(type, event => {
+        lastEventId = event.lastEventId || lastEventId;
+        onEvent(type, event.data ? JSON.parse(event.data) : {});
+      });
+    });
+    source.onerror = () => {
+      // The browser retries by itself while the stream is CONNECTING; once
+      // the ticket is refused it gives up and a new one is needed
+      if (source.readyState === EventSource.CLOSED) {
+        reconnect();
+      }
+    };
+  };
+
+  open();
+
+  return () => {
+    closed = true;
+    clearTimeout(timer);
+    if (source) source.close();
+  };
+}
+
+// Calls onEvent(type, data) for the signed-in user's status events while
+// the component is mounted (and `enabled`).
+export function useStatusEvents(onEvent, enabled = true) {
+  const handler = useRef(onEvent);
+  handler.current = onEvent;
+
+  useEffect(() => {
+    if (!enabled) return undefined;
+    return subscribeToStatusEvents((type, data) => handler.current(type, data));
+  }, [enabled]);
+}